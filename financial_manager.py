@@ -5,12 +5,106 @@ Created on Fri Dec 18 12:31:55 2020
 global presetsFilepath
 presetsFilepath = 'presets.csv'
 
+import builtins
+import concurrent.futures
+import contextlib
+import csv
+import fcntl
 import glob
+import hashlib
+import heapq
+import io
+import json
+import pickle
+import pydoc
+import shutil
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import numpy
 import pandas
-from datetime import datetime, date, timedelta
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+
+#need these funcs before global variables
+def fileStamp(filename):
+    """
+    gives a cheap signature of a file's current contents, used to tell if a cached copy
+    of the file is out of date
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the file
+
+    Returns
+    -------
+    tuple of (modification time in ns, size in bytes), with the same again for each
+    journal segment if the file has any (see ledgerSegments)
+    """
+    stat = os.stat(filename)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    for segment in ledgerSegments(filename):
+        stat = os.stat(segment)
+        stamp += (stat.st_mtime_ns, stat.st_size)
+    return stamp
+
+def ledgerSegments(filename):
+    """
+    gives the journal files that hold rows appended to a csv but not yet compacted into it,
+    oldest first: the journal being compacted (if a compaction is running), then the journal
+    new rows are appended to
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the base csv
+
+    Returns
+    -------
+    list of filepaths of the segments that exist
+    """
+    return [segment for segment in (filename + '.compacting', filename + '.journal') 
+            if os.path.exists(segment)]
 
-#need this func before global variables
 def loadPresets(filename=presetsFilepath):
+    """
+    gives the presets as a dict, from a cached binary copy of the presets csv if the csv 
+    hasn't changed since the copy was made, otherwise parses the csv and remakes the copy
+    
+    Parameters
+    ----------
+    filename: string, optional
+        the filename of the presets csv
+        the default is presets
+    
+    Returns
+    -------
+    a dict mapping "variables" (first column) to "values" (second column)
+    """
+    cacheFilepath = filename + '.cache'
+    stamp = fileStamp(filename)
+    try:
+        with open(cacheFilepath, 'rb') as cache:
+            cachedStamp, data = pickle.load(cache)
+        if cachedStamp == stamp:
+            return data
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass#no cache yet, or it's unreadable, so just reparse
+
+    data = parsePresets(filename)
+    try:
+        with open(cacheFilepath, 'wb') as cache:
+            pickle.dump((stamp, data), cache, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass#a read only folder just means no cache
+    return data
+
+def parsePresets(filename=presetsFilepath):
     """
     opens the csv file in which the presets are stored, puts it in a dict assigning
     "variable" name to its definition
@@ -58,6 +152,9 @@ def loadPresets(filename=presetsFilepath):
         
         data[var] = val
 
+    #presets added after a presets file was made get their default
+    data.setdefault('recurring_file', 'recurring.csv')
+
     #for budget_caps, if active, -1 values should be changed to 'null'
     if isinstance(data['budget_caps'], list):
         for i, el in enumerate(data['budget_caps']):
@@ -66,22 +163,163 @@ def loadPresets(filename=presetsFilepath):
     
     return data
 
+class compiledPresets:
+    """
+    lookup tables built once from the presets dict, so checking a name or finding a 
+    budget's split/cap doesn't search the presets lists every time. must be rebuilt
+    (with compilePresets) whenever presets changes
+    """
+    def __init__(self, data):
+        for var in ('accounts', 'budgets', 'paycheck_split', 'employer'):
+            if not isinstance(data[var], list):
+                raise ValueError(f"The {var} preset must be a list, not {data[var]!r}.")
+        if not isinstance(data['budget_caps'], (list, str)):
+            raise ValueError(f"The budget_caps preset must be a list or 'null', not {data['budget_caps']!r}.")
+
+        self.accountIndex = {account: i for i, account in enumerate(data['accounts'])}
+        self.budgetIndex = {budget: i for i, budget in enumerate(data['budgets'])}
+        self.accountSet = frozenset(data['accounts'])
+        self.budgetSet = frozenset(data['budgets'])
+        self.employerSet = frozenset(data['employer'])
+        self.paycheckSplit = dict(zip(data['budgets'], data['paycheck_split']))#{budget: split}
+
+        #{budget: cap}, or 'null' if caps are turned off. budgets without a cap map to 'null'
+        if isinstance(data['budget_caps'], str):
+            self.budgetCaps = 'null'
+        else:
+            self.budgetCaps = dict(zip(data['budgets'], data['budget_caps']))
+
+def compilePresets():
+    """
+    rebuilds the global presetLookup tables from the global presets dict, and drops
+    everything cached from the files the old presets pointed to
+
+    Returns
+    -------
+    None.
+    """
+    global presetLookup, presetsStamp
+    presetLookup = compiledPresets(presets)
+    presetsStamp = fileStamp(presetsFilepath)
+
+    #the caches are defined further down, and don't exist yet on the first compile
+    for cache in ('balanceIndexCache', 'rollupCache', 'balanceCache', 'fingerprintCache',
+                  'dateIndexCache', 'nameIndexCache', 'historyCache', 'chainVerified'):
+        if cache in globals():
+            globals()[cache].clear()
+
+def refreshPresets():
+    """
+    reloads the presets if the presets csv has been changed since they were loaded
+    (by another session, the daemon, or by hand). called before every command, so long
+    running sessions pick up new files and budgets without restarting. only costs a 
+    stat call when nothing changed
+
+    Returns
+    -------
+    bool, True if the presets were reloaded
+    """
+    global presets
+    if fileStamp(presetsFilepath) == presetsStamp:
+        return False
+    presets = loadPresets(presetsFilepath)
+    compilePresets()
+    return True
+
 #global variables
-global today, presets
+global today, presets, presetLookup, presetsStamp, daemonSocketPath, daemonClient, walFilepath
 today = str(date.today())
-presets = loadPresets(presetsFilepath)
+if sys.argv[1:2] in (['profiles'], ['replay']) and not os.path.exists(presetsFilepath):
+    #these load each profile's own presets, so they can be run from outside a profile
+    presets = presetLookup = presetsStamp = None
+else:
+    presets = loadPresets(presetsFilepath)
+    compilePresets()
+daemonSocketPath = 'financial_manager.sock'
+walFilepath = 'financial_manager.wal'#write-ahead log for operations that write to more than one file
+historyFilepath = 'financial_manager.history'#every operation that can be undone, and its undos and redos
+daemonClient = None#set to a daemonConnection when the REPL is running as a thin client
+ledgerLock = threading.RLock()#held while appending to, or swapping, the transactions journal
+journalThreshold = 256*1024#bytes of journal before a background compaction is started
+nearDuplicateDays = 3#transactions this many days apart can be near duplicates
+compactionThread = None
+compactionStats = []#one dict per compaction, see compactJournal
+chainInterval = 1024#rows between the checkpoints sealChain and compactJournal write to the hash chain
+
+epochOrdinal = date(1970, 1, 1).toordinal()
+
+def dateOrdinals(dates):
+    """
+    parses many YYYY-MM-DD dates at once into day numbers (date.toordinal), which compare 
+    and subtract as plain integers
+
+    Parameters
+    ----------
+    dates : list, numpy array or pandas series
+        the dates, as str
+
+    Returns
+    -------
+    numpy int32 array of day numbers, 0 (before any real date) for dates that don't parse
+    """
+    days = pandas.to_datetime(pandas.Series(dates, dtype=object).astype(str), format="%Y-%m-%d", errors="coerce")
+    ordinals = days.to_numpy().astype('datetime64[D]').astype(numpy.int64) + epochOrdinal
+    return numpy.where(days.isna().to_numpy(), 0, ordinals).astype(numpy.int32)
+
+def dayOrdinal(day):
+    """
+    gives the day number (date.toordinal) of one YYYY-MM-DD date, 0 if it doesn't parse
+    """
+    try:
+        return date.fromisoformat(str(day)).toordinal()
+    except ValueError:
+        return 0
+
+def parseDate(text):
+    """
+    reads a date typed in as MM-DD (this year), YY-MM-DD, YYYY-MM-DD or 'today'
+
+    Parameters
+    ----------
+    text : str
+        the date as typed
+
+    Returns
+    -------
+    str, the date in the format YYYY-MM-DD, or None if it isn't a valid date
+    """
+    text = text.strip()
+    if text.lower() == 'today':
+        return today
+    parts = text.split('-')
+    if len(parts) == 2:
+        parts.insert(0, today[:4])
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    year, month, day = (int(part) for part in parts)
+    if len(parts[0]) == 2:
+        #2 digit years are read the way strptime's %y reads them
+        year += 2000 if year < 69 else 1900
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
 
 #each row of a csv is returned as a list of string elements
 class transaction:
-    def __init__(self, row):#row is a list
+    def __init__(self, row, day=None):#row is a list, day is the date's day number if it's known
         self.date = row[0]
-        self.name = row[1]
-        self.account = row[2]
-        self.budget = row[3]
+        self.day = dayOrdinal(row[0]) if day is None else day
+        #interned, so the many copies of each name share one string and compare by identity
+        self.name = sys.intern(row[1]) if isinstance(row[1], str) else row[1]
+        self.account = sys.intern(row[2]) if isinstance(row[2], str) else row[2]
+        self.budget = sys.intern(row[3]) if isinstance(row[3], str) else row[3]
         self.amount = row[4]
     def getDate(self):
         date = self.date
         return date
+    def getDay(self):
+        return self.day
     def getName(self):
         name = self.name
         return name
@@ -95,27 +333,28 @@ class transaction:
         amt = self.amount
         return amt
     def __str__(self):
-        nameCT = len(str(self.name))
-        acctCT = len(str(self.account))
-        budgetCT = len(str(self.budget))
-
-        return str(self.date) + "\t" + str(self.name) + (7 - nameCT//4)*"\t" + \
-            str(self.account) + (2 - acctCT//4)*"\t" + str(self.budget) + (5 - budgetCT//4)*"\t" + \
-            str(self.amount)
+        return transactionFormat.format(self.date, self.name, self.account, self.budget, self.amount)
         
 class incomeClass:
-    def __init__(self, row):
+    def __init__(self, row, day=None):
         self.date = row[0]
+        self.day = dayOrdinal(row[0]) if day is None else day
         self.amount = row[1]
         self.source = row[2]
     def getDate(self):
         return self.date
+    def getDay(self):
+        return self.day
     def getAmount(self):
         return self.amount
     def getSource(self):
         return self.source
     def __str__(self):
-        return str(self.date) + "\t" + str(self.amount) + "\t" + str(self.source)
+        return incomeFormat.format(self.date, self.amount, self.source)
+
+#fixed width columns for printing (names are at most 27 characters, see checkInput)
+transactionFormat = "{!s:<12}{!s:<28}{!s:<12}{!s:<16}{!s}"
+incomeFormat = "{!s:<12}{!s:<12}{!s}"
 
 def openFile(filename, index="date"):
     """
@@ -130,9 +369,50 @@ def openFile(filename, index="date"):
     
     Returns
     -------
-    the file as a pandas datafrome object
+    the file as a pandas datafrome object, including any rows still in its journal.
+    account, budget and name columns are categorical (see categorize)
+    """
+    with ledgerLock:
+        segments = [segment for segment in ledgerSegments(filename) if os.path.getsize(segment) > 0]
+        if not segments:
+            return categorize(pandas.read_csv(filename, index_col=index))
+
+        table = pandas.read_csv(filename)
+        tables = [table]
+        for segment in segments:
+            tables.append(pandas.read_csv(segment, header=None, names=table.columns))
+
+    #journal rows go after base rows with the same date, like writeTransactions used to
+    table = pandas.concat(tables, ignore_index=True).sort_values("date", kind="mergesort")
+    if index is not None:
+        table = table.set_index(index)
+    return categorize(table)
+
+def categorize(table):
+    """
+    stores the account, budget and name columns of a table as pandas categoricals: each 
+    distinct value is kept once, and the column itself is small integer codes. accounts and
+    budgets are coded in presets order (code i is the i-th account/budget in presets, then
+    'null', then any old names that are no longer in presets), so comparing them is an 
+    integer compare. blank cells and 'null' (which pandas reads as nan) both become 'null'
+
+    Parameters
+    ----------
+    table : pandas dataframe
+        a csv file that may have account, budget and/or name columns
+
+    Returns
+    -------
+    the same dataframe with those columns converted
     """
-    table = pandas.read_csv(filename, index_col=index)
+    for column, vocabulary in (("account", presets['accounts']), ("budget", presets['budgets'])):
+        if column in table.columns:
+            values = table[column].fillna("null").astype(str)
+            known = set(vocabulary)
+            extras = sorted(set(values.unique()) - known - {"null"})
+            table[column] = values.astype(pandas.CategoricalDtype(list(vocabulary) + ["null"] + extras))
+    if "name" in table.columns:
+        table["name"] = table["name"].astype("category")
     return table
 
 def printLine():
@@ -146,21 +426,67 @@ def printLine():
     """
     print("--------------------")
 
-def printList(transactionList):
+def formatList(transactionList):
+    """
+    formats a list of transaction (or income) objects into table lines, a whole column at
+    a time instead of one object at a time
+
+    Parameters
+    ----------
+    transactionList : list
+        list of transaction or income objects (not mixed)
+
+    Returns
+    -------
+    list of str, one line per object
+    """
+    if not transactionList:
+        return []
+    if isinstance(transactionList[0], incomeClass):
+        return list(map(incomeFormat.format,
+                        [item.date for item in transactionList],
+                        [item.amount for item in transactionList],
+                        [item.source for item in transactionList]))
+    return list(map(transactionFormat.format,
+                    [item.date for item in transactionList],
+                    [item.name for item in transactionList],
+                    [item.account for item in transactionList],
+                    [item.budget for item in transactionList],
+                    [item.amount for item in transactionList]))
+
+def printList(transactionList, filename=None):
     """
-    prints a table from a list of transaction objects
+    prints a table from a list of transaction objects, as one write. if the table is 
+    longer than the terminal, it's shown in a pager
     
     Parameters
     ----------
     transactionList : list
         list of transaction objects
+    filename : str, optional
+        if given, the table is written to this file instead of the screen
 
     Returns
     -------
     None.
     """
-    for item in transactionList:
-        print(item)
+    if filename is not None:
+        #stream in chunks so a huge list never becomes one huge string
+        with open(filename, 'w', encoding='utf-8') as out:
+            for i in range(0, len(transactionList), 10000):
+                lines = formatList(transactionList[i:i + 10000])
+                out.write("\n".join(lines) + "\n")
+        return
+
+    lines = formatList(transactionList)
+    if not lines:
+        return
+    text = "\n".join(lines) + "\n"
+    if sys.stdout.isatty() and len(lines) > shutil.get_terminal_size().lines - 2:
+        pydoc.pager(text)
+    else:
+        sys.stdout.write(text)
+        sys.stdout.flush()
 
 
 def convertToClass(file, income=False):
@@ -181,18 +507,20 @@ def convertToClass(file, income=False):
 
     """
     transactions = []
+    #every date is parsed in one go, instead of once per object
+    days = dateOrdinals(file["date"]).tolist()
     
-    for row in file.itertuples(index=False):
+    for row, day in zip(file.itertuples(index=False), days):
         if income:
-            line = incomeClass(row)
+            line = incomeClass(row, day)
         else:
-            line = transaction(row)
+            line = transaction(row, day)
         transactions.append(line)
     
     return transactions
 
 
-def filepathToTransactionList(filename=presets['transactions_file'], income=False):
+def filepathToTransactionList(filename=None, income=False):
     """
     takes in a filepath and converts it into a list of transaction objects
     (or income objects if income is True)
@@ -209,8 +537,67 @@ def filepathToTransactionList(filename=presets['transactions_file'], income=Fals
     -------
     a list of transaction (or income) objects, the data in the file
     """
+    if filename is None:
+        filename = presets['transactions_file']
+    #when running as a thin client, the daemon already has the ledger in memory
+    if daemonClient is not None and not income and filename == presets['transactions_file']:
+        return [transaction(row) for row in daemonClient.request('rows')['rows']]
     return convertToClass(openFile(filename, None), income)
 
+def readRecent(since, filename=None, blockSize=65536):
+    """
+    gives the transactions from a date on, without reading the rest of the ledger. the 
+    base csv is sorted by date, so it's read backwards from the end a block at a time until
+    a row before the date turns up; the journal (small, in write order) is read whole
+
+    Parameters
+    ----------
+    since : str, format YYYY-MM-DD
+        the first date to include
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    blockSize : int, optional
+        bytes read per step back. default is 64 KiB
+
+    Returns
+    -------
+    a list of transaction objects in date order, like filepathToTransactionList
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    cutoff = since.encode('utf-8')
+
+    with ledgerLock:
+        with open(filename, 'rb') as file:
+            position = file.seek(0, os.SEEK_END)
+            data = b''
+            while position > 0:
+                step = min(blockSize, position)
+                position -= step
+                file.seek(position)
+                data = file.read(step) + data
+                #the first line of the block may be cut off, so look at the next whole one
+                lines = data.split(b'\n', 2)
+                first = lines[0] if position == 0 else lines[1] if len(lines) > 1 else b''
+                if first.strip() and first[:10] < cutoff:
+                    break
+        lines = data.split(b'\n')[1:]#the header, or the cut off line
+        baseRows = [row for row in csv.reader(line.decode('utf-8') for line in lines) if row and row[0] >= since]
+
+        journalRows = []
+        for segment in ledgerSegments(filename):
+            with open(segment, newline='', encoding='utf-8') as journal:
+                journalRows += [row for row in csv.reader(journal) if row and row[0] >= since]
+
+    #journal rows go after base rows with the same date, like openFile
+    journalRows.sort(key=lambda row: row[0])
+    transactions = []
+    for row in heapq.merge(baseRows, journalRows, key=lambda row: row[0]):
+        #blank accounts and budgets are read as 'null', like categorize
+        transactions.append(transaction([row[0], row[1], row[2] or 'null', row[3] or 'null', float(row[4])]))
+    return transactions
+
 def total(condition, transactionList):
     """
     generalizes all the "total" functions: takes in a condition func that returns 
@@ -237,7 +624,7 @@ def total(condition, transactionList):
 
 def totalName(query, transactionList):
     """
-    creates a list of transactions with the given query in its name
+    creates a list of transactions with the given query in its name, ignoring case
     
     Parameters
     ----------
@@ -250,8 +637,9 @@ def totalName(query, transactionList):
     -------
     a list of transaction objects that satisfy the search
     """
+    query = query.lower()
     def nameCond(transaction):
-        return query in transaction.getName()
+        return query in str(transaction.getName()).lower()
     
     return total(nameCond, transactionList)
     
@@ -270,6 +658,9 @@ def totalBudget(budget, transactionList):
     -------
     a list of transaction objects that are in the given budget
     """
+    #interned like the transaction's budget, so the compare is usually just an identity check
+    if isinstance(budget, str):
+        budget = sys.intern(budget)
     def budgetCond(transaction):
         return transaction.getBudget() == budget
 
@@ -290,6 +681,8 @@ def totalAccount(account, transactionList):
     -------
     a list of transaction objects that are in the given account
     """
+    if isinstance(account, str):
+        account = sys.intern(account)
     def accountCond(transaction):
         return transaction.getAccount() == account
     
@@ -312,8 +705,9 @@ def totalDate(start, end, transactionList):
     -------
     a list from the transaction list that are from that date range
     """
+    start, end = dayOrdinal(start), dayOrdinal(end)
     def dateCond(transaction):
-        return transaction.getDate() >= start and transaction.getDate() <= end
+        return start <= transaction.day <= end
             
     return total(dateCond, transactionList)
 
@@ -358,1868 +752,5065 @@ def add(totalList):
     total = round(total, 2)
     return total
 
-def findBudgetCap(budget):
+class balanceIndex:
     """
-    finds the set cap of the given budget
+    running balances of every budget and account over the date sorted ledger. for each
+    budget/account it keeps the sorted day numbers (see dateOrdinals) of its transactions
+    and the cumulative sum of their amounts, so a balance as of any date is one binary search
+    """
+    def __init__(self, file):#file is a pandas dataframe of the transactions csv
+        #stable sort so transactions on the same day keep their file order
+        file = file.sort_values("date", kind="mergesort")
+        file = file.assign(day=dateOrdinals(file["date"]))
+        self.budgets = self.buildSums(file, "budget")
+        self.accounts = self.buildSums(file, "account")
+    def buildSums(self, file, column):
+        sums = dict()
+        for key, group in file.groupby(column, sort=False, observed=True):
+            sums[key] = (group["day"].to_numpy(), group["amount"].to_numpy(dtype=float).cumsum())
+        return sums
+    def lookup(self, name, kind):
+        if kind == "budget":
+            return self.budgets.get(name)
+        return self.accounts.get(name)
+    def balanceAsOf(self, name, asof, kind="budget"):
+        sums = self.lookup(name, kind)
+        if sums is None:
+            return 0
+        days, cumulative = sums
+        i = numpy.searchsorted(days, dayOrdinal(asof), side="right")#number of transactions on or before asof
+        if i == 0:
+            return 0
+        return round(float(cumulative[i - 1]), 2)
+    def balanceSeries(self, name, dates, kind="budget"):
+        sums = self.lookup(name, kind)
+        if sums is None:
+            return numpy.zeros(len(dates))
+        days, cumulative = sums
+        #vectorized: one searchsorted for every requested date
+        i = numpy.searchsorted(days, dateOrdinals(dates), side="right")
+        series = numpy.where(i > 0, cumulative[numpy.maximum(i - 1, 0)], 0)
+        return numpy.round(series, 2)
+
+balanceIndexCache = dict()#{filename: (fileStamp, balanceIndex)}
+
+def loadBalanceIndex(filename=None):
+    """
+    gives the balance index for a transactions file, only rebuilding it if the file
+    has changed since it was last built
 
     Parameters
     ----------
-    budget : str
-        a valid budget from the list of budgets in presets
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
     Returns
     -------
-    float or str, the value of the cap as a float if it has one, 'null' if it does not
+    balanceIndex of the file
     """
-    if isinstance(presets['budget_caps'], str):
-        return 'null'#if budget caps are not turned on
-    cap = presets['budget_caps'][presets['budgets'].index(budget)]
+    if filename is None:
+        filename = presets['transactions_file']
+    stamp = fileStamp(filename)
+    cached = balanceIndexCache.get(filename)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, balanceIndex(openFile(filename, None)))
+        balanceIndexCache[filename] = cached
+    return cached[1]
+
+def balanceAsOf(name, asof, kind="budget", filename=None):
+    """
+    gives what a budget or account held at the end of the given date
 
-    return cap
+    Parameters
+    ----------
+    name : str
+        the name of the budget or account
+    asof : str, format YYYY-MM-DD
+        the date to find the balance on (inclusive)
+    kind : str, optional
+        "budget" or "account". default is "budget"
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
-def overcapAmt(budget, amount_to_add, cap=False):
+    Returns
+    -------
+    float, the balance rounded to cents
     """
-    gives the amount a budget will be overcapped by if the given amount is added.
+    if filename is None:
+        filename = presets['transactions_file']
+    if daemonClient is not None and filename == presets['transactions_file']:
+        return daemonClient.request('asof', name=name, date=asof, kind=kind)['balance']
+    return loadBalanceIndex(filename).balanceAsOf(name, asof, kind)
+
+def balanceSeries(name, dates, kind="budget", filename=None):
+    """
+    gives the balance of a budget or account at the end of each of the given dates, 
+    e.g. for charting a balance over time
 
     Parameters
     ----------
-    budget : str
-        a valid budget from the list of budgets in presets
-    amount_to_add : float
-        the amount to be added to the budget
-    cap : bool, float
-        the cap of the budget being added to. Default is False, if a cap is 
-        not given, the function will find it based on the global presets
-    
+    name : str
+        the name of the budget or account
+    dates : list
+        list of dates (str, format YYYY-MM-DD), in any order
+    kind : str, optional
+        "budget" or "account". default is "budget"
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+
     Returns
     -------
-    float or None, None if the budget has no cap, otherwise float represending the overcap amount
-        Note that if the budget will not overcap, this function will return a negative number
+    numpy array of balances, in the same order as dates
     """
-    if not(cap) and isinstance(cap, bool):
-        cap = findBudgetCap(budget)
-    if cap == 'null':
-        return
-    
-    return (add(totalBudget(budget,filepathToTransactionList())) + amount_to_add) - cap
+    if filename is None:
+        filename = presets['transactions_file']
+    return loadBalanceIndex(filename).balanceSeries(name, dates, kind)
 
-def overcapCheck(budget, amount_to_add, cap=False):
+rollupCache = dict()#{filename: [fileStamp, rollup dataframe]}
+
+def rollupFrame(file, income=False):
     """
-    checks if a budget will become overcapped if the given amount is added.
+    sums a transactions (or income) dataframe by month in one group by pass
 
     Parameters
     ----------
-    budget : str
-        a valid budget from the list of budgets in presets
-    amount_to_add : float
-        the amount to be added to the budget
-    cap : bool, float
-        the cap of the budget being added to. Default is False, if a cap is 
-        not given, the function will find it based on the global presets
-    
+    file : pandas dataframe
+        the csv file data, with date as a column
+    income : bool, optional
+        True if the file is the income record rather than transactions
+
     Returns
     -------
-    bool, True if it will overcap, False if not.
-        Note that if the amount reaches the cap exactly, this function will return False
+    dataframe indexed by (month, budget, account) with spend and deposits columns,
+    or by (month, source) with an amount column if income is True
+    """
+    month = file["date"].astype(str).str[:7]#YYYY-MM
+    amount = file["amount"].astype(float)
+    if income:
+        frame = pandas.DataFrame({"month": month, "source": file["source"].astype(str), "amount": amount})
+        return frame.groupby(["month", "source"]).sum()
+
+    #blank budgets/accounts are read as nan, give them the same name the program writes
+    frame = pandas.DataFrame({"month": month,
+                              "budget": file["budget"].fillna("null").astype(str),
+                              "account": file["account"].fillna("null").astype(str),
+                              "spend": amount.where(amount < 0, 0),
+                              "deposits": amount.where(amount > 0, 0)})
+    return frame.groupby(["month", "budget", "account"]).sum()
+
+def loadRollup(filename, income=False):
+    """
+    gives the monthly rollup of a file, only recomputing it if the file has been changed
+    by something other than writeTransactions/paycheck (which update it incrementally)
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the transactions or income csv
+    income : bool, optional
+        True if the file is the income record rather than transactions
 
+    Returns
+    -------
+    the rollup dataframe (see rollupFrame)
     """
-    total = overcapAmt(budget, amount_to_add, cap)
+    stamp = fileStamp(filename)
+    cached = rollupCache.get(filename)
+    if cached is None or cached[0] != stamp:
+        cached = [stamp, rollupFrame(openFile(filename, None), income)]
+        rollupCache[filename] = cached
+    return cached[1]
+
+def updateRollup(filename, lines, stampBefore, income=False):
+    """
+    adds newly written rows to a cached rollup instead of recomputing it. if the cache 
+    wasn't up to date before the write, it's dropped and rebuilt on the next report
 
-    if total == None:#no cap
-        return False
-    elif total > 0:#over cap
-        return True
+    Parameters
+    ----------
+    filename : str
+        filepath to the file that was written to
+    lines : list
+        the rows that were written, in the same column order as the file
+    stampBefore : tuple
+        the fileStamp of the file before the rows were written
+    income : bool, optional
+        True if the file is the income record rather than transactions
+
+    Returns
+    -------
+    None.
+    """
+    cached = rollupCache.get(filename)
+    if cached is None:
+        return
+    if cached[0] != stampBefore:
+        del rollupCache[filename]
+        return
+
+    if income:
+        columns = ["date", "amount", "source"]
     else:
-        return False#0 or negative -- under cap
+        columns = ["date", "name", "account", "budget", "amount"]
+    delta = rollupFrame(pandas.DataFrame(lines, columns=columns), income)
+    cached[1] = cached[1].add(delta, fill_value=0)
+    cached[0] = fileStamp(filename)
 
-def overcapProcedure(budget, amount_to_add, cap=False):
+def monthlyReport(by, start=None, end=None):
     """
-    handles the event where user wants to add an amount that would cause the 
-    corresponding budget to go over its set cap
+    builds a monthly report table from the cached rollups
 
     Parameters
     ----------
-    budget : str
-        a valid budget from the list of budgets in presets
-    amount_to_add : float
-        the amount to be added to the budget
-    cap : bool, float
-        the cap of the budget being added to. Default is False, if a cap is 
-        not given, the function will find it based on the global presets
-    
+    by : str
+        "budget" or "account" for spend and deposits, or "income" for income per source
+    start : str, optional
+        first month to include, format YYYY-MM. default is no limit
+    end : str, optional
+        last month to include, format YYYY-MM. default is no limit
+
     Returns
     -------
-    None, list
-        None if user cancels the transaction
-        list - nested list of transactions in the format [budget, amount] to be added to file
+    pandas dataframe with a row per month and a column per budget/account/source
     """
-    #first check if the budget is already capped before the amount is added
-    if overcapAmt(budget, 0, cap) >= 0:
-    # if overcapCheck(budget, 0, cap):
-        already_capped = True
-        what_do = input(f"The {budget} budget is already capped! You can enter 1 to override "\
-                        "the cap and add this amount anyway, 2 to add the amount to "\
-                        "a different budget, or 3 to cancel this transaction. 1/2/3 ").strip().lower()
+    if by == "income":
+        rollup = loadRollup(presets['income_record_file'], True)["amount"]
+        table = rollup.groupby(level=["month", "source"]).sum().unstack("source", fill_value=0)
     else:
-        already_capped = False
-        what_do = input(f"Adding this amount to the {budget} budget will result in it going over "\
-                        "its set cap. You can enter 1 to override the cap and add this amount "\
-                        "anyway, 2 to add money up to this budget's set cap, or 3 to cancel "\
-                        "this transaction. 1/2/3 ").strip().lower()
+        rollup = loadRollup(presets['transactions_file'])
+        table = rollup.groupby(level=["month", by]).sum()
+        #the null budget/account only holds the other half of transfers
+        table = table[table.index.get_level_values(by) != "null"]
+        table = table.unstack(by, fill_value=0).swaplevel(axis=1).sort_index(axis=1)
 
-    while what_do not in {"1","2","3","exit","override"}:
-        what_do = input("This is not a valid option. Please choose 1, 2, or 3 from the "\
-                        "options listed above. 1/2/3 ").strip().lower()
-        
-    if what_do in {"3", "exit"}:
-        print("You have selected to cancel this transaction. Now exiting.")
-        return
-    
-    elif what_do in {"1","override"}:
-        print("You have selected to override the cap.")
-        return [[budget, amount_to_add]]
+    if start is not None:
+        table = table[table.index >= start]
+    if end is not None:
+        table = table[table.index <= end]
+    return table.round(2)
 
-    elif what_do in {"2"}:
-        printLine()
-        cap = findBudgetCap(budget)
+balanceCache = dict()#{filename: [fileStamp, {'budgets': {budget: total}, 'accounts': {account: total}}]}
 
-        #need different handling for if all of the new amount is being moved,
-        # vs just a portion
-        transactions = list()
+def loadBalances(filename=None):
+    """
+    gives the current total of every budget and account. the totals are kept in memory 
+    and updated by writeTransactions, so the file is only read again if something else
+    changes it
 
-        if already_capped:
-            print("You have selected to change the destination budget.")
-            overcap = amount_to_add
-            next_budget = input("Which budget would you like to change to? ").strip().lower()
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
-        else:
-            print("You have selected to add an amount up to the budget cap.")
-            overcap = round(overcapAmt(budget, amount_to_add, cap),2)
-            undercap = amount_to_add - overcap
-            print(f"${undercap} of the amount will be added to {budget}.")
-            transactions.append([budget, undercap])
-            print(f"The {budget} budget will overcap your set cap of {cap} by ${overcap}.")
-
-            options = input("Would you like to (1) remove this amount from the transaction, (2) add it "\
-                            "to the set overflow budget, or (3) add it to another budget? 1/2/3 ").strip().lower()
-            
-            while options not in {"1","2","3","remove","overflow","other","another","exit"}:
-                options = input("This is not a valid option. Please choose 1, 2, or 3 from the "\
-                                "options listed above. 1/2/3 ").strip().lower()
-
-            if options == "exit":
-                return
-            elif options in {"1","remove"}:
-                return transactions
-            elif options in {"2","overflow"}:
-                transactions.append([presets['overflow_budget'], overcap])
-                return transactions
-            elif options in {"3","other","another"}:
-                next_budget = input("Which budget would you like this extra money to go to? ").strip().lower()
-        
-        next_budget = checkInput(next_budget,"budget")
-        if next_budget is None:
-            return
-        
-        if overcapCheck(next_budget,overcap):
-            printLine()
-            #ask again if they'd like to add to overflow budget
-            print(f"Adding this amount to the {next_budget} budget will put that budget over the set cap.")
-            overflow = input("Would you like to add the amount to the set overflow budget instead? Y/N ").strip().lower()
-            if overflow == 'exit':
-                return
-            elif overflow in {'y','yes','yee'}:
-                transactions.append([presets["overflow_budget"], overcap])
-            else:
-                #recursive problem with capped budget
-                printLine()
-                handling = overcapProcedure(next_budget,overcap)
-                if handling is None:
-                    return
-                else:
-                    transactions += handling
-        else:
-            transactions.append([next_budget,overcap])
-
-        if overcapAmt(next_budget,overcap) == 0:
-            print(f"The {next_budget} budget is now capped at {findBudgetCap(next_budget)}.")
+    Returns
+    -------
+    dict in the form {'budgets': {budget: total}, 'accounts': {account: total}}, not rounded
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    stamp = fileStamp(filename)
+    cached = balanceCache.get(filename)
+    if cached is None or cached[0] != stamp:
+        file = openFile(filename, None)
+        amount = file["amount"].to_numpy(dtype=float)
+        balances = {'budgets': categoryTotals(file["budget"], amount),
+                    'accounts': categoryTotals(file["account"], amount)}
+        cached = [stamp, balances]
+        balanceCache[filename] = cached
+    return cached[1]
+
+def categoryTotals(column, amount):
+    """
+    sums amounts by the value of a categorical column, using its integer codes
 
-        return transactions
+    Parameters
+    ----------
+    column : pandas series
+        categorical column, e.g. budget
+    amount : numpy array
+        the amount of each row
 
+    Returns
+    -------
+    dict of {value: total} for every value that appears in the column
+    """
+    codes = column.cat.codes.to_numpy()
+    categories = column.cat.categories
+    totals = numpy.bincount(codes, weights=amount, minlength=len(categories))
+    counts = numpy.bincount(codes, minlength=len(categories))
+    return {categories[i]: float(totals[i]) for i in numpy.flatnonzero(counts)}
 
-def checkInput(inp,typ,all_bool=False):
+def updateBalances(filename, lines, stampBefore):
     """
-    get correct input for various types of entry fields
+    adds newly written transactions to the in-memory totals. if the totals weren't up to
+    date before the write, they're dropped and reloaded on the next lookup
 
     Parameters
     ----------
-    inp : str
-        user input
-    typ : str
-        must be in list: ["date","name","account","budget","amount","filter","income_filter","csv"]
-    all_bool : bool
-        True if "all" is a valid input (in which case, returns list of all budgets/accounts)
+    filename : str
+        filepath to the file that was written to
+    lines : list
+        the transactions that were written, in the form [date, name, account, budget, amount]
+    stampBefore : tuple
+        the fileStamp of the file before the rows were written
 
     Returns
     -------
-    str in correct given format
+    None.
+    """
+    cached = balanceCache.get(filename)
+    if cached is None:
+        return
+    if cached[0] != stampBefore:
+        del balanceCache[filename]
+        return
 
-    """    
-    #if it's 'exit', return None
-    if inp in {'exit', 'n', 'cancel', 'go away!'}:
-        print("Okay, backing up...")
-        return None
-    
-    if typ == "date":
-        fail = True
-        while fail:
-            fail = False
+    budgets = cached[1]['budgets']
+    accounts = cached[1]['accounts']
+    for line in lines:
+        budgets[str(line[3])] = budgets.get(str(line[3]), 0) + float(line[4])
+        accounts[str(line[2])] = accounts.get(str(line[2]), 0) + float(line[4])
+    cached[0] = fileStamp(filename)
 
-            if inp.strip().lower() == 'today':
-                inp = today
-                break
+def roundedBalances(filename=None):
+    """
+    gives the totals from loadBalances rounded to cents, the same as add() would give
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    balances = loadBalances(filename)
+    return {'budgets': {b: round(t, 2) for b, t in balances['budgets'].items()},
+            'accounts': {a: round(t, 2) for a, t in balances['accounts'].items()}}
 
-            #want to get the input in the format YY-MM-DD or YYYY-MM-DD so you can use datetime.strptime
-            date_input = inp.split('-')
+def budgetBalance(budget, filename=None):
+    """
+    gives the current total in a budget, from the in-memory totals
 
-            #no hyphen
-            if len(date_input) <= 1:
-                fail = True
-                print("Please enter a date with the numbers separated by hyphens!")
-            
-            elif len(date_input) == 2:
-                #no year, add the current year
-                date_input.insert(0,today[0:4])
+    Parameters
+    ----------
+    budget : str
+        the name of a budget
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
-            if len(date_input[0]) == 2:
-                #2 digit year, use %y for year when converting to datetime
-                year = '%y'
-            else:
-                year = '%Y'
+    Returns
+    -------
+    float, the total rounded to cents
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    if daemonClient is not None and filename == presets['transactions_file']:
+        return daemonClient.request('balances')['budgets'].get(budget, 0)
+    return round(loadBalances(filename)['budgets'].get(budget, 0), 2)
 
-            if not fail:
-                #convert to a str w/ hyphens
-                date_str = str()
-                for el in date_input:
-                    date_str += el+'-'
-                date_str = date_str[:-1]
+def cellText(value):
+    """
+    gives a csv cell as text the same way the program writes it: blank cells and 'null'
+    (which pandas reads as nan) both become 'null'
+    """
+    if isinstance(value, float) and value != value:#nan
+        return 'null'
+    return str(value)
 
-                try:
-                    #convert to a datetime object, then convert that to str and remove time at end
-                    inp = str(datetime.strptime(date_str, year + '-%m-%d'))[:10]
+def duplicateKey(name, account, budget, amount):
+    """
+    gives everything about a transaction except its date, normalized so a hand entered
+    and an imported copy of it match: name is case and whitespace insensitive, amount is
+    in whole cents
+    """
+    return (cellText(name).strip().lower(), cellText(account), cellText(budget), round(float(amount)*100))
 
-                except ValueError:
-                    #format is incorrect
-                    fail = True
-                    print("You've entered an invalid date. Please enter a date in the format (YYYY-)MM-DD.")
-            
-            if fail:
-                inp = input("Date (MM-DD): ")
-    
-    elif typ == "name":
-        fail = True
-        while fail:
-            fail = False
-            
-            if "," in inp:
-                fail = True
-                print("Please do not use commas in the name.")
-            
-            if len(inp) > 27:
-                fail = True
-                print("That name is too long. Please keep it 27 characters or less.")
-            
-            if fail:
-                inp = input("Name: ")
-    
-    elif typ == "account":
-        accounts = presets['accounts']
-        inp = inp.lower()
-        
-        while inp not in accounts and inp != "null":
-            #check for all
-            if inp == "all" and all_bool:
-                inp = accounts #will return a list of all account names
-                break
-            
-            if inp == "exit":
-                break
+def transactionFingerprint(row):
+    """
+    hashes a transaction into a short fingerprint for the duplicate index
 
-            acct_list_str = ""
-            for acct in accounts:
-                acct_list_str += acct
-                acct_list_str += ", "
-            print(f"{inp} is not a valid account. The valid accounts are {acct_list_str}and null.")
-            inp = input("Account: ").strip().lower()
-            
-    elif typ == "budget":
-        budgets = presets['budgets']
-        inp = inp.lower()
-        while inp not in budgets and inp != "null":
-            #check for all
-            if inp == "all" and all_bool:
-                inp = budgets #will return a list of all budget names
-                break
+    Parameters
+    ----------
+    row : list
+        the transaction in the form [date, name, account, budget, amount]
 
-            if inp == 'exit':
-                break
+    Returns
+    -------
+    bytes, an 8 byte hash of the date and the duplicateKey
+    """
+    key = (str(row[0]),) + duplicateKey(*row[1:5])
+    return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=8).digest()
 
-            budget_list_str = ""
-            for budget in budgets:
-                budget_list_str += budget
-                budget_list_str += ", "
-            print(f"{inp} is not a valid budget. The valid budgets are {budget_list_str}and null.")
-            inp = input("Budget: ")
-            inp = inp.lower()
-    
-    elif typ == "amount":
-        while type(inp) == str:
-            if inp == 'exit':
-                break
-            try:
-                inp = float(inp)
-            except ValueError:
-                print("That is an invalid entry. Please enter a number.")
-                inp = input("Amount: ")
-               
-    elif "filter" in typ:#filter or income_filter
-        inp = inp.lower()
-        if typ == "income_filter":
-            filter_list = ["date","source","none"]
-        else:
-            filter_list = ["budget","account","date","name","none"]
-            
-        string_list = ""
-        for _ in filter_list[:-1]:
-            string_list += _
-            string_list += ", "
-            
-        while inp not in filter_list:
-            print(f"{inp} is not a valid filter type. Please choose {string_list}or none.")
-            inp = input("Filter: ")
-            inp = inp.lower()
-    
-    elif typ == "csv":
-        found = False
+class fingerprintIndex:
+    """
+    index of every transaction's fingerprint (for exact duplicates), and of the dates of 
+    every transaction by duplicateKey (for duplicates entered a few days apart)
+    """
+    def __init__(self, file):#file is a pandas dataframe of the transactions csv
+        self.exact = dict()#{fingerprint: count}
+        self.near = dict()#{duplicateKey: sorted list of date ordinals}
+        days = dateOrdinals(file["date"]).tolist()
+        for row, day in zip(file.itertuples(index=False), days):
+            self.add(list(row), day)
+    def add(self, row, day=None):
+        fingerprint = transactionFingerprint(row)
+        self.exact[fingerprint] = self.exact.get(fingerprint, 0) + 1
+        insort(self.near.setdefault(duplicateKey(*row[1:5]), []), dayOrdinal(row[0]) if day is None else day)
+    def duplicates(self, row):
+        return self.exact.get(transactionFingerprint(row), 0)
+    def nearDuplicates(self, row, days):
+        #dates of matching transactions within days of this one, other than the same day
+        dates = self.near.get(duplicateKey(*row[1:5]), [])
+        day = dayOrdinal(row[0])
+        lo = bisect_left(dates, day - days)
+        hi = bisect_right(dates, day + days)
+        return [str(date.fromordinal(d)) for d in dates[lo:hi] if d != day]
+
+fingerprintCache = dict()#{filename: [fileStamp, fingerprintIndex]}
+
+def loadFingerprints(filename=None):
+    """
+    gives the duplicate index for a transactions file, only rebuilding it if the file has
+    been changed by something other than writeTransactions (which updates it)
 
-        while not found:
-            if inp.lower() == 'exit':
-                found == True
-                print("Exiting...")
-                break
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
-            #add .csv extension if not there
-            if inp[-4:] != ".csv":
-                inp = inp + ".csv"
+    Returns
+    -------
+    fingerprintIndex of the file
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    stamp = fileStamp(filename)
+    cached = fingerprintCache.get(filename)
+    if cached is None or cached[0] != stamp:
+        cached = [stamp, fingerprintIndex(openFile(filename, None))]
+        fingerprintCache[filename] = cached
+    return cached[1]
+
+def updateFingerprints(filename, lines, stampBefore):
+    """
+    adds newly written transactions to the cached duplicate index. if the index wasn't
+    up to date before the write, it's dropped and rebuilt on the next check
+    """
+    cached = fingerprintCache.get(filename)
+    if cached is None:
+        return
+    if cached[0] != stampBefore:
+        del fingerprintCache[filename]
+        return
+    for line in lines:
+        cached[1].add(line)
+    cached[0] = fileStamp(filename)
 
-            try:
-                f = open(inp)
-                f.close()
-                found = True
-    
-            except FileNotFoundError:
-                print(f"{inp} was not found in the local file. Please enter the name of a csv file",\
-                    "or filepath in the local directory.")
-                inp = input("Filename: ").strip()
-    
-    return inp
+def nameGrams(text):
+    """
+    gives the set of 3 letter pieces of a name (lowercased, padded so the start and end
+    count), used to compare names that are spelled a little differently
+    """
+    text = "  " + text.lower() + " "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
 
-def askEach(category):
+class nameIndex:
     """
-    asks for an amount for each value in an iterable, returns a list of values in 
-    the corresponding order to the input iterable
-    
+    trigram index over the distinct transaction names, for fuzzy searches. names are 
+    indexed lowercased, and each lowercased name keeps the spellings it was written with
+    and how many transactions use each
+    """
+    def __init__(self, counts):#counts is {name: number of transactions}
+        self.ids = dict()#{lowercased name: id}
+        self.spellings = []#{name: count} per id
+        self.sizes = []#number of trigrams per id
+        self.grams = dict()#{trigram: list of ids}
+        self.arrays = dict()#numpy copies of grams' lists, made as queries need them
+        for name, count in counts.items():
+            self.add(name, count)
+    def add(self, name, count=1):
+        name = str(name)
+        key = name.lower()
+        i = self.ids.get(key)
+        if i is None:
+            i = self.ids[key] = len(self.spellings)
+            self.spellings.append(dict())
+            grams = nameGrams(key)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(i)
+                self.arrays.pop(gram, None)
+        self.spellings[i][name] = self.spellings[i].get(name, 0) + count
+    def postings(self, gram):
+        array = self.arrays.get(gram)
+        if array is None:
+            array = self.arrays[gram] = numpy.array(self.grams[gram], dtype=numpy.int32)
+        return array
+    def search(self, query, limit=10, minimum=.5):
+        grams = [gram for gram in nameGrams(query) if gram in self.grams]
+        if not grams:
+            return []
+        #how many of the query's trigrams each name shares, for every name at once
+        shared = numpy.bincount(numpy.concatenate([self.postings(gram) for gram in grams]), 
+                                minlength=len(self.spellings))
+        total = len(nameGrams(query))
+        candidates = numpy.flatnonzero(shared >= minimum*total)
+        #half how much of the query the name covers, half how alike they are overall 
+        # (so a closer length ranks higher)
+        sizes = numpy.asarray(self.sizes)[candidates]
+        scores = (shared[candidates]/total + 2*shared[candidates]/(total + sizes))/2
+        best = candidates[numpy.argsort(-scores, kind="stable")[:limit]]
+        scores = numpy.sort(scores)[::-1][:limit]
+        return [(name, round(float(score), 3), count) for i, score in zip(best, scores) 
+                for name, count in self.spellings[i].items()]
+
+nameIndexCache = dict()#{filename: [fileStamp, nameIndex]}
+
+def loadNameIndex(filename=None):
+    """
+    gives the name index for a transactions file, only rebuilding it if the file has been
+    changed by something other than writeTransactions (which updates it)
+
     Parameters
     ----------
-    category : iter
-        an iterable for which each element will be asked a value
-        
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+
     Returns
     -------
-    list of values given by user
+    nameIndex of the file
     """
-    values = []
-    for each in category:
-        inp = input(f"How much is in {each}? ")
-        inp = checkInput(inp, 'amount')
-        values.append(inp)
-    return values
+    if filename is None:
+        filename = presets['transactions_file']
+    stamp = fileStamp(filename)
+    cached = nameIndexCache.get(filename)
+    if cached is None or cached[0] != stamp:
+        #the name column is categorical, so this only goes through the distinct names
+        counts = openFile(filename, None)["name"].value_counts()
+        cached = [stamp, nameIndex(counts[counts > 0].to_dict())]
+        nameIndexCache[filename] = cached
+    return cached[1]
+
+def updateNameIndex(filename, lines, stampBefore):
+    """
+    adds the names of newly written transactions to the cached name index. if the index 
+    wasn't up to date before the write, it's dropped and rebuilt on the next search
+    """
+    cached = nameIndexCache.get(filename)
+    if cached is None:
+        return
+    if cached[0] != stampBefore:
+        del nameIndexCache[filename]
+        return
+    for line in lines:
+        cached[1].add(line[1])
+    cached[0] = fileStamp(filename)
 
-def init():
+def searchNames(query, limit=10, filename=None):
     """
-    creates initializing transactions in a blank csv file; makes sure account and budget 
-    balances are what's given
-    
+    finds the transaction names most like query, ignoring case and allowing for typos,
+    best match first
+
+    Parameters
+    ----------
+    query : str
+        the name (or part of one) to search for
+    limit : int, optional
+        the most distinct names to give. default is 10
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+
     Returns
     -------
-    None
+    list of (name, similarity from 0 to 1, number of transactions) tuples. names that
+    only differ in case are listed separately, with the same similarity
     """
-    #DEBUG - exit doesn't work properly in this function
+    if filename is None:
+        filename = presets['transactions_file']
+    if daemonClient is not None and filename == presets['transactions_file']:
+        return [tuple(match) for match in daemonClient.request('search', query=query, limit=limit)['matches']]
+    return loadNameIndex(filename).search(query, limit)
 
-    #ask for values for accounts and for budgets
-    printLine()
-    print("Okay! First thing you need to do is let me know how much money is in each",\
-          "account and budget.")
-    
-    print("First are your accounts.")
-    acct_amts = askEach(presets['accounts'])
-    printLine()
-    print("Now are the budgets.")
-    budg_amts = askEach(presets['budgets'])
-
-    #check for budgets that are over the cap
-    if isinstance(presets["budget_caps"],list):
-        for budget_i, budget in enumerate(presets['budgets']):
-            cap = findBudgetCap(budget)
-            if cap != 'null':
-                amount = budg_amts[budget_i]
-                if cap < amount:
-                    printLine()
-                    print(f"The {budget} budget has a cap of {cap}, and your given "\
-                          f"amount of {amount} exceeds that.")
-                    what_do = input(f"What would you like to do? You can enter 1 to "\
-                                    "ignore the set budget cap and allow the cap to "\
-                                    "be exceeded, enter 2 to only add an amount up to "\
-                                    "the cap and add the rest to a different budget, "\
-                                    "or enter 3 to cancel doing init entirely. 1/2/3 ").strip().lower()
-                    while what_do not in {"1","2","3","ignore","exit","cancel"}:
-                        what_do = input("This is not a valid options. Please choose 1, "\
-                                        "2, or 3 from the options listed above. 1/2/3 ").strip().lower()
-                    
-                    if what_do in {"3","exit","cancel"}:
-                        print("Okay, exiting init...")
-                        return
-                    
-                    elif what_do in {"1","ignore"}:
-                        print("This budget's cap will be ignored.")
-                        continue#next budget in for loop
-
-                    elif what_do in {"2"}:
-                        print(f"Okay, {cap} will be added to {budget}.")
-                        budg_amts[budget_i] = cap
-
-                        overcap_amt = amount - cap
-                        next_budget = input("Which budget would you like the remaining "\
-                                            f"amount of {overcap_amt} to be added to? ").strip().lower()
-                        next_budget = checkInput(next_budget,"budget")
-
-                        handled = False
-                        while not handled:
-                            next_budget_i = presets['budgets'].index(next_budget)
-
-                            #if budget has already been checked by this loop, must check now
-                            if next_budget in presets['budgets'][:budget_i]:
-                                next_budget_amt = budg_amts[next_budget_i]
-                                next_budget_cap = findBudgetCap(next_budget)
-
-                                if next_budget_amt + overcap_amt > next_budget_cap:
-                                    if next_budget_amt >= next_budget_cap:#already capped
-                                        print("This budget is already capped!")
-                                    else:
-                                        print(f"This will overcap the {next_budget} budget!")
-
-                                    add_anyway = input("Would you like to add anyway? Y/N ").strip().lower()
-                                    if add_anyway in {'y','yes','yee'}:
-                                        budg_amts[next_budget_i] += overcap_amt
-                                        handled = True
-
-                                    elif add_anyway == 'exit':
-                                        print("Exiting init...")
-                                        return
-                                    
-                                    else:
-                                        next_budget = input("Please choose another budget. ").strip().lower()
-                                        next_budget = checkInput(next_budget,"budget")
-                                        #then it'll rerun the while loop with the new next_budget
-
-                                else:#does not overcap next budget
-                                    budg_amts[next_budget_i] += overcap_amt
-                                    handled = True
-
-                            #if budget is yet to be checked by this loop, just add it
-                            else:
-                                budg_amts[next_budget_i] += overcap_amt
-                                handled = True
-    
-    #make sure total for accounts == total for budgets
-    sum_acct = round(sum(acct_amts), 2)
-    sum_budg = round(sum(budg_amts), 2)
-    while sum_acct != sum_budg:
-        print("The amounts in your accounts is not equal to the amounts in your budgets.",\
-              f"Total in accounts is {sum_acct}, while total in budgets is {sum_budg}.",\
-              "Please try again.")
-        #ask again
-        print("First are your accounts.")
-        acct_amts = askEach(presets['accounts'])
-        printLine()
-        print("Now are the budgets.")
-
-        budg_amts = askEach(presets['budgets'])
-        sum_acct = round(sum(acct_amts), 2)
-        sum_budg = round(sum(budg_amts), 2)
-    
-    #create transactions to init accounts
-    for i, amt in enumerate(acct_amts):
-        #[date, name, account, budget, amount]
-        data = [today, 'init', presets['accounts'][i], 'null', amt]
-        writeTransaction(data)
-    
-    #create transactions to init budgets
-    for i, amt in enumerate(budg_amts):
-        #[date, name, account, budget, amount]
-        data_from = [today, 'init', 'null', 'null', -1*amt]
-        data_to = [today, 'init', 'null', presets['budgets'][i], amt]
-        writeTransfer(data_from, data_to)
-    
-    print("It's all added to the file now!")
-
-def checkBalances(transactionList, checkFilepath=presets['balance_checks_file']):
+def checkDuplicate(row, days=None, filename=None):
     """
-    checks that personal records and bank records match, from list of transactions
-    and filepath for the file to be written to
-    
+    checks whether a transaction is already in the file, or was entered within a few days
+
     Parameters
     ----------
-    transactionList : list
-        list of transaction objects that represents the transactions csv file
-    checkFilepath : string, optional
-        filepath for the check balances csv file
-        default is the checkFilename str found in presets dict
+    row : list
+        the transaction in the form [date, name, account, budget, amount]
+    days : int, optional
+        how many days apart still counts as a near duplicate. default is nearDuplicateDays
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
     Returns
     -------
-    None.
+    tuple of (number of exact duplicates, list of dates of near duplicates)
     """
-    #convert check file to panda df, other inits
-    works = True
-    checkFile = openFile(checkFilepath, "date")
-    
-    #loop until the user doesn't exit
-    repeat = True
-    while repeat:
-        repeat = False
-        #go through each account (except cash)
-        accounts = presets['accounts']
-        for i, acct in enumerate(accounts):
-            #don't check cash every week (it has its own function)
-            if acct == 'cash':
-                continue
-            
-            #bank amt
-            bal = input(f"Please enter the amount in the {accounts[i]} account (if you previously "\
-                        "typed a number wrong, you can type 'exit' now to restart): ")
-            bal = checkInput(bal,"amount")
-            if bal is None:
-                repeat = True
-                break
-            
-            #add total
-            totalList = totalAccount(accounts[i],transactionList)
-            total = add(totalList)
-            
-            #check for match
-            if bal != total:
-                works = False
-                print("Records do not match.\nTotal in records is", total)
-            else:
-                checkFile = pandas_append(checkFile, [accounts[i], bal, True], 
-                                          today, "date")
-                print("Records match")
-    
-    #write to file
-    if works:
-        checkFile.to_csv(checkFilepath)
-
-
-def checkCash(checkFilepath=presets['balance_checks_file']):
+    if filename is None:
+        filename = presets['transactions_file']
+    if days is None:
+        days = nearDuplicateDays
+    if daemonClient is not None and filename == presets['transactions_file']:
+        reply = daemonClient.request('dupcheck', row=row, days=days)
+        return reply['exact'], reply['near']
+    index = loadFingerprints(filename)
+    return index.duplicates(row), index.nearDuplicates(row, days)
+
+def findDuplicates(days=None, filename=None):
     """
-    checks the the counted cash total is the same as recorded
+    scans the whole ledger once for transactions that are duplicates of each other
 
     Parameters
     ----------
-    checkFilepath : str, optional
-        filepath the the csv with check records. 
-        The default is the str associated checkFilename in presets dict.
+    days : int, optional
+        how many days apart still counts as a near duplicate. default is nearDuplicateDays
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
     Returns
     -------
-    None.
-
+    tuple of (list of groups of exact duplicates, list of groups of near duplicates), 
+    each group a list of transaction objects
     """
-    #get transaction list
-    transactionList = filepathToTransactionList()
-    
-    #convert check file to panda df, other inits
-    works = True
-    checkFile = openFile(checkFilepath, "date")
-    
-    cashBal = float(input("Please enter the amount you counted in cash: "))
-    cashBal = checkInput(cashBal,"amount")
-    
-    cashTotalList = totalAccount("cash", transactionList)
-    cashTotal = add(cashTotalList)
-    
-    if cashBal != cashTotal:
-        works = False
-        print("Records do not match.\nTotal in records is", cashTotal)
-    else:
-        checkFile = pandas_append(checkFile, ["cash", cashBal, True], 
-                                  today, "date")
-        print("Records match")
-        
-    #write to file
-    if works:
-        checkFile.to_csv(checkFilepath)
+    if filename is None:
+        filename = presets['transactions_file']
+    if days is None:
+        days = nearDuplicateDays
+
+    exact = dict()#{fingerprint: [transactions]}
+    byKey = dict()#{duplicateKey: [(date ordinal, transaction)]}, in date order since the file is sorted
+    for item in filepathToTransactionList(filename):
+        row = [item.date, item.name, item.account, item.budget, item.amount]
+        if cellText(item.account) == 'null' and cellText(item.budget) == 'null':
+            continue#the withdrawal half of a budget transfer (e.g. init), these repeat on purpose
+        exact.setdefault(transactionFingerprint(row), []).append(item)
+        byKey.setdefault(duplicateKey(*row[1:5]), []).append((item.day, item))
+
+    #near duplicates: runs of matching transactions each within days of the last, on different days
+    near = []
+    for entries in byKey.values():
+        group = [entries[0]]
+        for entry in entries[1:]:
+            if entry[0] - group[-1][0] <= days:
+                group.append(entry)
+            else:
+                if len({d for d, _ in group}) > 1:
+                    near.append([item for _, item in group])
+                group = [entry]
+        if len({d for d, _ in group}) > 1:
+            near.append([item for _, item in group])
 
+    return [group for group in exact.values() if len(group) > 1], near
 
-def sort(filename=presets['transactions_file']):
+def auditRows(problem, rows, limit=5):
     """
-    sorts the csv file by date (using built-in pandas mergesort), writes it to the file
+    gives an audit problem with the number of rows it affects and the first few of them
+    """
+    text = f"{problem} ({len(rows)} rows)"
+    for row in rows.head(limit).itertuples(index=False):
+        text += "\n    " + ", ".join(str(value) for value in row)
+    return text
+
+def auditLedger(filename=None, paycheckFile=None):
+    """
+    checks the ledger's invariants in one read of the files, with whole column operations: 
+    every date parses, every amount is a number, every account and budget is in presets,
+    transfers net to zero, the init rows are what init writes, the accounts and budgets 
+    add up to the same total, everything cached in memory (balances, balance index, 
+    rollups, fingerprints, the presets cache, and the daemon's balances if it's running)
+    agrees with the files, and the whole hash chain checks out (see verifyChain). a ledger 
+    that hasn't been sealed with a chain yet (one is made on its next write) isn't a problem
 
     Parameters
     ----------
     filename : str, optional
-        filepath to the transaction history to be sorted
-        default is the str associated with filepath in the presets dict
-    
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    paycheckFile : str, optional
+        filepath to the income record
+        the default is income_record_file from presets dict
+
     Returns
     -------
-    none
-
+    list of problems found (str), empty if there are none
     """
-    #open as pandas
-    file = openFile(filename)
-    
-    #sort by date
-    file = file.sort_values("date",kind="mergesort")
-    
-    #rewrite file
-    file.to_csv(filename)
+    if filename is None:
+        filename = presets['transactions_file']
+    if paycheckFile is None:
+        paycheckFile = presets['income_record_file']
+    problems = []
+    stamp = fileStamp(filename)#before reading, so caches are only compared to this version
+    file = openFile(filename, None)
+
+    #every row parses
+    dates = pandas.to_datetime(file["date"].astype(str), format="%Y-%m-%d", errors="coerce")
+    if dates.isna().any():
+        problems.append(auditRows("Dates that aren't YYYY-MM-DD", file[dates.isna()]))
+    amount = pandas.to_numeric(file["amount"], errors="coerce")
+    if amount.isna().any():
+        problems.append(auditRows("Amounts that aren't numbers", file[amount.isna()]))
+    amount = amount.fillna(0).to_numpy(dtype=float)
+
+    #categorize codes presets accounts/budgets first, then 'null', then anything else
+    for column, names in (("account", presets['accounts']), ("budget", presets['budgets'])):
+        unknown = file[column].cat.codes.to_numpy() > len(names)
+        if unknown.any():
+            problems.append(auditRows(f"{column.capitalize()}s that aren't in presets", file[unknown]))
+
+    nullAccount = (file["account"] == 'null').to_numpy()
+    nullBudget = (file["budget"] == 'null').to_numpy()
+    names = file["name"].astype(str)
+    init = (names == 'init').to_numpy()
+
+    #transfers are written together with the same date and name, and one side of an account
+    # (or budget) only transfer is the null budget (or account)
+    key = file["date"].astype(str) + "\0" + names
+    transfer = key.isin(set(key[(nullAccount | nullBudget) & ~init]))
+    net = pandas.Series(amount[transfer.to_numpy()], index=key[transfer]).groupby(level=0).sum()
+    unbalanced = net.index[net.abs() > .005]
+    if len(unbalanced):
+        problems.append(auditRows("Transfers that don't net to zero", file[key.isin(set(unbalanced))]))
+
+    #init writes an (account, null) row per account, and a (null, null) and (null, budget) 
+    # pair per budget, all on one day, with the accounts and budgets adding up to the same total
+    initRows = file[init]
+    if len(initRows):
+        if initRows["date"].nunique() > 1:
+            problems.append(auditRows("Init rows on more than one date", initRows))
+        accountRows = init & ~nullAccount & nullBudget
+        budgetRows = init & nullAccount & ~nullBudget
+        withdrawRows = init & nullAccount & nullBudget
+        other = init & ~(accountRows | budgetRows | withdrawRows)
+        if other.any():
+            problems.append(auditRows("Init rows with both an account and a budget", file[other]))
+        if budgetRows.sum() != withdrawRows.sum() or abs(amount[budgetRows].sum() + amount[withdrawRows].sum()) > .005:
+            problems.append(auditRows("Init budget rows without a matching null budget withdrawal", 
+                                      file[budgetRows | withdrawRows]))
+        if abs(amount[accountRows].sum() - amount[budgetRows].sum()) > .005:
+            problems.append(auditRows(f"Init accounts total {amount[accountRows].sum():.2f} but init budgets "\
+                                      f"total {amount[budgetRows].sum():.2f}", initRows))
+
+    #every real transaction is in an account and a budget, and transfers net to zero, so the
+    # null account and null budget must hold the same total
+    difference = amount[nullBudget].sum() - amount[nullAccount].sum()
+    if abs(difference) > .005:
+        problems.append(f"Accounts total {difference:+.2f} more than budgets")
+
+    #caches, only the ones made from this version of the file (older ones get rebuilt anyway)
+    balances = {'budgets': categoryTotals(file["budget"], amount), 
+                'accounts': categoryTotals(file["account"], amount)}
+    def compareTotals(source, cached):
+        for kind in ('budgets', 'accounts'):
+            for name in set(balances[kind]) | set(cached[kind]):
+                if abs(balances[kind].get(name, 0) - cached[kind].get(name, 0)) > .005:
+                    problems.append(f"{source} has {cached[kind].get(name, 0):.2f} for {name} "\
+                                    f"but the file adds up to {balances[kind].get(name, 0):.2f}")
+    if filename in balanceCache and balanceCache[filename][0] == stamp:
+        compareTotals("The balance cache", balanceCache[filename][1])
+    if filename in balanceIndexCache and balanceIndexCache[filename][0] == stamp:
+        index = balanceIndexCache[filename][1]
+        compareTotals("The balance index", {kind: {name: float(sums[1][-1]) for name, sums in table.items()} 
+                                            for kind, table in (('budgets', index.budgets), ('accounts', index.accounts))})
+    if filename in fingerprintCache and fingerprintCache[filename][0] == stamp:
+        if sum(fingerprintCache[filename][1].exact.values()) != len(file):
+            problems.append("The duplicate index doesn't have every transaction")
+    if daemonClient is not None and filename == presets['transactions_file']:
+        compareTotals("The daemon", daemonClient.request('balances'))
+
+    for rollupFile, income in ((filename, False), (paycheckFile, True)):
+        if rollupFile in rollupCache and rollupCache[rollupFile][0] == fileStamp(rollupFile):
+            fresh = rollupFrame(file if not income else openFile(paycheckFile, None), income)
+            cached = rollupCache[rollupFile][1]
+            difference = fresh.sub(cached.groupby(level=list(range(cached.index.nlevels))).sum(), fill_value=0)
+            if (difference.abs() > .005).any().any():
+                problems.append(f"The monthly rollup of {rollupFile} doesn't match the file")
+
+    if loadPresets(presetsFilepath) != parsePresets(presetsFilepath):
+        problems.append("The presets cache doesn't match presets.csv")
+
+    if os.path.exists(filename + '.chain'):
+        problems += verifyChain(filename, True)
+    return problems
 
-def pandas_append(file, data, name, index):
+def findBudgetCap(budget):
     """
-    takes a file and appends a line of data (as a list) to it
+    finds the set cap of the given budget
 
     Parameters
     ----------
-    file : pandas DataFrame
-        the csv file to be appended to
-    data : list
-        a list of data to be appended
-    name : str
-        what this data will be indexed by
-    index : str
-        name of the first column
+    budget : str
+        a valid budget from the list of budgets in presets
 
     Returns
     -------
-    muted file with data appended
+    float or str, the value of the cap as a float if it has one, 'null' if it does not
+    """
+    if presetLookup.budgetCaps == 'null':
+        return 'null'#if budget caps are not turned on
+    cap = presetLookup.budgetCaps.get(budget, 'null')
 
-    """    
-    lineSeries = pandas.Series(data=data, name=name, index=file.columns)
-    file = pandas.concat([file, lineSeries.to_frame().T])
-    return file.rename_axis(index, axis=0) # set name of index to date
-    
-def writeTransaction(line, filename=presets['transactions_file']):
+    return cap
+
+def overcapAmt(budget, amount_to_add, cap=False):
     """
-    takes a transaction (as a list) and adds it to the end of a csv file, and sorts file by date
-    
+    gives the amount a budget will be overcapped by if the given amount is added.
+
     Parameters
     ----------
-    line : list
-        the transaction to be added in form [date, name, account, budget, amount]
-    filename : string, optional
-        the name of the file being written to
-        the default is filename (associated in presets dict)
-
+    budget : str
+        a valid budget from the list of budgets in presets
+    amount_to_add : float
+        the amount to be added to the budget
+    cap : bool, float
+        the cap of the budget being added to. Default is False, if a cap is 
+        not given, the function will find it based on the global presets
+    
     Returns
     -------
-    None
+    float or None, None if the budget has no cap, otherwise float represending the overcap amount
+        Note that if the budget will not overcap, this function will return a negative number
     """
-    #open file
-    file = openFile(filename)
+    if not(cap) and isinstance(cap, bool):
+        cap = findBudgetCap(budget)
+    if cap == 'null':
+        return
     
-    #create series and concat to file (with helper) 
-    file = pandas_append(file, line[1:], line[0], "date")
-    file.to_csv(filename)
+    if daemonClient is not None:
+        return daemonClient.request('capcheck', budget=budget, amount=amount_to_add, cap=cap)['overcap']
 
-    #sort list by date
-    file = file.sort_values("date")
+    return (budgetBalance(budget) + amount_to_add) - cap
 
-    file.to_csv(filename)
-
-def changePresets(filepath=presetsFilepath):
+def overcapCheck(budget, amount_to_add, cap=False):
     """
-    changes the presets csv file, and globals a new dict with the updated presets
+    checks if a budget will become overcapped if the given amount is added.
 
     Parameters
     ----------
-    filepath : str, optional
-        the name of the file that the presets are stored in
-        default is the global presetsFilepath (top of program)
-        
+    budget : str
+        a valid budget from the list of budgets in presets
+    amount_to_add : float
+        the amount to be added to the budget
+    cap : bool, float
+        the cap of the budget being added to. Default is False, if a cap is 
+        not given, the function will find it based on the global presets
+    
     Returns
     -------
-    None.
+    bool, True if it will overcap, False if not.
+        Note that if the amount reaches the cap exactly, this function will return False
 
     """
-    instructions = {
-        "transactions_file": "The transactions file is the file that all transactions are "\
-            "recorded in.",
-        "balance_checks_file": "The balance checks file is the file that records the balance "\
-            "of your accounts every time you check that they match your records, and the "\
-            "date it was checked.",
-        "income_record_file": "The income record file is the file that records your income.",
-        "accounts": "Accounts is a list of your accounts.",
-        "budgets": "Budgets is a list of your budgets.",
-        "employer": "The employer is the name you give to the source of your income. This can "\
-            "be a list of multiple employers, in which case the program will ask before inputting "\
-            "the employer",
-        "paycheck_account": "The paycheck account is which account, from your list, you "\
-            "have your paycheck deposited into.",
-        "paycheck_split": "The paycheck split is how you want your paycheck to be divided "\
-            "among the budgets you have set, represented as a decimal amount for each budget.",
-        "round_budget": "The round budget comes into play after your paycheck is divided "\
-            "among your budgets. In the case that the total doesn't equal your actual "\
-            "paycheck due to rounding, the amount needed in order for it to add correctly "\
-            "will be taken from or added to the budget you set here.",
-        "monthly_rent": "The monthly rent is the amount you pay per month for rent.",
-        "monthly_internet": "The monthly internet is the amount you pay per month for internet.",
-        "budget_caps": "The budget caps is a list of the max amount of money you want to have "\
-            "in each budget. If an item in the list is 'null', it means the corresponding budget "\
-            "does not have a cap.",
-        "overflow_budget": "The overflow budget is the budget that income from things like paychecks "\
-            "will go into if all the budgets it's set to go into are capped."
-            }
+    total = overcapAmt(budget, amount_to_add, cap)
 
-    printLine()
-    print("Type 'exit' in any field to cancel.")
+    if total == None:#no cap
+        return False
+    elif total > 0:#over cap
+        return True
+    else:
+        return False#0 or negative -- under cap
 
-    #show list of preset variables
-    for var in presets:
-        print("\t",var)
-    
-    #ask which to change
-    inp = input("Please enter the names of each of the presets, from the list above, "\
-                "that you would like to change, separated by commas, or type 'all' to change "\
-                "every preset: ").lower().strip()
-    if inp == 'all':
-        to_change = list(presets)
+def overcapProcedure(budget, amount_to_add, cap=False):
+    """
+    handles the event where user wants to add an amount that would cause the 
+    corresponding budget to go over its set cap
 
-    elif inp == 'exit':
-        print("Exiting presets modification...")
-        return #end function
+    Parameters
+    ----------
+    budget : str
+        a valid budget from the list of budgets in presets
+    amount_to_add : float
+        the amount to be added to the budget
+    cap : bool, float
+        the cap of the budget being added to. Default is False, if a cap is 
+        not given, the function will find it based on the global presets
     
+    Returns
+    -------
+    None, list
+        None if user cancels the transaction
+        list - nested list of transactions in the format [budget, amount] to be added to file
+    """
+    #first check if the budget is already capped before the amount is added
+    if overcapAmt(budget, 0, cap) >= 0:
+    # if overcapCheck(budget, 0, cap):
+        already_capped = True
+        what_do = input(f"The {budget} budget is already capped! You can enter 1 to override "\
+                        "the cap and add this amount anyway, 2 to add the amount to "\
+                        "a different budget, or 3 to cancel this transaction. 1/2/3 ").strip().lower()
     else:
-        to_change_input = (inp.replace(" ","")).split(",")#get rid of spaces and split by comma
+        already_capped = False
+        what_do = input(f"Adding this amount to the {budget} budget will result in it going over "\
+                        "its set cap. You can enter 1 to override the cap and add this amount "\
+                        "anyway, 2 to add money up to this budget's set cap, or 3 to cancel "\
+                        "this transaction. 1/2/3 ").strip().lower()
+
+    while what_do not in {"1","2","3","exit","override"}:
+        what_do = input("This is not a valid option. Please choose 1, 2, or 3 from the "\
+                        "options listed above. 1/2/3 ").strip().lower()
         
-        to_change = []
-        for variable in to_change_input:
-            #check input
-            while variable not in presets:
-                variable = input(f"{variable} not found in presets. Please enter "\
-                        "a valid preset name, or type 'skip' to move on: ").lower().strip()
-                if variable == 'skip':
-                    break
-                elif variable == 'exit':
-                    print("Exiting presets modification...")
-                    return #end function
+    if what_do in {"3", "exit"}:
+        print("You have selected to cancel this transaction. Now exiting.")
+        return
+    
+    elif what_do in {"1","override"}:
+        print("You have selected to override the cap.")
+        return [[budget, amount_to_add]]
 
-            #only add if it's not already in it
-            if variable not in to_change:
-                to_change.append(variable)
+    elif what_do in {"2"}:
+        printLine()
+        cap = findBudgetCap(budget)
 
-    for i, variable in enumerate(to_change):
-        if variable == 'skip':
-            continue
+        #need different handling for if all of the new amount is being moved,
+        # vs just a portion
+        transactions = list()
 
-        og_value = presets[variable]#get original value
-        
-        printLine()
-        print(f"Working on changing {variable}.")
-        print(instructions[variable])#give a brief explanation of the variable
+        if already_capped:
+            print("You have selected to change the destination budget.")
+            overcap = amount_to_add
+            next_budget = input("Which budget would you like to change to? ").strip().lower()
 
-        #budget_caps needs special case because it can be a str or list
-        if variable == 'budget_caps':
-            budgets = presets['budgets']
+        else:
+            print("You have selected to add an amount up to the budget cap.")
+            overcap = round(overcapAmt(budget, amount_to_add, cap),2)
+            undercap = amount_to_add - overcap
+            print(f"${undercap} of the amount will be added to {budget}.")
+            transactions.append([budget, undercap])
+            print(f"The {budget} budget will overcap your set cap of {cap} by ${overcap}.")
 
-            if isinstance(og_value, str):
-                on = input("You currently have budget caps turned off. Would you like to turn this "\
-                      "setting on? Y/N ").strip().lower()
-                if on == 'exit':
-                    print("Exiting budget caps editing...")
-                    continue
-                elif on in {'yes','y','yee'}:
-                    #create a list to put the budgets through, and then run the second part of budget_caps handling
-                    og_value = ['null' for _ in range(len(budgets))]
-                    edit_list = True
-                else:#no change
-                    continue
+            options = input("Would you like to (1) remove this amount from the transaction, (2) add it "\
+                            "to the set overflow budget, or (3) add it to another budget? 1/2/3 ").strip().lower()
+            
+            while options not in {"1","2","3","remove","overflow","other","another","exit"}:
+                options = input("This is not a valid option. Please choose 1, 2, or 3 from the "\
+                                "options listed above. 1/2/3 ").strip().lower()
 
+            if options == "exit":
+                return
+            elif options in {"1","remove"}:
+                return transactions
+            elif options in {"2","overflow"}:
+                transactions.append([presets['overflow_budget'], overcap])
+                return transactions
+            elif options in {"3","other","another"}:
+                next_budget = input("Which budget would you like this extra money to go to? ").strip().lower()
+        
+        next_budget = checkInput(next_budget,"budget")
+        if next_budget is None:
+            return
+        
+        if overcapCheck(next_budget,overcap):
+            printLine()
+            #ask again if they'd like to add to overflow budget
+            print(f"Adding this amount to the {next_budget} budget will put that budget over the set cap.")
+            overflow = input("Would you like to add the amount to the set overflow budget instead? Y/N ").strip().lower()
+            if overflow == 'exit':
+                return
+            elif overflow in {'y','yes','yee'}:
+                transactions.append([presets["overflow_budget"], overcap])
             else:
-                off = input("You currently have budget caps turned on. Would you like to turn this "\
-                      "setting off? Y/N ").strip().lower()
-                if off == 'exit':
-                    print("Exiting budget caps editing...")
-                    continue
-                elif off in {'yes','y','yee'}:
-                    presets['budget_caps'] = 'null'
-                    edit_list = False
+                #recursive problem with capped budget
+                printLine()
+                handling = overcapProcedure(next_budget,overcap)
+                if handling is None:
+                    return
                 else:
-                    edit_list = True
+                    transactions += handling
+        else:
+            transactions.append([next_budget,overcap])
 
-            #runs only if there is a list & they want to edit it
-            if edit_list:
-                #make sure list is same length as budgets list
-                if len(budgets) != len(og_value):
-                    #add nulls to budget_caps if budgets is longer
-                    if len(budgets) > len(og_value):
-                        for _ in range(len(budgets) - len(og_value)):
-                            og_value.append('null')
-                    #arbitrarily remove values off the end of budget_caps if it's longer
-                    else:
-                        for _ in range(len(og_value) - len(budgets)):
-                            og_value.pop()
+        if overcapAmt(next_budget,overcap) == 0:
+            print(f"The {next_budget} budget is now capped at {findBudgetCap(next_budget)}.")
 
-                #show existing data
-                print("The current budget caps are as follows:")
-                for i, el in enumerate(og_value):
-                    print(f"{budgets[i]}\t{el}")
+        return transactions
 
-                check = input("Would you like to change any of these caps? Y/N ").strip().lower()
-                if check not in {'y','yes','yee'}:
-                    continue#move on to next to_change variable
-                
-                inp = input("Which budgets would you like to change the cap for? this includes "\
-                            "adding, removing, and changing a cap. Please separate by commas, or "\
-                            "type 'all' to change all budget caps: ").strip().lower()
-                if inp == 'exit':
-                    print("Exiting paycheck split editing...")
-                    continue#move to next variable in to_change
-                elif inp == 'all':
-                    budgs = budgets[:]
-                else:
-                    #correct/check input
-                    budgs = []
-                    for budg in inp.split(","):
-                        budg = checkInput(budg.strip(), 'budget')
-                        if budg == 'exit':
-                            print("Removing this budget from editing...")
-                        if budg not in {'null', 'exit'}:
-                            budgs.append(budg)
-                
-                #build list of budget indices to change
-                budg_indices = []
-                for budg in budgs:
-                    budg_indices.append(budgets.index(budg))
 
-                #go through each and ask for new caps
-                new_caps = og_value[:]
-                for i, budg_index in enumerate(budg_indices):
-                    new = input(f"What cap would you like to set for {budgs[i]}? Type 'null' for no cap. ").strip().lower()
-                    if new == 'exit':
-                        new_caps = og_value[:]#reset to beginning
-                        print("Exiting budget caps editing...")
-                        break#still want to reset to str 'null' if all els are 'null'
-                    
-                    if new != 'null':
-                        new = checkInput(new, 'amount')
-                        #check if the cap is lower than the current amount
-                        current_amt = add(totalBudget(budgs[i],filepathToTransactionList()))
-                        if new < current_amt:
-                            uncap = input(f"The cap you set is lower than the current total in {budgs[i]}! Type "\
-                                  "'yes' to transfer the excess balance to another budget, or 'no' to "\
-                                  "manually keep it higher than the budget. Note that moving this "\
-                                  "balance may overcap the destination budget. Y/N ").strip().lower()
-                            if uncap == 'exit':
-                                new_caps = og_value[:]
-                                print("Exiting budget caps editing...")
-                                break
-                            elif uncap in {'y','yes','yee'}:
-                                to_budget = input("Which budget would you like to move it to? ").strip().lower()
-                                to_budget = checkInput(to_budget, 'budget')
-                                if to_budget == 'exit':
-                                    new_caps = og_value[:]
-                                    print("Exiting budget caps editing...")
-                                    break
+def nameProblem(name):
+    """
+    gives what's wrong with a transaction name, or None if it's fine
+    """
+    if "," in name:
+        return "Please do not use commas in the name."
+    if len(name) > 27:
+        return "That name is too long. Please keep it 27 characters or less."
+    return None
 
-                                overcap_amt = current_amt - new
+def checkInput(inp,typ,all_bool=False):
+    """
+    get correct input for various types of entry fields
 
-                                writeTransfer([today,"budget cap transfer",'null',budgs[i],-1*overcap_amt],
-                                              [today,"budget cap transfer",'null',to_budget,overcap_amt])
+    Parameters
+    ----------
+    inp : str
+        user input
+    typ : str
+        must be in list: ["date","name","account","budget","amount","filter","income_filter","csv"]
+    all_bool : bool
+        True if "all" is a valid input (in which case, returns list of all budgets/accounts)
 
+    Returns
+    -------
+    str in correct given format
 
-                    new_caps[budg_index] = new
+    """    
+    #if it's 'exit', return None
+    if inp in {'exit', 'n', 'cancel', 'go away!'}:
+        print("Okay, backing up...")
+        return None
+    
+    if typ == "date":
+        parsed = parseDate(inp)
+        while parsed is None:
+            if inp.strip().lower() in {'exit', 'n', 'cancel', 'go away!'}:
+                print("Okay, backing up...")
+                return None
+            if '-' not in inp:
+                print("Please enter a date with the numbers separated by hyphens!")
+            else:
+                print("You've entered an invalid date. Please enter a date in the format (YYYY-)MM-DD.")
+            inp = input("Date (MM-DD): ")
+            parsed = parseDate(inp)
+        inp = parsed
+    
+    elif typ == "name":
+        problem = nameProblem(inp)
+        while problem is not None:
+            print(problem)
+            inp = input("Name: ")
+            problem = nameProblem(inp)
+    
+    elif typ == "account":
+        accounts = presets['accounts']
+        inp = inp.lower()
+        
+        while inp not in presetLookup.accountSet and inp != "null":
+            #check for all
+            if inp == "all" and all_bool:
+                inp = accounts #will return a list of all account names
+                break
+            
+            if inp == "exit":
+                break
 
-                #add check at the end - if every value in the list is 'null', reset whole variable to 'null'
-                if new_caps == ['null' for _ in range(len(new_caps))]:
-                    presets['budget_caps'] = 'null'
+            acct_list_str = ""
+            for acct in accounts:
+                acct_list_str += acct
+                acct_list_str += ", "
+            print(f"{inp} is not a valid account. The valid accounts are {acct_list_str}and null.")
+            inp = input("Account: ").strip().lower()
+            
+    elif typ == "budget":
+        budgets = presets['budgets']
+        inp = inp.lower()
+        while inp not in presetLookup.budgetSet and inp != "null":
+            #check for all
+            if inp == "all" and all_bool:
+                inp = budgets #will return a list of all budget names
+                break
 
-                else:
-                    presets['budget_caps'] = new_caps
+            if inp == 'exit':
+                break
 
-                    #check if there is an overflow budget set
-                    if 'overflow_budget' not in to_change[i:]:
-                        if presets['overflow_budget'] not in presets['budgets'] or presets['overflow_budget'] == '':
-                            print("Your current overflow budget is invalid. To avoid potential errors, you will need to set one now.")
-                            to_change.insert(i+1, 'overflow_budget')
+            budget_list_str = ""
+            for budget in budgets:
+                budget_list_str += budget
+                budget_list_str += ", "
+            print(f"{inp} is not a valid budget. The valid budgets are {budget_list_str}and null.")
+            inp = input("Budget: ")
+            inp = inp.lower()
+    
+    elif typ == "amount":
+        while type(inp) == str:
+            if inp == 'exit':
+                break
+            try:
+                inp = float(inp)
+            except ValueError:
+                print("That is an invalid entry. Please enter a number.")
+                inp = input("Amount: ")
+               
+    elif "filter" in typ:#filter or income_filter
+        inp = inp.lower()
+        if typ == "income_filter":
+            filter_list = ["date","source","none"]
+        else:
+            filter_list = ["budget","account","date","name","none"]
+            
+        string_list = ""
+        for _ in filter_list[:-1]:
+            string_list += _
+            string_list += ", "
+            
+        while inp not in filter_list:
+            print(f"{inp} is not a valid filter type. Please choose {string_list}or none.")
+            inp = input("Filter: ")
+            inp = inp.lower()
+    
+    elif typ == "csv":
+        found = False
 
-        elif not isinstance(og_value, list):
-            #if value is a single item
-            #includes everything except accounts, budgets, paycheck_split, and employer
+        while not found:
+            if inp.lower() == 'exit':
+                found == True
+                print("Exiting...")
+                break
 
-            csv_settings = {"transactions_file", "balance_checks_file", "income_record_file"}
+            #add .csv extension if not there
+            if inp[-4:] != ".csv":
+                inp = inp + ".csv"
 
-            #if it's a csv filename, print possible files in the local directory
-            if variable in csv_settings:
-                files = glob.glob("*.csv")
-                print("The available csv files in the current folder are:")
-                for file in files:
-                    if file != "presets.csv":#don't want to list itself as an option
-                        print("\t",file)
+            try:
+                f = open(inp)
+                f.close()
+                found = True
+    
+            except FileNotFoundError:
+                print(f"{inp} was not found in the local file. Please enter the name of a csv file",\
+                    "or filepath in the local directory.")
+                inp = input("Filename: ").strip()
+    
+    return inp
 
-            print(f'Current setting is {og_value}.')
-            new = input(f'Please enter the new {variable.replace("_", " ")}: ').strip()
+def askEach(category):
+    """
+    asks for an amount for each value in an iterable, returns a list of values in 
+    the corresponding order to the input iterable
+    
+    Parameters
+    ----------
+    category : iter
+        an iterable for which each element will be asked a value
+        
+    Returns
+    -------
+    list of values given by user
+    """
+    values = []
+    for each in category:
+        inp = input(f"How much is in {each}? ")
+        inp = checkInput(inp, 'amount')
+        values.append(inp)
+    return values
 
-            if new.lower() == 'exit':
-                print(f"Exiting {variable.replace('_',' ')} editing...")
-                continue#cancel just the current variable
+def init():
+    """
+    creates initializing transactions in a blank csv file; makes sure account and budget 
+    balances are what's given
+    
+    Returns
+    -------
+    None
+    """
+    #DEBUG - exit doesn't work properly in this function
 
-            #change checkInput type depending on the variable
-            #str
-            if isinstance(og_value, str):
-                if variable in csv_settings:
-                    inputType = 'csv'
-                elif variable == 'paycheck_account':
-                    inputType = 'account'
-                elif variable == 'round_budget' or variable == 'overflow_budget':
-                    inputType = 'budget'
-            #int
-            else:
-                inputType = 'amount'
+    #ask for values for accounts and for budgets
+    printLine()
+    print("Okay! First thing you need to do is let me know how much money is in each",\
+          "account and budget.")
+    
+    print("First are your accounts.")
+    acct_amts = askEach(presets['accounts'])
+    printLine()
+    print("Now are the budgets.")
+    budg_amts = askEach(presets['budgets'])
 
-            #make input lowercase
-            new = new.lower()
+    #check for budgets that are over the cap
+    if isinstance(presets["budget_caps"],list):
+        for budget_i, budget in enumerate(presets['budgets']):
+            cap = findBudgetCap(budget)
+            if cap != 'null':
+                amount = budg_amts[budget_i]
+                if cap < amount:
+                    printLine()
+                    print(f"The {budget} budget has a cap of {cap}, and your given "\
+                          f"amount of {amount} exceeds that.")
+                    what_do = input(f"What would you like to do? You can enter 1 to "\
+                                    "ignore the set budget cap and allow the cap to "\
+                                    "be exceeded, enter 2 to only add an amount up to "\
+                                    "the cap and add the rest to a different budget, "\
+                                    "or enter 3 to cancel doing init entirely. 1/2/3 ").strip().lower()
+                    while what_do not in {"1","2","3","ignore","exit","cancel"}:
+                        what_do = input("This is not a valid options. Please choose 1, "\
+                                        "2, or 3 from the options listed above. 1/2/3 ").strip().lower()
+                    
+                    if what_do in {"3","exit","cancel"}:
+                        print("Okay, exiting init...")
+                        return
+                    
+                    elif what_do in {"1","ignore"}:
+                        print("This budget's cap will be ignored.")
+                        continue#next budget in for loop
 
-            new_value = checkInput(new, inputType)
+                    elif what_do in {"2"}:
+                        print(f"Okay, {cap} will be added to {budget}.")
+                        budg_amts[budget_i] = cap
 
-            #making sure it's not already set for another csv variable
-            if variable in csv_settings:
-                #create list of other filenames already set
-                set_filenames = []
-                for preset in csv_settings:
-                    #not this variable, and not going to be changed this run
-                    if preset not in to_change[i:]:
-                        set_filenames.append(presets[preset])
-                
-                #if already a set file, they need to put in a different file
-                while new_value in set_filenames:
-                    new_value = input("This file is already being used for another preset! "\
-                        "Please input a valid file not being used, or type 'exit' to move on. ").lower().strip()
-                    if new_value == 'exit':
-                        print(f"Exiting {variable.replace('_',' ')} editing...")
-                        break
-                    new_value = checkInput(new_value, 'csv')
+                        overcap_amt = amount - cap
+                        next_budget = input("Which budget would you like the remaining "\
+                                            f"amount of {overcap_amt} to be added to? ").strip().lower()
+                        next_budget = checkInput(next_budget,"budget")
 
-            if new_value != 'exit':
-                presets[variable] = new_value
+                        handled = False
+                        while not handled:
+                            next_budget_i = presetLookup.budgetIndex[next_budget]
 
-        else:#value is a list
+                            #if budget has already been checked by this loop, must check now
+                            if next_budget in presets['budgets'][:budget_i]:
+                                next_budget_amt = budg_amts[next_budget_i]
+                                next_budget_cap = findBudgetCap(next_budget)
+
+                                if next_budget_amt + overcap_amt > next_budget_cap:
+                                    if next_budget_amt >= next_budget_cap:#already capped
+                                        print("This budget is already capped!")
+                                    else:
+                                        print(f"This will overcap the {next_budget} budget!")
+
+                                    add_anyway = input("Would you like to add anyway? Y/N ").strip().lower()
+                                    if add_anyway in {'y','yes','yee'}:
+                                        budg_amts[next_budget_i] += overcap_amt
+                                        handled = True
+
+                                    elif add_anyway == 'exit':
+                                        print("Exiting init...")
+                                        return
+                                    
+                                    else:
+                                        next_budget = input("Please choose another budget. ").strip().lower()
+                                        next_budget = checkInput(next_budget,"budget")
+                                        #then it'll rerun the while loop with the new next_budget
+
+                                else:#does not overcap next budget
+                                    budg_amts[next_budget_i] += overcap_amt
+                                    handled = True
+
+                            #if budget is yet to be checked by this loop, just add it
+                            else:
+                                budg_amts[next_budget_i] += overcap_amt
+                                handled = True
+    
+    #make sure total for accounts == total for budgets
+    sum_acct = round(sum(acct_amts), 2)
+    sum_budg = round(sum(budg_amts), 2)
+    while sum_acct != sum_budg:
+        print("The amounts in your accounts is not equal to the amounts in your budgets.",\
+              f"Total in accounts is {sum_acct}, while total in budgets is {sum_budg}.",\
+              "Please try again.")
+        #ask again
+        print("First are your accounts.")
+        acct_amts = askEach(presets['accounts'])
+        printLine()
+        print("Now are the budgets.")
+
+        budg_amts = askEach(presets['budgets'])
+        sum_acct = round(sum(acct_amts), 2)
+        sum_budg = round(sum(budg_amts), 2)
+    
+    #create transactions to init accounts
+    rows = []
+    for i, amt in enumerate(acct_amts):
+        #[date, name, account, budget, amount]
+        rows.append([today, 'init', presets['accounts'][i], 'null', amt])
+    
+    #create transactions to init budgets (each one a transfer from the null budget)
+    for i, amt in enumerate(budg_amts):
+        #[date, name, account, budget, amount]
+        rows.append([today, 'init', 'null', 'null', -1*amt])
+        rows.append([today, 'init', 'null', presets['budgets'][i], amt])
+
+    #one write, so a crash can't leave the file half initialized
+    logOperation("init", [("transactions", presets['transactions_file'], rows)])
+    
+    print("It's all added to the file now!")
+
+def checkBalances(transactionList, checkFilepath=None):
+    """
+    checks that personal records and bank records match, from list of transactions
+    and filepath for the file to be written to
+    
+    Parameters
+    ----------
+    transactionList : list
+        list of transaction objects that represents the transactions csv file
+    checkFilepath : string, optional
+        filepath for the check balances csv file
+        default is the checkFilename str found in presets dict
+
+    Returns
+    -------
+    None.
+    """
+    if checkFilepath is None:
+        checkFilepath = presets['balance_checks_file']
+    works = True
+    
+    #loop until the user doesn't exit
+    repeat = True
+    while repeat:
+        repeat = False
+        checks = []#rows for the check file, [date, account, amount, match?]
+        #go through each account (except cash)
+        accounts = presets['accounts']
+        for i, acct in enumerate(accounts):
+            #don't check cash every week (it has its own function)
+            if acct == 'cash':
+                continue
+            
+            #bank amt
+            bal = input(f"Please enter the amount in the {accounts[i]} account (if you previously "\
+                        "typed a number wrong, you can type 'exit' now to restart): ")
+            bal = checkInput(bal,"amount")
+            if bal is None:
+                repeat = True
+                break
+            
+            #add total
+            totalList = totalAccount(accounts[i],transactionList)
+            total = add(totalList)
+            
+            #check for match
+            if bal != total:
+                works = False
+                print("Records do not match.\nTotal in records is", total)
+            else:
+                checks.append([today, accounts[i], bal, True])
+                print("Records match")
+    
+    #write to file
+    if works:
+        appendCsvRows(checkFilepath, checks)
+
+
+def checkCash(checkFilepath=None):
+    """
+    checks the the counted cash total is the same as recorded
+
+    Parameters
+    ----------
+    checkFilepath : str, optional
+        filepath the the csv with check records. 
+        The default is the str associated checkFilename in presets dict.
+
+    Returns
+    -------
+    None.
+
+    """
+    if checkFilepath is None:
+        checkFilepath = presets['balance_checks_file']
+    #get transaction list
+    transactionList = filepathToTransactionList()
+    
+    works = True
+    
+    cashBal = float(input("Please enter the amount you counted in cash: "))
+    cashBal = checkInput(cashBal,"amount")
+    
+    cashTotalList = totalAccount("cash", transactionList)
+    cashTotal = add(cashTotalList)
+    
+    if cashBal != cashTotal:
+        works = False
+        print("Records do not match.\nTotal in records is", cashTotal)
+    else:
+        print("Records match")
+        
+    #write to file
+    if works:
+        appendCsvRows(checkFilepath, [[today, "cash", cashBal, True]])
+
+
+def sort(filename=None):
+    """
+    sorts the csv file by date (using built-in pandas mergesort), writes it to the file
+
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the transaction history to be sorted
+        default is the str associated with filepath in the presets dict
+    
+    Returns
+    -------
+    none
+
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    #a background compaction needs the ledger lock to finish, so wait for it before taking it
+    waitForCompaction()
+    with compactionLock(filename), ledgerLock:
+        #fold the journal in first, so the base file has every row
+        mergeJournal(filename)
+        #rewriting changes the bytes of every row, so only remake the hash chain if it's intact
+        intact = os.path.exists(filename + '.chain') and not verifyChain(filename, True)
+
+        #open as pandas
+        file = openFile(filename)
+        
+        #sort by date
+        file = file.sort_values("date",kind="mergesort")
+        
+        #rewrite file
+        atomicWriteCsv(file, filename)
+        if intact:
+            sealChain(filename)
+
+def writeTransaction(line, filename=None):
+    """
+    takes a transaction (as a list) and adds it to the end of a csv file, and sorts file by date
+    
+    Parameters
+    ----------
+    line : list
+        the transaction to be added in form [date, name, account, budget, amount]
+    filename : string, optional
+        the name of the file being written to
+        the default is filename (associated in presets dict)
+
+    Returns
+    -------
+    None
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    writeTransactions([line], filename)
+
+def csvText(rows, lineterminator='\r\n'):
+    """
+    gives rows as the csv text that's appended to a file for them
+    """
+    text = io.StringIO()
+    csv.writer(text, lineterminator=lineterminator).writerows(rows)
+    return text.getvalue()
+
+def cutTornRow(filename):
+    """
+    cuts a file back to the end of its last full line, if a crash left part of a row after
+    it. only for files nothing but this program writes to (a hand edited csv might just be
+    missing its last newline)
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the file
+
+    Returns
+    -------
+    the number of bytes cut off
+    """
+    if not os.path.exists(filename):
+        return 0
+    with open(filename, 'rb+') as file:
+        size = file.seek(0, os.SEEK_END)
+        end = size
+        #read backwards a block at a time until the last newline
+        while end > 0:
+            start = max(0, end - 65536)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b'\n')
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            file.truncate(end)
+            file.flush()
+            os.fsync(file.fileno())
+    return size - end
+
+def writeTransactions(lines, filename=None):
+    """
+    takes a list of transactions (as lists) and appends them all to the csv file's journal
+    in one fsynced write. the journal is merged into the date sorted csv by compactJournal,
+    in the background once it passes journalThreshold. if the REPL is a thin client, the 
+    daemon does the write
+    
+    Parameters
+    ----------
+    lines : list
+        nested list of transactions in form [date, name, account, budget, amount]
+    filename : string, optional
+        the name of the file being written to
+        the default is filename (associated in presets dict)
+
+    Returns
+    -------
+    None
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    if daemonClient is not None and filename == presets['transactions_file']:
+        daemonClient.request('write', rows=lines)
+        return
+
+    with ledgerLock:
+        #a crash partway through an earlier append can leave part of a row, which the
+        # new rows would be glued onto
+        cutTornRow(filename + '.journal')
+        stampBefore = fileStamp(filename)
+        if not os.path.exists(filename + '.chain'):
+            sealChain(filename)#first write since the hash chain was added
+
+        text = csvText(lines)
+        with open(filename + '.journal', 'a', newline='', encoding='utf-8') as journal:
+            journal.write(text)
+            journal.flush()
+            os.fsync(journal.fileno())
+        appendChain(filename, text.encode('utf-8'))
+
+        updateBalances(filename, lines, stampBefore)
+        updateRollup(filename, lines, stampBefore)
+        updateFingerprints(filename, lines, stampBefore)
+        updateNameIndex(filename, lines, stampBefore)
+
+        if os.path.getsize(filename + '.journal') > journalThreshold:
+            startCompaction(filename)
+
+@contextlib.contextmanager
+def compactionLock(filename, wait=True):
+    """
+    holds the ledger's lock file for as long as the with block runs, so only one compaction
+    of it (or sort, or crash cleanup) runs at a time, across threads and processes (the 
+    daemon and the REPLs using the same files). always taken before the ledger lock
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the base transactions csv
+    wait : bool, optional
+        False to not wait if it's held elsewhere. default is True
+
+    Yields
+    ------
+    True if the lock is held, False if wait is False and it's held elsewhere
+    """
+    with open(filename + '.lock', 'a') as lockFile:
+        try:
+            fcntl.flock(lockFile, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+def waitForCompaction():
+    """
+    waits for this process's background compaction to finish, if one is running
+    """
+    if compactionThread is not None:
+        compactionThread.join()
+
+def compactJournal(filename=None):
+    """
+    merges the journal into the date sorted base csv with a streaming merge by date, 
+    writes the new base file atomically and removes the merged journal. new rows can 
+    keep being appended while it runs: the journal is swapped out first, and the ledger 
+    lock is only held for the swaps at the start and end. the compaction lock is held 
+    the whole time, so a second compaction waits for this one instead of sharing its files
+
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the base transactions csv
+        the default is the global filepath from presets
+
+    Returns
+    -------
+    dict of stats, {'rows': rows merged from the journal, 'seconds': total time, 
+    'rows_per_s': base+journal rows written per second, 'pause_ms': time writers were blocked,
+    'chain': 'intact' if the hash chain checked out and was remade, 'broken' if it didn't 
+    (it's left as is, for verifyChain to report), 'none' if there isn't one},
+    or None if there was nothing to compact
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    with compactionLock(filename):
+        return mergeJournal(filename)
+
+def mergeJournal(filename):
+    """
+    does compactJournal, for callers that already hold the compaction lock
+    """
+    compacting = filename + '.compacting'
+    journal = filename + '.journal'
+    start = time.perf_counter()
+
+    #swap the journal out, unless a compaction that didn't finish left one to merge
+    with ledgerLock:
+        if not os.path.exists(compacting):
+            if not os.path.exists(journal) or os.path.getsize(journal) == 0:
+                return None
+            os.replace(journal, compacting)
+    pause = time.perf_counter() - start
+
+    #the rows go through as bytes, so the hash chain can be checked on the way. the merge
+    # puts them in a new order, so if the chain is intact it's remade for the new order
+    chained = os.path.exists(filename + '.chain')
+    checkpoints = readChain(filename) if chained else []
+    oldChain = ledgerChain(expected=checkpoints)
+
+    #the journal is small, sort it in memory. the base is already sorted, so it's streamed
+    with open(compacting, 'rb') as segment:
+        journalLines = segment.readlines()
+    journalRows = sorted(csv.reader(line.decode('utf-8') for line in journalLines), key=lambda row: row[0])
+
+    written = 0
+    with open(filename, 'rb') as base, \
+         open(filename + '.compact', 'w', newline='', encoding='utf-8') as merged:
+        header = base.readline().decode('utf-8')
+        reader = csv.reader(line.decode('utf-8') for line in oldChain.feed(base))
+        writer = csv.writer(merged)
+        writer.writerow(next(csv.reader([header])))
+        #base rows first on ties, so same day rows keep the order they were written in
+        for row in heapq.merge(reader, journalRows, key=lambda row: row[0]):
+            writer.writerow(row)
+            written += 1
+        merged.flush()
+        os.fsync(merged.fileno())
+    for _ in oldChain.feed(journalLines):
+        pass
+    intact = chained and oldChain.problem is None and oldChain.state() in checkpoints
+
+    newChain = ledgerChain()
+    if intact:
+        with open(filename + '.compact', 'rb') as merged:
+            merged.readline()#header
+            for _ in newChain.feed(merged):
+                pass
+
+    #swap the merged file in. the journal is renamed before the base is replaced, so a crash
+    # in between can be finished by recoverCompaction without duplicating or losing rows
+    swapStart = time.perf_counter()
+    with ledgerLock:
+        if intact:
+            #rows written while the merge ran come after the merged ones
+            if os.path.exists(journal):
+                with open(journal, 'rb') as segment:
+                    for _ in newChain.feed(segment):
+                        pass
+            writeChain(filename + '.chain.compact', newChain.checkpoints + [newChain.state()])
+        os.replace(compacting, filename + '.merged')
+        os.replace(filename + '.compact', filename)
+        if intact:
+            os.replace(filename + '.chain.compact', filename + '.chain')
+        os.remove(filename + '.merged')
+    pause += time.perf_counter() - swapStart
+
+    seconds = time.perf_counter() - start
+    stats = {'rows': len(journalRows), 'seconds': seconds, 'rows_per_s': written/seconds, 'pause_ms': pause*1000,
+             'chain': 'intact' if intact else 'broken' if chained else 'none'}
+    compactionStats.append(stats)
+    return stats
+
+def startCompaction(filename=None):
+    """
+    starts compactJournal on a background thread, unless one is already running
+    """
+    global compactionThread
+    with ledgerLock:
+        if compactionThread is not None and compactionThread.is_alive():
+            return
+        compactionThread = threading.Thread(target=compactJournal, args=(filename,))
+        compactionThread.start()
+
+def recoverCompaction(filename=None):
+    """
+    cleans up after a compaction that was interrupted by a crash. if the journal had
+    already been marked as merged, the merged file is swapped in; otherwise the partial 
+    merged file is thrown away (its journal is still read, and merged next time)
+
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the base transactions csv
+        the default is the global filepath from presets
+
+    Returns
+    -------
+    None.
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    with compactionLock(filename, wait=False) as locked:
+        #if it's held, a compaction is still running (in the daemon), so there's nothing to clean up
+        if locked:
+            cleanCompaction(filename)
+
+def cleanCompaction(filename):
+    """
+    does recoverCompaction, for callers that hold the compaction lock
+    """
+    if os.path.exists(filename + '.merged'):
+        if os.path.exists(filename + '.compact'):
+            os.replace(filename + '.compact', filename)
+        if os.path.exists(filename + '.chain.compact'):
+            os.replace(filename + '.chain.compact', filename + '.chain')
+        os.remove(filename + '.merged')
+    else:
+        for leftover in (filename + '.compact', filename + '.chain.compact'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+class ledgerChain:
+    """
+    rolling hash over the rows of a ledger, in file order (the base csv after its header, 
+    then the journal segments). each row's hash is the hash of the row before it and the
+    row itself, so changing, adding or removing any row changes the hash of every row after
+    it. the chain file keeps (rows, bytes, hash) checkpoints: one after every write, and one 
+    every chainInterval rows when the whole chain is remade
+    """
+    def __init__(self, state=(0, 0, '0'*32), expected=()):
+        self.rows, self.offset, digest = state
+        self.digest = bytes.fromhex(digest)
+        self.checkpoints = []#made every chainInterval rows
+        #checkpoints to compare against as the rows go by, and the first one that didn't match
+        self.expected = [checkpoint for checkpoint in expected if checkpoint[0] > self.rows][::-1]
+        self.problem = None
+    def state(self):
+        return (self.rows, self.offset, self.digest.hex())
+    def feed(self, lines):
+        #hashes lines (bytes, with their line endings) as they're passed on
+        for line in lines:
+            self.offset += len(line)
+            text = line.rstrip(b'\r\n')
+            if text.strip():#blank lines aren't rows
+                self.digest = hashlib.blake2b(self.digest + text, digest_size=16).digest()
+                self.rows += 1
+                if self.rows % chainInterval == 0:
+                    self.checkpoints.append(self.state())
+                while self.expected and self.expected[-1][0] <= self.rows:
+                    checkpoint = self.expected.pop()
+                    if self.problem is None and checkpoint != self.state():
+                        self.problem = checkpoint
+            yield line
+
+def readChain(filename):
+    """
+    gives the checkpoints in a ledger's chain file, as (rows, bytes, hash) tuples in order,
+    or an empty list if it doesn't have one
+    """
+    try:
+        with open(filename + '.chain', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            next(reader, None)#header
+            return [(int(rows), int(offset), digest) for rows, offset, digest in reader]
+    except FileNotFoundError:
+        return []
+
+def writeChain(chainFilepath, checkpoints):
+    """
+    writes a whole chain file atomically and fsyncs it
+    """
+    with open(chainFilepath + '.tmp', 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(["rows", "bytes", "hash"])
+        writer.writerows(checkpoints)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(chainFilepath + '.tmp', chainFilepath)
+
+def chainStream(filename, offset=0):
+    """
+    gives the rows of a ledger as lines of bytes in file order (see ledgerChain), starting
+    offset bytes in
+    """
+    for path in [filename] + ledgerSegments(filename):
+        with open(path, 'rb') as file:
+            if path == filename:
+                file.readline()#header
+            size = os.fstat(file.fileno()).st_size - file.tell()
+            if offset >= size:
+                offset -= size
+                continue
+            file.seek(offset, os.SEEK_CUR)
+            offset = 0
+            yield from file
+
+def sealChain(filename=None):
+    """
+    remakes a ledger's hash chain from the file as it is now, trusting every row in it.
+    done on the first write to a ledger without a chain, and by sort, otherwise only to
+    accept the file after verifyChain has reported changes
+
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+
+    Returns
+    -------
+    the last checkpoint, (rows, bytes, hash)
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    with ledgerLock:
+        chain = ledgerChain()
+        for _ in chain.feed(chainStream(filename)):
+            pass
+        checkpoints = [chain.state()] if not chain.checkpoints or chain.checkpoints[-1] != chain.state() else []
+        writeChain(filename + '.chain', chain.checkpoints + checkpoints)
+        chainVerified.pop(filename, None)
+    return chain.state()
+
+def appendChain(filename, data):
+    """
+    adds rows just appended to the journal to the hash chain, with a checkpoint after them
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the transactions csv
+    data : bytes
+        exactly what was appended to the journal
+
+    Returns
+    -------
+    None.
+    """
+    #only the last checkpoint is needed, so just the end of the chain file is read
+    with open(filename + '.chain', 'rb+') as file:
+        size = file.seek(0, os.SEEK_END)
+        file.seek(max(0, size - 256))
+        rows, offset, digest = file.read().decode('utf-8').strip().split('\n')[-1].split(',')
+        chain = ledgerChain((int(rows), int(offset), digest))
+        for _ in chain.feed(data.splitlines(keepends=True)):
+            pass
+        file.write((",".join(str(value) for value in chain.state()) + "\n").encode('utf-8'))
+        file.flush()
+        os.fsync(file.fileno())
+
+chainVerified = dict()#{filename: last checkpoint verifyChain found intact}
+
+def verifyChain(filename=None, full=False):
+    """
+    checks that no row of the ledger has been changed, added or removed other than by this
+    program, by rehashing the rows and comparing against the chain's checkpoints. normally
+    only rehashes the rows after the last checkpoint it verified; full rehashes every row
+
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    full : bool, optional
+        True to rehash the whole ledger instead of just the new rows. default is False
+
+    Returns
+    -------
+    list of problems found (str), empty if there are none
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    with ledgerLock:#so a compaction can't swap the files out partway through
+        checkpoints = readChain(filename)
+        if not checkpoints:
+            return ["The transaction history doesn't have a hash chain yet (one is made on the next write)"]
+        verified = chainVerified.get(filename)
+        if full or verified not in checkpoints:
+            verified = (0, 0, '0'*32)
+        chain = ledgerChain(verified, checkpoints)
+        for _ in chain.feed(chainStream(filename, verified[1])):
+            if chain.problem is not None:
+                break
+
+    if chain.problem is not None:
+        before = [checkpoint[0] for checkpoint in checkpoints if checkpoint[0] < chain.problem[0]]
+        return [f"Rows {before[-1] + 1 if before else 1} to {chain.problem[0]} of the transaction history "\
+                 "(in file order) have been changed or removed since they were written"]
+    if chain.expected:
+        return [f"The transaction history ends at row {chain.rows}, but {chain.expected[0][0]} rows were written"]
+    if chain.state() != checkpoints[-1]:
+        return [f"The transaction history has {chain.rows - checkpoints[-1][0]} rows at the end that weren't "\
+                 "written by this program"]
+    chainVerified[filename] = checkpoints[-1]
+    return []
+
+def atomicWriteCsv(file, filename, **kwargs):
+    """
+    writes a dataframe to a csv without ever leaving a half written file: writes to a
+    temporary file, fsyncs it, then renames it over the original
+
+    Parameters
+    ----------
+    file : pandas dataframe
+        the data to write
+    filename : str
+        filepath of the csv to replace
+    **kwargs
+        passed on to DataFrame.to_csv
+
+    Returns
+    -------
+    None.
+    """
+    tmpFilepath = filename + '.tmp'
+    file.to_csv(tmpFilepath, **kwargs)
+    with open(tmpFilepath, 'rb+') as tmp:
+        os.fsync(tmp.fileno())
+    os.replace(tmpFilepath, filename)
+
+def writeIncome(lines, paycheckFile=None):
+    """
+    adds income records (as lists) to the end of the income csv
+
+    Parameters
+    ----------
+    lines : list
+        nested list of income records in the form [date, amount, source]
+    paycheckFile : str, optional
+        filepath to the income csv
+        the default is income_record_file from presets dict
+
+    Returns
+    -------
+    None.
+    """
+    if paycheckFile is None:
+        paycheckFile = presets['income_record_file']
+    stampBefore = fileStamp(paycheckFile)
+    appendCsvRows(paycheckFile, lines)
+    updateRollup(paycheckFile, lines, stampBefore, True)
+
+def appendCsvRows(filename, rows):
+    """
+    appends rows to the end of a csv and fsyncs it, without reading the rest of the file.
+    for the files that only ever grow (income record, balance checks)
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the csv
+    rows : list
+        nested list of rows, in the file's column order
+
+    Returns
+    -------
+    None.
+    """
+    endLine(filename)
+    with open(filename, 'a', newline='', encoding='utf-8') as file:
+        file.write(csvText(rows, '\n'))
+        file.flush()
+        os.fsync(file.fileno())
+
+def endLine(filename):
+    """
+    adds a newline to the end of a file if it doesn't end with one (a file edited by hand
+    might not), so rows appended to it start on their own line
+    """
+    with open(filename, 'a+b') as file:
+        file.seek(0, os.SEEK_END)
+        if file.tell() > 0:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n':
+                file.write(b'\n')
+
+dateIndexCache = dict()#{filename: [fileStamp, inode, bytes indexed, last bytes indexed, sorted list of (date, byte offset of line)]}
+
+def loadDateIndex(filename):
+    """
+    gives an index of the byte offset of every row in an append only csv, sorted by date.
+    if the file has only been appended to since the last call (same file, and the end of 
+    what was indexed is unchanged), only the new rows are read; otherwise it's reindexed
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the csv, with the date in the first column
+
+    Returns
+    -------
+    sorted list of (date, byte offset) tuples
+    """
+    stamp = fileStamp(filename)
+    cached = dateIndexCache.get(filename)
+    if cached is not None and cached[0] == stamp:
+        return cached[4]
+
+    with open(filename, 'rb') as file:
+        stat = os.fstat(file.fileno())
+        if cached is not None and cached[1] == stat.st_ino and cached[2] <= stat.st_size:
+            file.seek(cached[2] - len(cached[3]))
+            appended = file.read(len(cached[3])) == cached[3]
+        else:
+            appended = False
+        if not appended:
+            #a different file, or it was rewritten: start over
+            cached = [None, stat.st_ino, 0, b'', []]
+            dateIndexCache[filename] = cached
+
+        file.seek(cached[2])
+        offset = cached[2]
+        if offset == 0:
+            offset += len(file.readline())#header
+        for line in file:
+            if not line.endswith(b'\n'):
+                break#row still being written, index it next time
+            if line.strip():
+                insort(cached[4], (line.split(b',', 1)[0].decode('utf-8-sig'), offset))
+            offset += len(line)
+        file.seek(max(0, offset - 64))
+        cached[3] = file.read(offset - max(0, offset - 64))
+    cached[2] = offset
+    cached[0] = stamp
+    return cached[4]
+
+def readDateRange(filename, start, end):
+    """
+    reads only the rows of an append only csv from start date to end date (inclusive), 
+    using the date index to seek straight to them
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the csv, with the date in the first column
+    start : str, format YYYY-MM-DD
+        first date to include
+    end : str, format YYYY-MM-DD
+        last date to include
+
+    Returns
+    -------
+    nested list of the rows (as str) in date order
+    """
+    index = loadDateIndex(filename)
+    lo = bisect_left(index, (start,))
+    hi = bisect_right(index, (end, float('inf')))
+    rows = []
+    with open(filename, 'rb') as file:
+        for _, offset in index[lo:hi]:
+            file.seek(offset)
+            rows.append(file.readline().decode('utf-8'))
+    return list(csv.reader(rows))
+
+@contextlib.contextmanager
+def walLock():
+    """
+    holds the write-ahead log's lock file for as long as the with block runs, so one 
+    operation is logged, done, committed and cleared from the log before another process 
+    (e.g. another REPL using the same daemon and files) can log or recover one. always 
+    taken before the compaction lock and the ledger lock
+    """
+    with open(walFilepath + '.lock', 'a') as lockFile:
+        fcntl.flock(lockFile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+def appendLogRecord(record):
+    """
+    appends one json record to the write-ahead log and fsyncs it before returning
+    """
+    with open(walFilepath, 'a', encoding='utf-8') as log:
+        log.write(json.dumps(record) + '\n')
+        log.flush()
+        os.fsync(log.fileno())
+
+def applyLoggedWrite(kind, filename, rows):
+    """
+    does one of the writes of a logged operation
+    """
+    if kind == "income":
+        writeIncome(rows, filename)
+    elif kind == "rules":
+        #rows is the whole rules table, so this write is safe to redo
+        atomicWriteCsv(pandas.DataFrame(rows, columns=recurringColumns), filename, index=False)
+    elif kind == "history":
+        appendHistory(rows[0], filename)
+    else:
+        writeTransactions(rows, filename)
+
+def appendedFiles(kind, filename):
+    """
+    gives the files a logged write appends to, the one its rows go in first. their sizes
+    are logged with the intent so recoverLog can tell a finished append from a torn one
+    """
+    if kind == "transactions":
+        return [filename + '.journal', filename + '.chain']#the chain is appended after the journal
+    if kind in {"income", "history"}:
+        return [filename]
+    return []
+
+def appendedBytes(kind, rows):
+    """
+    gives exactly what a logged write appends to its first file (see appendedFiles)
+    """
+    if kind == "income":
+        return csvText(rows, '\n').encode('utf-8')
+    if kind == "history":
+        return (json.dumps(rows[0]) + '\n').encode('utf-8')
+    return csvText(rows).encode('utf-8')
+
+def recoverAppend(write):
+    """
+    finishes one append of an interrupted operation, from the file sizes logged with its
+    intent. if all of its rows made it into the file it's left as is; if none or only part
+    of them did (a torn write), the file is cut back to its logged size and the write is redone
+
+    Parameters
+    ----------
+    write : dict
+        the write from the intent record, with 'kind', 'file', 'rows' and 'sizes'
+
+    Returns
+    -------
+    True if it was finished, False if the file has been changed some other way since, so
+    it can't be
+    """
+    kind, filename, rows, sizes = write['kind'], write['file'], write['rows'], write['sizes']
+    target = appendedFiles(kind, filename)[0]
+    size = sizes[target] or 0
+    expected = appendedBytes(kind, rows)
+    tail = b''
+    later = False
+    if os.path.exists(target):
+        if os.path.getsize(target) < size:
+            return False
+        with open(target, 'rb') as file:
+            file.seek(size)
+            tail = file.read(len(expected))
+            later = file.read(1) != b''
+    finished = tail == expected
+    if finished and later:
+        return True#other writes came after it, so it (and what came after it) finished
+    if not finished and (later or not expected.startswith(tail)):
+        return False
+
+    if not finished and os.path.exists(target):
+        with open(target, 'rb+') as file:
+            file.truncate(size)
+            os.fsync(file.fileno())
+    if kind == "transactions":
+        #the chain is put back to match too, then brought up to date with the rows
+        chainFile = filename + '.chain'
+        if sizes[chainFile] is None:
+            if os.path.exists(chainFile):
+                os.remove(chainFile)
+        elif os.path.exists(chainFile):
+            with open(chainFile, 'rb+') as file:
+                file.truncate(sizes[chainFile])
+                os.fsync(file.fileno())
+        chainVerified.pop(filename, None)
+        if not finished:
+            writeTransactions(rows, filename)
+        elif sizes[chainFile] is None:
+            sealChain(filename)
+        else:
+            appendChain(filename, expected)
+    elif not finished:
+        applyLoggedWrite(kind, filename, rows)
+    return True
+
+def logOperation(name, writes, undoable=True):
+    """
+    does an operation that writes to more than one file (or more than once) so that it 
+    can't be left half done by a crash. the whole operation is written to the write-ahead
+    log and fsynced first, along with the state of each file before it's changed. then each
+    write is done, and a commit record is logged at the end. recoverLog finishes any
+    operation that has no commit record. the operation is also added to the operation 
+    history, as part of the same logged operation, so undo can reverse it
+
+    Parameters
+    ----------
+    name : str
+        what the operation is, e.g. "paycheck"
+    writes : list
+        list of writes in order, each a tuple (kind, filename, rows) where kind is 
+        "transactions", "income" or "rules" (the whole recurring table) and rows is a 
+        nested list in that file's column order
+    undoable : bool, optional
+        False to leave it out of the operation history (undo and redo themselves). 
+        default is True
+
+    Returns
+    -------
+    None.
+    """
+    op = f"{time.time_ns()}-{os.getpid()}"
+    #hold the log's lock until the log is cleared, so no other process can clear this
+    # operation's intent or recover it while it's still being done. and hold the ledger
+    # lock so a background compaction can't change a file's stamp between logging the
+    # intent and doing the write
+    with walLock(), ledgerLock:
+        if undoable:
+            #the rules table is rewritten whole, so undo needs the table from before
+            before = {filename: loadRecurring(filename) for kind, filename, rows in writes if kind == "rules"}
+            writes = writes + [("history", historyFilepath, [{'op': op, 'type': 'do', 'name': name, 
+                                                             'writes': writes, 'before': before}])]
+        if not os.path.exists(historyFilepath):
+            open(historyFilepath, 'a').close()#so it has a stamp to log
+        #so the sizes logged are where this operation's rows start
+        for kind, filename, rows in writes:
+            if kind == "transactions" and daemonClient is None:#the daemon does this for its own writes
+                cutTornRow(filename + '.journal')
+            elif kind == "income" and os.path.exists(filename):
+                endLine(filename)
+        appendLogRecord({'op': op, 'type': 'intent', 'name': name,
+                         'writes': [{'kind': kind, 'file': filename, 'rows': rows, 'stamp': list(fileStamp(filename)),
+                                     'sizes': {path: os.path.getsize(path) if os.path.exists(path) else None
+                                               for path in appendedFiles(kind, filename)}}
+                                    for kind, filename, rows in writes]})
+        for kind, filename, rows in writes:
+            applyLoggedWrite(kind, filename, rows)
+        appendLogRecord({'op': op, 'type': 'commit'})
+
+        #nothing left to recover, so the log can start over (keeps recovery cost to one operation)
+        open(walFilepath, 'w').close()
+
+def recoverLog():
+    """
+    finishes operations left incomplete by a crash, from the write-ahead log. an operation
+    with a full intent record and no commit is replayed: each append is finished with
+    recoverAppend, and each other write whose file is still in the state it was before
+    the operation is redone. a torn intent record (crash
+    while logging) is rolled back, since none of its writes were started. only reads the
+    log, so it takes time proportional to the log, not the ledger. waits for an operation
+    another process is in the middle of, so that one isn't taken for a crashed one
+
+    Returns
+    -------
+    int, the number of operations that were replayed
+    """
+    with walLock():
+        recoverCompaction()
+        if not os.path.exists(walFilepath):
+            return 0
+
+        intents = dict()#{op: intent record}, in log order
+        with open(walFilepath, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    #torn record from a crash while logging, nothing after it was written
+                    print("Rolling back an operation that was cut off before it started.")
+                    break
+                if record['type'] == 'intent':
+                    intents[record['op']] = record
+                elif record['type'] == 'commit':
+                    intents.pop(record['op'], None)
+
+        replayed = 0
+        for record in intents.values():
+            print(f"Finishing an interrupted {record['name']} from the write-ahead log.")
+            for write in record['writes']:
+                if not os.path.exists(write['file']):
+                    print(f"{write['file']} no longer exists, so this part is rolled back.")
+                elif appendedFiles(write['kind'], write['file']) and 'sizes' in write:
+                    if not recoverAppend(write):
+                        print(f"{write['file']} has been changed since, so this part is rolled back.")
+                elif fileStamp(write['file']) == tuple(write['stamp']):
+                    #file hasn't changed since the intent was logged, so this write never happened
+                    applyLoggedWrite(write['kind'], write['file'], write['rows'])
+            appendLogRecord({'op': record['op'], 'type': 'commit'})
+            replayed += 1
+
+        open(walFilepath, 'w').close()
+    return replayed
+
+historyCache = dict()#{filename: [fileStamp, list of operations that can be undone, list that can be redone]}
+
+def loadHistory(filename=None):
+    """
+    gives the operation history as two stacks: the operations that can be undone (last one
+    done at the end) and the ones that can be redone (last one undone at the end). only
+    reads the history file if something other than appendHistory has changed it
+
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the history file. default is the global historyFilepath
+
+    Returns
+    -------
+    list with [fileStamp, undo stack, redo stack], each stack a list of 'do' records
+    """
+    if filename is None:
+        filename = historyFilepath
+    if not os.path.exists(filename):
+        return [None, [], []]
+    stamp = fileStamp(filename)
+    cached = historyCache.get(filename)
+    if cached is None or cached[0] != stamp:
+        cached = [stamp, [], []]
+        with open(filename, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    applyHistory(cached, json.loads(line))
+        historyCache[filename] = cached
+    return cached
+
+def applyHistory(history, record):
+    """
+    moves an operation between the undo and redo stacks for one history record
+    """
+    done, undone = history[1], history[2]
+    if record['type'] == 'do':
+        done.append(record)
+        undone.clear()#a new operation means the undone ones can't be redone
+    elif record['type'] == 'undo' and done and done[-1]['op'] == record['op']:
+        undone.append(done.pop())
+    elif record['type'] == 'redo' and undone and undone[-1]['op'] == record['op']:
+        done.append(undone.pop())
+
+def appendHistory(record, filename=None):
+    """
+    appends one record to the operation history and fsyncs it, updating the cached stacks
+    if they were up to date
+
+    Parameters
+    ----------
+    record : dict
+        {'op': operation id, 'type': 'do', 'undo' or 'redo'}, and for 'do' the operation's 
+        'name', 'writes' (as given to logOperation) and 'before' (the rules tables it replaces)
+    filename : str, optional
+        filepath to the history file. default is the global historyFilepath
+
+    Returns
+    -------
+    None.
+    """
+    if filename is None:
+        filename = historyFilepath
+    history = loadHistory(filename)
+    with open(filename, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(record) + '\n')
+        file.flush()
+        os.fsync(file.fileno())
+    applyHistory(history, record)
+    history[0] = fileStamp(filename)
+    historyCache[filename] = history
+
+def reverseWrites(record):
+    """
+    gives the writes that cancel out an operation: every transaction and income row again 
+    with the opposite amount (transactions named "undo <name>"), and the rules tables put 
+    back the way they were
+    """
+    writes = []
+    for kind, filename, rows in record['writes']:
+        if kind == "transactions":
+            writes.append((kind, filename, [[row[0], f"undo {row[1]}", row[2], row[3], -row[4]] for row in rows]))
+        elif kind == "income":
+            writes.append((kind, filename, [[row[0], -row[1], row[2]] for row in rows]))
+        elif kind == "rules":
+            writes.append((kind, filename, record['before'][filename]))
+    return writes
+
+def undo(redo=False):
+    """
+    undoes the last operation that hasn't been undone, by appending rows that reverse it
+    (the ledger isn't rewritten), or redoes the last one undone by writing it again. takes 
+    time proportional to the size of the operation
+
+    Parameters
+    ----------
+    redo : bool, optional
+        True to redo instead. default is False
+
+    Returns
+    -------
+    the 'do' record of the operation that was undone or redone, or None if there wasn't one
+    """
+    with ledgerLock:
+        history = loadHistory()
+        stack = history[2] if redo else history[1]
+        if not stack:
+            return None
+        record = stack[-1]
+        writes = [tuple(write) for write in record['writes']] if redo else reverseWrites(record)
+        kind = 'redo' if redo else 'undo'
+        logOperation(kind, writes + [("history", historyFilepath, [{'op': record['op'], 'type': kind}])], 
+                     undoable=False)
+    return record
+
+def changePresets(filepath=presetsFilepath):
+    """
+    changes the presets csv file, and globals a new dict with the updated presets
+
+    Parameters
+    ----------
+    filepath : str, optional
+        the name of the file that the presets are stored in
+        default is the global presetsFilepath (top of program)
+        
+    Returns
+    -------
+    None.
+
+    """
+    instructions = {
+        "transactions_file": "The transactions file is the file that all transactions are "\
+            "recorded in.",
+        "balance_checks_file": "The balance checks file is the file that records the balance "\
+            "of your accounts every time you check that they match your records, and the "\
+            "date it was checked.",
+        "income_record_file": "The income record file is the file that records your income.",
+        "accounts": "Accounts is a list of your accounts.",
+        "budgets": "Budgets is a list of your budgets.",
+        "employer": "The employer is the name you give to the source of your income. This can "\
+            "be a list of multiple employers, in which case the program will ask before inputting "\
+            "the employer",
+        "paycheck_account": "The paycheck account is which account, from your list, you "\
+            "have your paycheck deposited into.",
+        "paycheck_split": "The paycheck split is how you want your paycheck to be divided "\
+            "among the budgets you have set, represented as a decimal amount for each budget.",
+        "round_budget": "The round budget comes into play after your paycheck is divided "\
+            "among your budgets. In the case that the total doesn't equal your actual "\
+            "paycheck due to rounding, the amount needed in order for it to add correctly "\
+            "will be taken from or added to the budget you set here.",
+        "monthly_rent": "The monthly rent is the amount you pay per month for rent.",
+        "monthly_internet": "The monthly internet is the amount you pay per month for internet.",
+        "recurring_file": "The recurring file is the file that lists your recurring transactions, like "\
+            "rent and bills, which are added automatically during checkup.",
+        "budget_caps": "The budget caps is a list of the max amount of money you want to have "\
+            "in each budget. If an item in the list is 'null', it means the corresponding budget "\
+            "does not have a cap.",
+        "overflow_budget": "The overflow budget is the budget that income from things like paychecks "\
+            "will go into if all the budgets it's set to go into are capped."
+            }
+
+    printLine()
+    print("Type 'exit' in any field to cancel.")
+
+    #show list of preset variables
+    for var in presets:
+        print("\t",var)
+    
+    #ask which to change
+    inp = input("Please enter the names of each of the presets, from the list above, "\
+                "that you would like to change, separated by commas, or type 'all' to change "\
+                "every preset: ").lower().strip()
+    if inp == 'all':
+        to_change = list(presets)
+
+    elif inp == 'exit':
+        print("Exiting presets modification...")
+        return #end function
+    
+    else:
+        to_change_input = (inp.replace(" ","")).split(",")#get rid of spaces and split by comma
+        
+        to_change = []
+        for variable in to_change_input:
+            #check input
+            while variable not in presets:
+                variable = input(f"{variable} not found in presets. Please enter "\
+                        "a valid preset name, or type 'skip' to move on: ").lower().strip()
+                if variable == 'skip':
+                    break
+                elif variable == 'exit':
+                    print("Exiting presets modification...")
+                    return #end function
+
+            #only add if it's not already in it
+            if variable not in to_change:
+                to_change.append(variable)
+
+    for i, variable in enumerate(to_change):
+        if variable == 'skip':
+            continue
+
+        og_value = presets[variable]#get original value
+        
+        printLine()
+        print(f"Working on changing {variable}.")
+        print(instructions[variable])#give a brief explanation of the variable
+
+        #budget_caps needs special case because it can be a str or list
+        if variable == 'budget_caps':
+            budgets = presets['budgets']
+
+            if isinstance(og_value, str):
+                on = input("You currently have budget caps turned off. Would you like to turn this "\
+                      "setting on? Y/N ").strip().lower()
+                if on == 'exit':
+                    print("Exiting budget caps editing...")
+                    continue
+                elif on in {'yes','y','yee'}:
+                    #create a list to put the budgets through, and then run the second part of budget_caps handling
+                    og_value = ['null' for _ in range(len(budgets))]
+                    edit_list = True
+                else:#no change
+                    continue
+
+            else:
+                off = input("You currently have budget caps turned on. Would you like to turn this "\
+                      "setting off? Y/N ").strip().lower()
+                if off == 'exit':
+                    print("Exiting budget caps editing...")
+                    continue
+                elif off in {'yes','y','yee'}:
+                    presets['budget_caps'] = 'null'
+                    edit_list = False
+                else:
+                    edit_list = True
+
+            #runs only if there is a list & they want to edit it
+            if edit_list:
+                #make sure list is same length as budgets list
+                if len(budgets) != len(og_value):
+                    #add nulls to budget_caps if budgets is longer
+                    if len(budgets) > len(og_value):
+                        for _ in range(len(budgets) - len(og_value)):
+                            og_value.append('null')
+                    #arbitrarily remove values off the end of budget_caps if it's longer
+                    else:
+                        for _ in range(len(og_value) - len(budgets)):
+                            og_value.pop()
+
+                #show existing data
+                print("The current budget caps are as follows:")
+                for i, el in enumerate(og_value):
+                    print(f"{budgets[i]}\t{el}")
+
+                check = input("Would you like to change any of these caps? Y/N ").strip().lower()
+                if check not in {'y','yes','yee'}:
+                    continue#move on to next to_change variable
+                
+                inp = input("Which budgets would you like to change the cap for? this includes "\
+                            "adding, removing, and changing a cap. Please separate by commas, or "\
+                            "type 'all' to change all budget caps: ").strip().lower()
+                if inp == 'exit':
+                    print("Exiting paycheck split editing...")
+                    continue#move to next variable in to_change
+                elif inp == 'all':
+                    budgs = budgets[:]
+                else:
+                    #correct/check input
+                    budgs = []
+                    for budg in inp.split(","):
+                        budg = checkInput(budg.strip(), 'budget')
+                        if budg == 'exit':
+                            print("Removing this budget from editing...")
+                        if budg not in {'null', 'exit'}:
+                            budgs.append(budg)
+                
+                #build list of budget indices to change
+                budg_indices = []
+                for budg in budgs:
+                    budg_indices.append(budgets.index(budg))
+
+                #go through each and ask for new caps
+                new_caps = og_value[:]
+                for i, budg_index in enumerate(budg_indices):
+                    new = input(f"What cap would you like to set for {budgs[i]}? Type 'null' for no cap. ").strip().lower()
+                    if new == 'exit':
+                        new_caps = og_value[:]#reset to beginning
+                        print("Exiting budget caps editing...")
+                        break#still want to reset to str 'null' if all els are 'null'
+                    
+                    if new != 'null':
+                        new = checkInput(new, 'amount')
+                        #check if the cap is lower than the current amount
+                        current_amt = budgetBalance(budgs[i])
+                        if new < current_amt:
+                            uncap = input(f"The cap you set is lower than the current total in {budgs[i]}! Type "\
+                                  "'yes' to transfer the excess balance to another budget, or 'no' to "\
+                                  "manually keep it higher than the budget. Note that moving this "\
+                                  "balance may overcap the destination budget. Y/N ").strip().lower()
+                            if uncap == 'exit':
+                                new_caps = og_value[:]
+                                print("Exiting budget caps editing...")
+                                break
+                            elif uncap in {'y','yes','yee'}:
+                                to_budget = input("Which budget would you like to move it to? ").strip().lower()
+                                to_budget = checkInput(to_budget, 'budget')
+                                if to_budget == 'exit':
+                                    new_caps = og_value[:]
+                                    print("Exiting budget caps editing...")
+                                    break
+
+                                overcap_amt = current_amt - new
+
+                                writeTransfer([today,"budget cap transfer",'null',budgs[i],-1*overcap_amt],
+                                              [today,"budget cap transfer",'null',to_budget,overcap_amt])
+
+
+                    new_caps[budg_index] = new
+
+                #add check at the end - if every value in the list is 'null', reset whole variable to 'null'
+                if new_caps == ['null' for _ in range(len(new_caps))]:
+                    presets['budget_caps'] = 'null'
+
+                else:
+                    presets['budget_caps'] = new_caps
+
+                    #check if there is an overflow budget set
+                    if 'overflow_budget' not in to_change[i:]:
+                        if presets['overflow_budget'] not in presets['budgets'] or presets['overflow_budget'] == '':
+                            print("Your current overflow budget is invalid. To avoid potential errors, you will need to set one now.")
+                            to_change.insert(i+1, 'overflow_budget')
+
+        elif not isinstance(og_value, list):
+            #if value is a single item
+            #includes everything except accounts, budgets, paycheck_split, and employer
+
+            csv_settings = {"transactions_file", "balance_checks_file", "income_record_file", "recurring_file"}
+
+            #if it's a csv filename, print possible files in the local directory
+            if variable in csv_settings:
+                files = glob.glob("*.csv")
+                print("The available csv files in the current folder are:")
+                for file in files:
+                    if file != "presets.csv":#don't want to list itself as an option
+                        print("\t",file)
+
+            print(f'Current setting is {og_value}.')
+            new = input(f'Please enter the new {variable.replace("_", " ")}: ').strip()
+
+            if new.lower() == 'exit':
+                print(f"Exiting {variable.replace('_',' ')} editing...")
+                continue#cancel just the current variable
+
+            #change checkInput type depending on the variable
+            #str
+            if isinstance(og_value, str):
+                if variable in csv_settings:
+                    inputType = 'csv'
+                elif variable == 'paycheck_account':
+                    inputType = 'account'
+                elif variable == 'round_budget' or variable == 'overflow_budget':
+                    inputType = 'budget'
+            #int
+            else:
+                inputType = 'amount'
+
+            #make input lowercase
+            new = new.lower()
+
+            new_value = checkInput(new, inputType)
+
+            #making sure it's not already set for another csv variable
+            if variable in csv_settings:
+                #create list of other filenames already set
+                set_filenames = []
+                for preset in csv_settings:
+                    #not this variable, and not going to be changed this run
+                    if preset not in to_change[i:]:
+                        set_filenames.append(presets[preset])
+                
+                #if already a set file, they need to put in a different file
+                while new_value in set_filenames:
+                    new_value = input("This file is already being used for another preset! "\
+                        "Please input a valid file not being used, or type 'exit' to move on. ").lower().strip()
+                    if new_value == 'exit':
+                        print(f"Exiting {variable.replace('_',' ')} editing...")
+                        break
+                    new_value = checkInput(new_value, 'csv')
+
+            if new_value != 'exit':
+                presets[variable] = new_value
+
+        else:#value is a list
             #paycheck_split gets special case
             if variable == 'paycheck_split':
 
-                budgets = presets['budgets']
+                budgets = presets['budgets']
+
+                #make sure the length of the paycheck_split matches the length of the budgets
+                if len(budgets) != len(og_value):
+                    #add 0s to paycheck_split if budgets is longer
+                    if len(budgets) > len(og_value):
+                        for _ in range(len(budgets) - len(og_value)):
+                            og_value.append(0)
+                    #arbitrarily remove values off the end of paycheck_split if it's longer
+                    else:
+                        for _ in range(len(og_value) - len(budgets)):
+                            og_value.pop()
+                
+                #show preexisting data
+                print("The current split for your budgets are as follows:")
+                for i, el in enumerate(og_value):
+                    print(f"{budgets[i]}\t{el}")
+                    
+                #get input
+                inp = input("Which budget(s) would you like to edit? Please separate "\
+                             "by commas, or type 'all' to change all budgets: ").lower().strip()
+                
+                if inp == 'all':
+                    budgs = budgets[:]
+                
+                elif inp == 'exit':
+                    print("Exiting paycheck split editing...")
+                    continue#skip current variable in to_change
+                
+                else:
+                    #correct/check input
+                    budgs = []
+                    for budg in inp.split(","):
+                        budg = checkInput(budg.strip(), 'budget')
+                        if budg == 'exit':
+                            print("Removing this budget from editing...")
+
+                        if budg not in {'null', 'exit'}:
+                            budgs.append(budg)
+
+                #convert budgets to indices
+                budgs_i = []
+                for budg in budgs:
+                    budgs_i.append(budgets.index(budg))
+
+                #loop in case it doesn't total right                    
+                adds = False
+                while not adds:
+                    #go through each account and ask for new values
+                    new_values = og_value[:]
+                    for j, budg_i in enumerate(budgs_i):
+                        new = input('What fraction of the paycheck would you like '\
+                                    f'to be put in {budgs[j]}? ').strip().lower()
+
+                        if new == 'exit':
+                            new_values = og_value[:]#reset to beginning
+                            print("Exiting paycheck split editing...")
+                            break
+
+                        new = checkInput(new, 'amount')
+                        
+                        new_values[budg_i] = new
+                    
+                    #check that it totals to 1
+                    if abs(sum(new_values) - 1) > .0001:#account for float error
+                        #if they exited but it doesn't sum to 1, put 1 for i=0 and 0 for rest
+                        if new == 'exit':
+                            new_values = [0] * len(budgets)
+                            if len(new_values) > 0:#prevent index error
+                                new_values[0] = 1
+
+                            print("Your paycheck split is now the following:")
+                            for i, el in enumerate(new_values):
+                                print(f"{budgets[i]}\t{el}")
+                            print("If you would like this to be different, please rerun presets.")
+                            adds = True
+                        
+                        else:
+                            print("These values don't seem to sum to 1! Please re-enter.")
+                            adds = False
+                    else:
+                        adds = True
+
+                presets['paycheck_split'] = new_values
+                
+            #handle other lists
+            else:
+                #first handle employer
+                if variable == 'employer':
+                    #single employer
+                    if len(og_value) == 1:
+                        print(f"Your current employer is {og_value[0]}.")
+                    #list of employers
+                    else:
+                        print("Your current employers are the following:")
+                        for employer in og_value:
+                            print("\t",employer)
+                    
+                    change = input("Would you like to change this? Y/N ").lower().strip()
+                    if change in {'y','yes','yee'}:
+                        employers_input = input("Input the new employer. If you have multiple employers, separate each by a comma: ")
+                        
+                        if employers_input.strip().lower() == 'exit':
+                            print("Moving on...")
+                            continue
+                            
+                        else:
+                            employer = []
+                            for entry in employers_input.split(','):
+                                employer.append(entry.strip())
+
+                            presets['employer'] = employer
+
+                else:
+                    #can either be accounts or budgets, both are lists of strings
+
+                    #make a copy of budgets list to manage paycheck_split properly
+                    if variable == 'budgets':
+                        original_budgets = og_value[:]
+
+                    print(f"These are your current {variable}:")
+                    for val in og_value:
+                        print("\t",val)
+                    
+                    #options are add, remove, or modify
+                    print(f"\nYou can add, remove, or modify {variable}.")
+                    #add
+                    add_var = input(f"Would you like to add any {variable}? Y/N ").lower().strip()
+
+                    if add_var == 'exit':
+                        print(f"Exiting {variable} editing...")
+                        continue#go to next entry in to_change
+
+                    if add_var in {'y','yes','yee'}:
+                        new_raw = input(f"Please enter the names of the new {variable} you "\
+                                    "would like to add, separated by commas: ").strip().lower()
+
+                        if new_raw == 'exit':
+                            #just exit adding new budgets
+                            new = list()
+                            print(f"Exiting {variable} addition...")
+
+                        else:
+                            new = []
+                            for n in new_raw.split(","):
+                                new.append(n.strip())
+                        
+                        to_add = list()
+                        exit = False
+                        for name in new:
+                            #make sure it's a new name
+                            while name in og_value:
+                                name = input(f"{name} is already in {variable}! Please enter a "\
+                                            "different name, or enter 'skip' to move on: ").lower().strip()
+                                if name == 'skip':
+                                    break
+                                if name == 'exit':
+                                    break
+
+                            if name == 'skip':
+                                continue
+                            elif name == 'exit':
+                                exit = True
+                                print(f"Exiting {variable} addition...")
+                                break#move on
+                            else:
+                                #passes checks
+                                to_add.append(name)
+                            
+                        if not exit:
+                            #passes all checks, no exit, now add the whole thing to presets
+                            presets[variable] += to_add
+                            og_value = presets[variable]#reset for remove/modify
+
+                            #maintain paycheck_split/budget_caps
+                            if variable == 'budgets':
+                                presets['paycheck_split'] += [0] * len(to_add)
+                                if presets['budget_caps'] != 'null':
+                                    presets['budget_caps'] += ['null'] * len(to_add)
+
+                        printLine()
+                        print(f"The following are your current {variable}:")
+                        for item in og_value:
+                            print("\t",item)
+                    
+                    #remove
+                    rem = input(f"\nWould you like to remove one of the above {variable}? Y/N ").lower().strip()
+                    if rem == 'exit':
+                        print(f"Exiting {variable} editing...")
+                        continue#going to the next variable in to_change
+                    
+                    if rem in {'y', 'yes', 'yee'}:
+                        rem_raw = input(f"Please enter the names of the {variable} you "\
+                                    "would like to remove, separated by commas, or type 'all' "\
+                                    f"to remove all {variable}: ").strip().lower()
+                        
+                        rest = True
+
+                        if rem_raw == 'exit':
+                            #exit just variable deletion
+                            print(f"Exiting {variable} deletion...")
+                            rest = False
+
+                        elif rem_raw == 'all':
+                            confirm = input(f"Are you sure you would like to remove all {variable}? Y/N ").lower().strip()
+                            if confirm in {'y', 'yes', 'yee'}:
+                                #set all necessary variables to empty
+                                presets[variable] = []
+                                og_value = []
+                                if variable == 'budgets':#maintain paycheck_split/budget_caps
+                                    presets['paycheck_split'] = []
+                                    presets['budget_caps'] = 'null'
+                                rest = False
+
+                        if rest:
+                            rem = []
+                            for r in rem_raw.split(","):
+                                rem.append(r.strip())
+                        
+                            to_rem = list()
+                            exit = False
+                            for name in rem:
+                                #make sure it's an existing name
+                                while name not in og_value:
+                                    name = input(f"{name} is not in {variable}! Please enter an "\
+                                                "existing name, or enter 'skip' to move on: ").lower()
+                                    if name == 'skip':
+                                        break
+                                    elif name == 'exit':
+                                        break
+
+                                if name == 'skip':
+                                    continue
+                                elif name == 'exit':
+                                    exit = True
+                                    print(f"Exiting {variable} deletion...")
+                                    break#move on
+                                else:
+                                    #passes checks
+                                    to_rem.append(name)
+
+                            if not exit:
+                                #passes checks, no exit, now make changes
+                                for name in to_rem:
+                                    presets[variable].remove(name)
+                                
+                                #maintain paycheck_split & budget_caps
+                                if variable == 'budgets':
+                                    #remove the corresponding paycheck split value, and check if it'll mess up total
+                                    if name in original_budgets:
+                                        deleted = presets['paycheck_split'].pop(original_budgets.index(name))
+                                        if deleted != 0:
+                                            must_edit_paycheck_split = True
+
+                                        if presets['budget_caps'] != 'null':
+                                            presets['budget_caps'].pop(original_budgets.index(name))
+
+                                    else:
+                                        #if it was added this cycle, the split/cap is 0/null appended to end
+                                        presets['paycheck_split'].pop()
+                                        if presets['budget_caps'] != 'null':
+                                            presets['budget_caps'].pop()
+                            
+                                og_value = presets[variable]#reset for later iterations
+                        
+                        printLine()
+                        print(f"These are your current {variable}:")
+                        for item in og_value:
+                            print("\t",item)
+                        
+                    #modify
+                    mod = input(f"\nWould you like to modify one of the above {variable}? Y/N ").lower()
+                    if mod == 'exit':
+                        print(f"Exiting {variable} editing...")
+                        continue#go to the next to_change
+                    
+                    if mod in {'y','yes','yee'}:
+                        mod_raw = input(f"Please enter the names of the {variable} you "\
+                                    "would like to modify, separated by commas, or type "\
+                                    f"'all' to modify all {variable}: ").strip().lower()
+                                    
+                        if mod_raw == 'all':
+                            mod = og_value[:]
+
+                        elif mod_raw == 'exit':
+                            print(f"Exiting {variable} modification...")
+                            mod = []
+
+                        else:
+                            mod = []
+                            for m in mod_raw.split(","):
+                                mod.append(m.strip())
+                        
+                        to_mod = list()
+                        exit = False
+                        for name in mod:
+                            #make sure it's an existing name
+                            while name not in og_value:
+                                name = input(f"{name} is not in {variable}! Please enter an "\
+                                            "existing name, or enter 'skip' to move on: ").lower()
+                                if name == 'skip':
+                                    break
+                                elif name == 'exit':
+                                    break
+
+                            if name == 'skip':
+                                continue
+                            elif name == 'exit':
+                                exit = True
+                                print(f"Exiting {variable} modification...")
+                                break#move on
+                            else:
+                                #passes checks
+                                to_mod.append(name)
+
+                        #do another loop (if hasn't exited yet) for what to change the names to
+                        if not exit:
+                            mod_dict = dict()
+                            for name in to_mod:
+                                printLine()
+                                print(f"Working on modifying the {name} {variable[:-1]}.")
+
+                                new_name = input("Please enter the new name you would like to change "\
+                                                f"{name} to, or type 'skip' to not modify this {variable}: ").lower().strip()
+                                
+                                if new_name == 'exit':
+                                    print(f"Exiting {variable} modification...")
+                                    exit = True
+                                    break#move on
+
+                                elif new_name == 'skip':
+                                    continue
+
+                                #make sure it's a new name
+                                while new_name in og_value:
+                                    new_name = input(f"{new_name} is already in {variable}! Please "\
+                                                    "enter a different name, or enter 'skip' to move on: ").lower()
+                                    if new_name == 'skip':
+                                        break
+                                    elif new_name == 'exit':
+                                        break
+
+                                if new_name == 'skip':
+                                    continue
+                                elif new_name == 'exit':
+                                    exit = True
+                                    print(f"Exiting {variable} modification...")
+                                    break#move on
+
+                                #passes checks
+                                mod_dict[name] = new_name
+
+                        if not exit:
+                            #passes checks, no exit, now change stuff
+                            for name in mod_dict:
+                                
+                                #change old name to new_name
+                                index = presets[variable].index(name)
+                                presets[variable][index] = mod_dict[name]
+                            
+                            og_value = presets[variable]#reset for later iterations
+                            #paycheck_split/budget_caps don't need to be updated here - will maintain from previous budget name
+                
+                #maintain paycheck_split/budget_caps
+                #lengths should be same b/c of maintaining throughout
+                if variable == 'budgets':
+                    #not necessary to add if it's already been added by the user
+                    if 'paycheck_split' not in to_change[i:]:
+                        
+                        #check if paycheck_splits add to 1
+                        if abs(sum(presets['paycheck_split']) - 1) > .0001:
+                            print("Due to editing budgets, paycheck_split now needs to be updated.")
+                            must_edit_paycheck_split = True
+                        
+                        else:
+                            print("Since you edited budgets, your paycheck split is now the following:")
+                            for i, el in enumerate(presets['paycheck_split']):
+                                print(f"{og_value[i]}\t{el}")
+                            
+                            change = input("Would you like to change this split? Y/N ").strip().lower()
+                            if change == 'y' or change == 'yes' or change == 'yee':
+                                must_edit_paycheck_split = True
+                            else:
+                                must_edit_paycheck_split = False
+                                
+                        if must_edit_paycheck_split:
+                            #run paycheck_split immediately after this
+                            to_change.insert(i+1, 'paycheck_split')
+
+                    if presets['budget_caps'] != 'null':
+                        #check if added later
+                        if 'budget_caps' not in to_change[i:]:
+                            print("Since you edited budgets, your budget caps are now as follows:")
+                            for i, el in enumerate(og_value):
+                                print(f"{el}\t{presets['budget_caps'][i]}")
+
+                            change = input("Would you like to change any of these caps? Y/N ").strip().lower()
+                            if change in {'yes','yee','y'}:
+                                #run budget_caps after this
+                                to_change.insert(i+1, 'budget_caps')
+            
+            #for lists, cannot have no entries, must have at least 1
+            if presets[variable] == []:
+                print("This preset must have at least one entry, so one has been automatically added.")
+
+                if variable == 'paycheck_split':
+                    presets[variable] = [1]
+                else:
+                    presets[variable] = ['filler']
+                    if variable == 'employers':
+                        print("The singular employer is called 'filler'.")
+                    else:
+                        print(f"The singular {variable[:-1]} is called 'filler'.")
+
+                    if variable == 'budgets':
+                        presets['paycheck_split'] = [1]
+
+        #after modifying each variable in presets dict, write new information to file
+        #(restart from scratch and use pandas to create csv)
+        
+        #put in expected format
+        data = []
+        for var, val in presets.items():
+            #change null budgets in budget_caps back to -1
+            if var == 'budget_caps':
+                if isinstance(val, list):
+                    val = val[:]#make a copy so original presets is not edited
+                    for i, el in enumerate(val):
+                        if el == 'null':
+                            val[i] = -1
+
+            #if list, change , to ;
+            if isinstance(val, list):
+                val = str(val).replace(",", ";")
+            
+            #if str, add single quotations
+            elif isinstance(val, str):
+                val = "'" + val + "'"
+                
+            #otherwise it's a number/float and needs no editing
+            data.append([var, val])
+        
+        #use pandas to overwrite file
+        dataframe = pandas.DataFrame(data)
+        dataframe.to_csv(filepath, index=False, header=False)
+
+        #rebuild lookup tables for the new presets (the binary copy is remade on next load)
+        compilePresets()
+
+def writeTransfer(start, end):
+    """
+    actually writes the transaction as two separate writeTransaction lines
+
+    Parameters
+    ----------
+    start : list
+        the data of the first transaction, where it's being withdrawn, in the form 
+        [date, name, account_from, budget_from, amount (neg)]
+    end : list
+        the data of the second transaction, where it's being deposited, in the form 
+        [date, name, account_to, budget_to, amount]
+
+    Returns
+    -------
+    None.
+
+    """
+    #write 2 transactions, one for withdrawal, one for deposit
+    logOperation("transfer", [("transactions", presets['transactions_file'], [start, end])])
+
+
+def transfer(filename=None):
+    """
+    asks for transfer information and adds it to the record as 2 separate transactions,
+    without changing total amount
+
+    Parameters
+    ----------
+    filename : TYPE, optional
+        the name of the file being written to
+        the default is filepath from presets dict
+
+    Returns
+    -------
+    None.
+
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    #gather info
+    print("Please enter the following information about the transfer. Type 'exit' at any time to cancel.")
+    date = input("Date (MM-DD): ")
+    date = checkInput(date,"date")
+    if date is None:
+        return
+        
+    name = input("Name: ")
+    name = checkInput(name,"name")
+    if name is None:
+        return
+        
+    account_from = input("Account being withdrawn from: ")
+    account_from = checkInput(account_from,"account")
+    if account_from is None:
+        return
+    
+    account_to = input("Account being deposited to: ")
+    account_to = checkInput(account_to,"account")
+    if account_to is None:
+        return
+    
+    budget_from = input("Budget being withdrawn from: ")
+    budget_from = checkInput(budget_from,"budget")
+    if budget_from is None:
+        return
+
+    budget_to = input("Budget being deposited to: ")
+    budget_to = checkInput(budget_to,"budget")
+    if budget_to is None:
+        return
+    
+    amount = input("Amount (non-negative): ")
+    amount = checkInput(amount,"amount")
+    if amount is None:
+        return
+
+    #check for overcapping budgets
+    if isinstance(presets["budget_caps"], list):
+        if budget_to != 'null':
+            if overcapCheck(budget_to,amount):
+                #then the transfer will overcap its destination budget
+                split_deposits = overcapProcedure(budget_to,amount)
+                if split_deposits is None:
+                    return
+                rows = []
+                for deposit in split_deposits:
+                    rows.append([date,name,account_to]+deposit)
+                #also add withdrawal part, in the same write so the transfer can't be half recorded
+                rows.append([date,name,account_from,budget_from,-1*amount])
+                logOperation("transfer", [("transactions", filename, rows)])
+                return
 
-                #make sure the length of the paycheck_split matches the length of the budgets
-                if len(budgets) != len(og_value):
-                    #add 0s to paycheck_split if budgets is longer
-                    if len(budgets) > len(og_value):
-                        for _ in range(len(budgets) - len(og_value)):
-                            og_value.append(0)
-                    #arbitrarily remove values off the end of paycheck_split if it's longer
-                    else:
-                        for _ in range(len(og_value) - len(budgets)):
-                            og_value.pop()
-                
-                #show preexisting data
-                print("The current split for your budgets are as follows:")
-                for i, el in enumerate(og_value):
-                    print(f"{budgets[i]}\t{el}")
-                    
-                #get input
-                inp = input("Which budget(s) would you like to edit? Please separate "\
-                             "by commas, or type 'all' to change all budgets: ").lower().strip()
-                
-                if inp == 'all':
-                    budgs = budgets[:]
-                
-                elif inp == 'exit':
-                    print("Exiting paycheck split editing...")
-                    continue#skip current variable in to_change
-                
-                else:
-                    #correct/check input
-                    budgs = []
-                    for budg in inp.split(","):
-                        budg = checkInput(budg.strip(), 'budget')
-                        if budg == 'exit':
-                            print("Removing this budget from editing...")
+            elif overcapAmt(budget_to,amount) == 0:
+                print(f"The {budget_to} budget is now overcapped at {findBudgetCap(budget_to)}.")
 
-                        if budg not in {'null', 'exit'}:
-                            budgs.append(budg)
+    logOperation("transfer", [("transactions", filename, [[date,name,account_from,budget_from,-1*amount],
+                                                          [date,name,account_to,budget_to,amount]])])
+    
+def cappedBudgets(budget_caps):
+    """
+    given budget caps as a dict, returns a list of budgets that are capped
 
-                #convert budgets to indices
-                budgs_i = []
-                for budg in budgs:
-                    budgs_i.append(budgets.index(budg))
+    Parameters
+    ----------
+    budget_caps : dict
+        the budgets and their caps in the form {budget: cap}
+    
+    Returns
+    -------
+    list of capped budgets
+    """
+    capped = list()
+    for budget in budget_caps:
+        cap = budget_caps[budget]
+        
+        if isinstance(cap, str):
+            #if 'null', never capped
+            pass
+        elif budgetBalance(budget) >= cap:
+            #then capped
+            capped.append(budget)
+    
+    return capped
 
-                #loop in case it doesn't total right                    
-                adds = False
-                while not adds:
-                    #go through each account and ask for new values
-                    new_values = og_value[:]
-                    for j, budg_i in enumerate(budgs_i):
-                        new = input('What fraction of the paycheck would you like '\
-                                    f'to be put in {budgs[j]}? ').strip().lower()
+def splitPaycheck(amount, filename=None, say=print):
+    """
+    splits a paycheck into the budgets by paycheck_split, leaving out capped budgets and
+    redistributing anything that would put a budget over its cap. shared by paycheck and
+    post_paycheck
 
-                        if new == 'exit':
-                            new_values = og_value[:]#reset to beginning
-                            print("Exiting paycheck split editing...")
-                            break
+    Parameters
+    ----------
+    amount : float
+        the amount of the paycheck
+    filename : string, optional
+        filepath to the transactions file, for the current budget totals
+        the default is filepath from presets dict
+    say : function, optional
+        called with the messages about capped budgets and rounding. default is print
 
-                        new = checkInput(new, 'amount')
-                        
-                        new_values[budg_i] = new
-                    
-                    #check that it totals to 1
-                    if abs(sum(new_values) - 1) > .0001:#account for float error
-                        #if they exited but it doesn't sum to 1, put 1 for i=0 and 0 for rest
-                        if new == 'exit':
-                            new_values = [0] * len(budgets)
-                            if len(new_values) > 0:#prevent index error
-                                new_values[0] = 1
+    Returns
+    -------
+    dict of {budget: amount from paycheck}, or None if the split doesn't add up to amount
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    #turn global dict variables into more convenient local ones
+    budgets = presets['budgets'][:]
+    round_budget = presets['round_budget']
+    overflow_budget = presets['overflow_budget']
 
-                            print("Your paycheck split is now the following:")
-                            for i, el in enumerate(new_values):
-                                print(f"{budgets[i]}\t{el}")
-                            print("If you would like this to be different, please rerun presets.")
-                            adds = True
-                        
-                        else:
-                            print("These values don't seem to sum to 1! Please re-enter.")
-                            adds = False
-                    else:
-                        adds = True
+    #paycheck_split dict {budget_name: split}, copied since budgets get removed from it
+    paycheck_split = dict(presetLookup.paycheckSplit)
 
-                presets['paycheck_split'] = new_values
-                
-            #handle other lists
+    #budget caps dict {budget_name: budget_cap}, or 'null' if turned off
+    budget_caps = presetLookup.budgetCaps
+
+    #first check for capped budgets
+    if isinstance(budget_caps, dict):
+        #send to a function that returns a list of budgets that are capped
+        capped_budgets = cappedBudgets(budget_caps)
+
+        for budget in budgets[:]:
+            if budget in capped_budgets:
+                #remove from budgets and paycheck_split
+                say(f"The {budget} budget is currently capped at {budget_caps[budget]}.")
+                budgets.remove(budget)
+                del paycheck_split[budget]
+
+    #this will be the end amounts you add to each budget {budget_name: amount from paycheck}
+    total = {overflow_budget: 0, round_budget: 0}#these two must always be in the dict
+    for budget in budgets:
+        #only add budgets that have a value in paycheck_split
+        if paycheck_split[budget] != 0:
+            total[budget] = 0
+
+    #set redistribute amount to the initial amount of the paycheck
+    redistribute_amount = amount
+    overflow = False
+
+    #have to loop to redistribute remaining money into non-capped budgets
+    while redistribute_amount > 0:
+
+        #after removing budgets and their splits, paycheck_split might not sum to 1
+        #total paycheck_split list, scale up so it sums to 1, then divide paycheck
+        total_split = sum(paycheck_split.values())
+        if abs(total_split - 1) > .001:#account for float
+
+            #first, if 0, all capped and go into overflow budget
+            if total_split == 0:
+                say(f"All your budgets are capped. The remaining balance will be added to {overflow_budget}, your overflow budget.")
+                overflow = True
+            
+            #multiply each value by 1/sum(paycheck_split)
             else:
-                #first handle employer
-                if variable == 'employer':
-                    #single employer
-                    if len(og_value) == 1:
-                        print(f"Your current employer is {og_value[0]}.")
-                    #list of employers
-                    else:
-                        print("Your current employers are the following:")
-                        for employer in og_value:
-                            print("\t",employer)
-                    
-                    change = input("Would you like to change this? Y/N ").lower().strip()
-                    if change in {'y','yes','yee'}:
-                        employers_input = input("Input the new employer. If you have multiple employers, separate each by a comma: ")
+                for budget in paycheck_split:
+                    paycheck_split[budget] *= 1/total_split
+
+        #split amount
+        if overflow:
+            total[overflow_budget] += round(redistribute_amount,2)
+        else:
+            for budget in budgets:
+                total[budget] += round(redistribute_amount*paycheck_split[budget],2)
+        redistribute_amount = 0#everything has been distributed
+
+        #check for overcapped budgets - skip if already overflowed
+        if budget_caps != 'null' and not overflow:
+            for budget in total:
+                #skip if this budget does not have a cap
+                if budget_caps[budget] != 'null':
+
+                    #find overall total in that budget
+                    new_total = budgetBalance(budget, filename) + total[budget]
+                    if new_total > budget_caps[budget]:
+                        #overcapped
+                        overcap_amount = new_total - budget_caps[budget] #find out difference
+                        #find about paycheck overcapped it by
+                        # (don't want to automatically un-cap manually capped budgets)
                         
-                        if employers_input.strip().lower() == 'exit':
-                            print("Moving on...")
-                            continue
-                            
-                        else:
-                            employer = []
-                            for entry in employers_input.split(','):
-                                employer.append(entry.strip())
 
-                            presets['employer'] = employer
+                        #remove the extra from what's being added from paycheck
+                        # (only if non-negative - )
+                        total[budget] = max(total[budget] - overcap_amount, 0)
+                        redistribute_amount += overcap_amount #add the extra to be redistributed
+
+                        #also remove that budget from the budgets list and paycheck split dict,
+                        # so that it won't get more distributed into it the next loop
+                        say(f"The {budget} budget is currently capped at {budget_caps[budget]}.")
+                        budgets.remove(budget)
+                        del paycheck_split[budget]
+
+    #check total sums to given amount
+    if int(round(sum(total.values()), 2)*100) != int(amount*100):
+        dif = round(amount - round(sum(total.values()), 2), 2)
+        #add to round_budget in total if there, add if not there
+        total[round_budget] = total.get(round_budget, 0) + dif
+
+        #idk why this is here but I'm afraid to remove it
+        #seems to be at risk of hitting an infinite loop
+        #I think this is making it sum to the correct amount
+        count = 0
+        while round(sum(total.values()), 2) != amount:
+            count += 1
+            total[round_budget] += .01
+        
+        if round(sum(total.values()), 2) != amount:
+            statement = ""
+            for el in total:
+                statement += "\n" + str(el) + " = " + str(total[el])
+                
+            say("Does not add up, ask for help","\ntotal =", sum(total.values()),statement)
+            adds = False
+        
+        else:
+            say("Off by "+"{:.2f}".format(round(dif + count/100, 2))+", corrected from %s budget." % round_budget)
+            adds = True
+
+    else:
+        say("Adds up")
+        adds = True
+    
+    if adds:
+        return total
+    return None
+
+def paycheck(amount, filename=None, paycheckFile=None):
+    """
+    adds paycheck balance, split up into different budgets, to csv transaction file
+
+    Parameters
+    ----------
+    amount : float
+        the amount of the paycheck
+    filename : string, optional
+        filepath to the file the transactions will be added to
+        the default is filepath from presets dict
+    paycheckFile : string, optional
+        filepath to the file the paycheck records are in
+        the default is paycheckFilename from presets dict
 
-                else:
-                    #can either be accounts or budgets, both are lists of strings
+    Returns
+    -------
+    None.
 
-                    #make a copy of budgets list to manage paycheck_split properly
-                    if variable == 'budgets':
-                        original_budgets = og_value[:]
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    if paycheckFile is None:
+        paycheckFile = presets['income_record_file']
+    print("Type 'exit' to cancel paycheck input.")
+    
+    #ask for input
+    paydate = input("Date of paycheck (MM-DD): ")
+    paydate = checkInput(paydate,"date")
+    if paydate is None:
+        return
+    paycheck_account = input("Account the paycheck is in: ")
+    paycheck_account = checkInput(paycheck_account, "account")
+    if paycheck_account is None:
+        return
+    #ask for employer if necessary
+    employers = presets['employer']
+    if len(employers) == 1:
+        employer = employers[0]
+    else:
+        employer = input("Name of employer: ").strip()
+        while employer not in presetLookup.employerSet and employer.lower() != 'exit':
+            print(f"{employer} is not a valid employer. Employers include ", end = '')
+            print(*employers, sep = ', ', end = '')
+            employer = input(". Input is case-sensitive. ").strip()
+        if employer.lower() == 'exit':
+            print("Cancelling paycheck entry...")
+            return
+    
+    total = splitPaycheck(amount, filename)
+    if total is not None:
+        writePaycheck(total, paydate, amount, paycheck_account, employer, filename, paycheckFile)
 
-                    print(f"These are your current {variable}:")
-                    for val in og_value:
-                        print("\t",val)
-                    
-                    #options are add, remove, or modify
-                    print(f"\nYou can add, remove, or modify {variable}.")
-                    #add
-                    add_var = input(f"Would you like to add any {variable}? Y/N ").lower().strip()
+def writePaycheck(total, paydate, amount, account, employer, filename, paycheckFile):
+    """
+    writes a split paycheck (from splitPaycheck) to the transactions and the income record
+    """
+    rows = []
+    for budget in total:
+        if total[budget] != 0:
+            rows.append([paydate, f"{employer} paycheck", account, budget, total[budget]])
 
-                    if add_var == 'exit':
-                        print(f"Exiting {variable} editing...")
-                        continue#go to next entry in to_change
+    #the income record and the split are logged together, so a crash between the
+    # two writes is finished at the next startup instead of leaving income unsplit
+    logOperation("paycheck", [("income", paycheckFile, [[paydate, amount, employer]]),
+                              ("transactions", filename, rows)])
 
-                    if add_var in {'y','yes','yee'}:
-                        new_raw = input(f"Please enter the names of the new {variable} you "\
-                                    "would like to add, separated by commas: ").strip().lower()
 
-                        if new_raw == 'exit':
-                            #just exit adding new budgets
-                            new = list()
-                            print(f"Exiting {variable} addition...")
+def getTransaction():
+    """
+    ask user for transaction information (no intro print statement) and writes it to the file
 
-                        else:
-                            new = []
-                            for n in new_raw.split(","):
-                                new.append(n.strip())
-                        
-                        to_add = list()
-                        exit = False
-                        for name in new:
-                            #make sure it's a new name
-                            while name in og_value:
-                                name = input(f"{name} is already in {variable}! Please enter a "\
-                                            "different name, or enter 'skip' to move on: ").lower().strip()
-                                if name == 'skip':
-                                    break
-                                if name == 'exit':
-                                    break
+    Returns
+    -------
+    None
+    """
+    print("Enter 'exit' at any time to cancel this transaction.")
+    
+    date = input("Date of transaction (MM-DD): ")
+    date = checkInput(date,"date")
+    if date is None:
+        return
+        
+    name = input("Name: ")
+    name = checkInput(name,"name")
+    if name is None:
+        return
+            
+    amount = input("Amount: ")
+    amount = checkInput(amount,"amount")
+    if amount is None:
+        return
+    
+    account = input("Account: ")
+    account = checkInput(account,"account")
+    if account is None:
+        return
+        
+    budget = input("Budget: ")
+    budget = checkInput(budget,"budget")
+    if budget is None:
+        return
 
-                            if name == 'skip':
-                                continue
-                            elif name == 'exit':
-                                exit = True
-                                print(f"Exiting {variable} addition...")
-                                break#move on
-                            else:
-                                #passes checks
-                                to_add.append(name)
-                            
-                        if not exit:
-                            #passes all checks, no exit, now add the whole thing to presets
-                            presets[variable] += to_add
-                            og_value = presets[variable]#reset for remove/modify
+    #check if this has already been entered (by hand or by an import)
+    exact, near = checkDuplicate([date, name, account, budget, amount])
+    if exact or near:
+        if exact:
+            print(f"This transaction is already in the records ({exact} time(s)).")
+        else:
+            print(f"A matching transaction is already in the records on {', '.join(near)}.")
+        anyway = input("Would you like to add it anyway? Y/N ").strip().lower()
+        if anyway not in {'y','yes','yee'}:
+            print("Okay, this transaction won't be added.")
+            return
+    
+    #check if this transaction will cap the destination budget
+    if amount > 0:
+        if isinstance(presets['budget_caps'], list):
+            if overcapCheck(budget,amount):
+                transactions = overcapProcedure(budget, amount)
+                #returns None if the user cancelled input, or
+                # list of [budget, amount] transactions to handle overcapping
+                if transactions is None:
+                    return
+                
+                #write all the returned transactions to the file at once
+                logOperation("transaction", [("transactions", presets['transactions_file'], 
+                                              [[date, name, account] + split for split in transactions])])
+                return
+                    
+            elif overcapAmt(budget, amount) == 0:
+                print(f"The {budget} budget is now capped at {findBudgetCap(budget)}.")
 
-                            #maintain paycheck_split/budget_caps
-                            if variable == 'budgets':
-                                presets['paycheck_split'] += [0] * len(to_add)
-                                if presets['budget_caps'] != 'null':
-                                    presets['budget_caps'] += ['null'] * len(to_add)
+    logOperation("transaction", [("transactions", presets['transactions_file'], [[date, name, account, budget, amount]])])
 
-                        printLine()
-                        print(f"The following are your current {variable}:")
-                        for item in og_value:
-                            print("\t",item)
-                    
-                    #remove
-                    rem = input(f"\nWould you like to remove one of the above {variable}? Y/N ").lower().strip()
-                    if rem == 'exit':
-                        print(f"Exiting {variable} editing...")
-                        continue#going to the next variable in to_change
-                    
-                    if rem in {'y', 'yes', 'yee'}:
-                        rem_raw = input(f"Please enter the names of the {variable} you "\
-                                    "would like to remove, separated by commas, or type 'all' "\
-                                    f"to remove all {variable}: ").strip().lower()
-                        
-                        rest = True
 
-                        if rem_raw == 'exit':
-                            #exit just variable deletion
-                            print(f"Exiting {variable} deletion...")
-                            rest = False
+recurringColumns = ["name", "account", "budget", "amount", "recurrence", "start", "last_run"]
+recurrenceSteps = {"daily": 1, "weekly": 7, "biweekly": 14}#in days
+recurrenceMonths = {"monthly": 1, "quarterly": 3, "yearly": 12}#in months
 
-                        elif rem_raw == 'all':
-                            confirm = input(f"Are you sure you would like to remove all {variable}? Y/N ").lower().strip()
-                            if confirm in {'y', 'yes', 'yee'}:
-                                #set all necessary variables to empty
-                                presets[variable] = []
-                                og_value = []
-                                if variable == 'budgets':#maintain paycheck_split/budget_caps
-                                    presets['paycheck_split'] = []
-                                    presets['budget_caps'] = 'null'
-                                rest = False
+def loadRecurring(filename=None):
+    """
+    opens the recurring transactions table. if it doesn't exist yet there are no rules 
+    (migrateRecurring makes it, asking about the bills checkup used to ask about)
 
-                        if rest:
-                            rem = []
-                            for r in rem_raw.split(","):
-                                rem.append(r.strip())
-                        
-                            to_rem = list()
-                            exit = False
-                            for name in rem:
-                                #make sure it's an existing name
-                                while name not in og_value:
-                                    name = input(f"{name} is not in {variable}! Please enter an "\
-                                                "existing name, or enter 'skip' to move on: ").lower()
-                                    if name == 'skip':
-                                        break
-                                    elif name == 'exit':
-                                        break
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the recurring csv
+        the default is recurring_file from presets dict
 
-                                if name == 'skip':
-                                    continue
-                                elif name == 'exit':
-                                    exit = True
-                                    print(f"Exiting {variable} deletion...")
-                                    break#move on
-                                else:
-                                    #passes checks
-                                    to_rem.append(name)
+    Returns
+    -------
+    list of rules, each a list in the order of recurringColumns
+    """
+    if filename is None:
+        filename = presets['recurring_file']
+    if not os.path.exists(filename):
+        return []
+
+    table = pandas.read_csv(filename, dtype={"start": str, "last_run": str}, keep_default_na=False)
+    rules = [list(row) for row in table[recurringColumns].itertuples(index=False)]
+    for rule in rules:
+        rule[3] = float(rule[3])#numpy number types can't go in the write-ahead log
+    return rules
+
+def migrateRecurring(rulesFile=None):
+    """
+    makes the recurring transactions table the first time it's needed. checkup used to ask
+    about the rent and internet bills set in presets, so for each one that's set this asks
+    when it's next due and where it's paid from, to add it as a monthly rule (or not). 
+    nothing is posted until the date given comes
 
-                            if not exit:
-                                #passes checks, no exit, now make changes
-                                for name in to_rem:
-                                    presets[variable].remove(name)
-                                
-                                #maintain paycheck_split & budget_caps
-                                if variable == 'budgets':
-                                    #remove the corresponding paycheck split value, and check if it'll mess up total
-                                    if name in original_budgets:
-                                        deleted = presets['paycheck_split'].pop(original_budgets.index(name))
-                                        if deleted != 0:
-                                            must_edit_paycheck_split = True
+    Parameters
+    ----------
+    rulesFile : str, optional
+        filepath to the recurring csv
+        the default is recurring_file from presets dict
 
-                                        if presets['budget_caps'] != 'null':
-                                            presets['budget_caps'].pop(original_budgets.index(name))
+    Returns
+    -------
+    None.
+    """
+    if rulesFile is None:
+        rulesFile = presets['recurring_file']
+    if os.path.exists(rulesFile):
+        return
 
-                                    else:
-                                        #if it was added this cycle, the split/cap is 0/null appended to end
-                                        presets['paycheck_split'].pop()
-                                        if presets['budget_caps'] != 'null':
-                                            presets['budget_caps'].pop()
-                            
-                                og_value = presets[variable]#reset for later iterations
-                        
-                        printLine()
-                        print(f"These are your current {variable}:")
-                        for item in og_value:
-                            print("\t",item)
-                        
-                    #modify
-                    mod = input(f"\nWould you like to modify one of the above {variable}? Y/N ").lower()
-                    if mod == 'exit':
-                        print(f"Exiting {variable} editing...")
-                        continue#go to the next to_change
-                    
-                    if mod in {'y','yes','yee'}:
-                        mod_raw = input(f"Please enter the names of the {variable} you "\
-                                    "would like to modify, separated by commas, or type "\
-                                    f"'all' to modify all {variable}: ").strip().lower()
-                                    
-                        if mod_raw == 'all':
-                            mod = og_value[:]
+    rules = []
+    for name, key in (("rent check", 'monthly_rent'), ("internet bill", 'monthly_internet')):
+        if not presets[key]:
+            continue
+        print(f"Checkup used to ask about the {name} ({presets[key]}). It can be added automatically every month now.")
+        day = input(f"Date the {name} is next due (MM-DD), or 'skip' to not add it automatically: ").strip()
+        if day.lower() in {'skip', 'n', 'no'}:
+            continue
+        day = checkInput(day, "date")
+        if day is None:
+            continue
+        day = nextDueDate(day)
+        account = checkInput(input("Account it's paid from: "), "account")
+        if account is None:
+            continue
+        budget = checkInput(input("Budget it comes out of: "), "budget")
+        if budget is None:
+            continue
+        rules.append([name, account, budget, -1*presets[key], "monthly", day, ""])
+        print(f"The {name} will be added monthly starting {day}.")
 
-                        elif mod_raw == 'exit':
-                            print(f"Exiting {variable} modification...")
-                            mod = []
+    #written even with no rules, so this is only asked once
+    atomicWriteCsv(pandas.DataFrame(rules, columns=recurringColumns), rulesFile, index=False)
 
-                        else:
-                            mod = []
-                            for m in mod_raw.split(","):
-                                mod.append(m.strip())
-                        
-                        to_mod = list()
-                        exit = False
-                        for name in mod:
-                            #make sure it's an existing name
-                            while name not in og_value:
-                                name = input(f"{name} is not in {variable}! Please enter an "\
-                                            "existing name, or enter 'skip' to move on: ").lower()
-                                if name == 'skip':
-                                    break
-                                elif name == 'exit':
-                                    break
+def addMonths(day, months):
+    """
+    gives the date the given number of months after day, on the same day of the month
+    (or the last day of the month, if that month is shorter)
+    """
+    month = day.month - 1 + months
+    year = day.year + month//12
+    month = month%12 + 1
+    nextMonth = date(year + month//12, month%12 + 1, 1)
+    return date(year, month, min(day.day, (nextMonth - timedelta(1)).day))
 
-                            if name == 'skip':
-                                continue
-                            elif name == 'exit':
-                                exit = True
-                                print(f"Exiting {variable} modification...")
-                                break#move on
-                            else:
-                                #passes checks
-                                to_mod.append(name)
+def nextDueDate(day):
+    """
+    gives the first date a new recurring transaction is due from the date it was asked for.
+    an MM-DD date is read as this year's, so one that has already passed is moved on a
+    year at a time until it hasn't (otherwise every occurrence since then would be posted
+    at once)
 
-                        #do another loop (if hasn't exited yet) for what to change the names to
-                        if not exit:
-                            mod_dict = dict()
-                            for name in to_mod:
-                                printLine()
-                                print(f"Working on modifying the {name} {variable[:-1]}.")
+    Parameters
+    ----------
+    day : str
+        the date entered, format YYYY-MM-DD
 
-                                new_name = input("Please enter the new name you would like to change "\
-                                                f"{name} to, or type 'skip' to not modify this {variable}: ").lower().strip()
-                                
-                                if new_name == 'exit':
-                                    print(f"Exiting {variable} modification...")
-                                    exit = True
-                                    break#move on
+    Returns
+    -------
+    str, format YYYY-MM-DD
+    """
+    due = date.fromisoformat(day)
+    years = 0
+    while str(addMonths(due, 12*years)) < today:
+        years += 1
+    if years:
+        print(f"{day} has already passed, so it's taken to be {addMonths(due, 12*years)}.")
+    return str(addMonths(due, 12*years))
+
+def occurrenceDates(rule, until):
+    """
+    gives every date a recurring transaction was due since it was last run
 
-                                elif new_name == 'skip':
-                                    continue
+    Parameters
+    ----------
+    rule : list
+        the rule, in the order of recurringColumns
+    until : date
+        the last date to include
 
-                                #make sure it's a new name
-                                while new_name in og_value:
-                                    new_name = input(f"{new_name} is already in {variable}! Please "\
-                                                    "enter a different name, or enter 'skip' to move on: ").lower()
-                                    if new_name == 'skip':
-                                        break
-                                    elif new_name == 'exit':
-                                        break
+    Returns
+    -------
+    list of dates (str, format YYYY-MM-DD), in order
+    """
+    start = date.fromisoformat(rule[5])
+    #first date that hasn't been posted yet
+    after = date.fromisoformat(rule[6]) + timedelta(1) if rule[6] else start
+    recurrence = rule[4]
+
+    if recurrence in recurrenceSteps:
+        step = recurrenceSteps[recurrence]
+        #jump straight to the first occurrence on or after 'after', then one arange for the backlog
+        skip = max(0, -(-(after.toordinal() - start.toordinal())//step))
+        ordinals = numpy.arange(start.toordinal() + skip*step, until.toordinal() + 1, step)
+        return [str(date.fromordinal(int(d))) for d in ordinals]
+
+    elif recurrence in recurrenceMonths:
+        step = recurrenceMonths[recurrence]
+        skip = max(0, ((after.year - start.year)*12 + after.month - start.month)//step - 1)
+        dates = []
+        day = addMonths(start, skip*step)
+        while day <= until:
+            if day >= after:
+                dates.append(str(day))
+            skip += 1
+            day = addMonths(start, skip*step)
+        return dates
 
-                                if new_name == 'skip':
-                                    continue
-                                elif new_name == 'exit':
-                                    exit = True
-                                    print(f"Exiting {variable} modification...")
-                                    break#move on
+    else:
+        raise ValueError(f"{recurrence} is not a valid recurrence. Use one of "\
+                         f"{', '.join(list(recurrenceSteps) + list(recurrenceMonths))}.")
 
-                                #passes checks
-                                mod_dict[name] = new_name
+def runRecurring(until=None, filename=None, rulesFile=None):
+    """
+    adds every occurrence of every recurring transaction that has come due since the last
+    run, all in one write, and records how far each rule has been run
 
-                        if not exit:
-                            #passes checks, no exit, now change stuff
-                            for name in mod_dict:
-                                
-                                #change old name to new_name
-                                index = presets[variable].index(name)
-                                presets[variable][index] = mod_dict[name]
-                            
-                            og_value = presets[variable]#reset for later iterations
-                            #paycheck_split/budget_caps don't need to be updated here - will maintain from previous budget name
-                
-                #maintain paycheck_split/budget_caps
-                #lengths should be same b/c of maintaining throughout
-                if variable == 'budgets':
-                    #not necessary to add if it's already been added by the user
-                    if 'paycheck_split' not in to_change[i:]:
-                        
-                        #check if paycheck_splits add to 1
-                        if abs(sum(presets['paycheck_split']) - 1) > .0001:
-                            print("Due to editing budgets, paycheck_split now needs to be updated.")
-                            must_edit_paycheck_split = True
-                        
-                        else:
-                            print("Since you edited budgets, your paycheck split is now the following:")
-                            for i, el in enumerate(presets['paycheck_split']):
-                                print(f"{og_value[i]}\t{el}")
-                            
-                            change = input("Would you like to change this split? Y/N ").strip().lower()
-                            if change == 'y' or change == 'yes' or change == 'yee':
-                                must_edit_paycheck_split = True
-                            else:
-                                must_edit_paycheck_split = False
-                                
-                        if must_edit_paycheck_split:
-                            #run paycheck_split immediately after this
-                            to_change.insert(i+1, 'paycheck_split')
+    Parameters
+    ----------
+    until : str, optional
+        the last date to add occurrences for, format YYYY-MM-DD. default is today
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    rulesFile : str, optional
+        filepath to the recurring csv
+        the default is recurring_file from presets dict
 
-                    if presets['budget_caps'] != 'null':
-                        #check if added later
-                        if 'budget_caps' not in to_change[i:]:
-                            print("Since you edited budgets, your budget caps are now as follows:")
-                            for i, el in enumerate(og_value):
-                                print(f"{el}\t{presets['budget_caps'][i]}")
+    Returns
+    -------
+    list of the transactions that were added, each in the form [date, name, account, budget, amount]
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    if rulesFile is None:
+        rulesFile = presets['recurring_file']
+    if until is None:
+        until = today
+
+    rules = loadRecurring(rulesFile)
+    rows = []
+    for rule in rules:
+        for day in occurrenceDates(rule, date.fromisoformat(until)):
+            rows.append([day, rule[0], rule[1], rule[2], float(rule[3])])
+        if not rule[6] or rule[6] < until:
+            rule[6] = until
+
+    if rows:
+        #the postings and the new last_run dates are logged together, so a crash can't
+        # post the same occurrences twice
+        logOperation("recurring", [("transactions", filename, rows), ("rules", rulesFile, rules)])
+    return rows
+
+def addRecurring(rulesFile=None):
+    """
+    asks for a new recurring transaction and adds it to the recurring table
 
-                            change = input("Would you like to change any of these caps? Y/N ").strip().lower()
-                            if change in {'yes','yee','y'}:
-                                #run budget_caps after this
-                                to_change.insert(i+1, 'budget_caps')
-            
-            #for lists, cannot have no entries, must have at least 1
-            if presets[variable] == []:
-                print("This preset must have at least one entry, so one has been automatically added.")
+    Parameters
+    ----------
+    rulesFile : str, optional
+        filepath to the recurring csv
+        the default is recurring_file from presets dict
 
-                if variable == 'paycheck_split':
-                    presets[variable] = [1]
-                else:
-                    presets[variable] = ['filler']
-                    if variable == 'employers':
-                        print("The singular employer is called 'filler'.")
-                    else:
-                        print(f"The singular {variable[:-1]} is called 'filler'.")
+    Returns
+    -------
+    None.
+    """
+    if rulesFile is None:
+        rulesFile = presets['recurring_file']
+    print("Please enter the following information about the recurring transaction. Type 'exit' at any time to cancel.")
+    name = checkInput(input("Name: "), "name")
+    if name is None:
+        return
+    amount = checkInput(input("Amount (negative for bills): "), "amount")
+    if amount is None:
+        return
+    account = checkInput(input("Account: "), "account")
+    if account is None:
+        return
+    budget = checkInput(input("Budget: "), "budget")
+    if budget is None:
+        return
 
-                    if variable == 'budgets':
-                        presets['paycheck_split'] = [1]
+    options = list(recurrenceSteps) + list(recurrenceMonths)
+    recurrence = input(f"How often does it happen? ({', '.join(options)}) ").strip().lower()
+    while recurrence not in options:
+        if recurrence == 'exit':
+            return
+        recurrence = input(f"Please choose one of {', '.join(options)}: ").strip().lower()
 
-        #after modifying each variable in presets dict, write new information to file
-        #(restart from scratch and use pandas to create csv)
+    start = checkInput(input("Date of the next time it happens (MM-DD): "), "date")
+    if start is None:
+        return
+    start = nextDueDate(start)
+
+    rules = loadRecurring(rulesFile)
+    rules.append([name, account, budget, amount, recurrence, start, ""])
+    atomicWriteCsv(pandas.DataFrame(rules, columns=recurringColumns), rulesFile, index=False)
+    print(f"{name} will be added {recurrence} starting {start}.")
+
+def weekly(filename=None):
+    """
+    goes through the weekly routine (now called 'checkup')
+
+    Parameters
+    ----------
+    filename : string, optional
+        filename of the csv file with records in it
+        the default is filepath from presets dict
+
+    Returns
+    -------
+    None.
+
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    #add paycheck
+    paycheckAsk = input("First we'll add the paycheck. Did you get a paycheck that you'd like to add? Y/N  ")
+    if paycheckAsk.lower() in {'yes','y','yee'}:
+        print("Please enter the following information about the paycheck.")
+        amount = input("Amount: ")
+        amount = checkInput(amount,"amount")
+        if amount is not None:
+            paycheck(amount)
         
-        #put in expected format
-        data = []
-        for var, val in presets.items():
-            #change null budgets in budget_caps back to -1
-            if var == 'budget_caps':
-                if isinstance(val, list):
-                    val = val[:]#make a copy so original presets is not edited
-                    for i, el in enumerate(val):
-                        if el == 'null':
-                            val[i] = -1
+    print("Okay, moving on.\n--------------------\nNow are the bills.")
+        
+    #add every recurring transaction that's come due since the last checkup
+    migrateRecurring()
+    posted = runRecurring(filename=filename)
+    if posted:
+        print("These recurring transactions were added:")
+        printList([transaction(row) for row in posted])
+        print("Check the checking account for low balance! And make sure autopay went through!")
+    else:
+        print("No recurring transactions have come due since the last checkup.")
+        
+    print("Perfect (I hope...).\n--------------------")
 
-            #if list, change , to ;
-            if isinstance(val, list):
-                val = str(val).replace(",", ";")
+    #add new transactions
+    print("Please enter the information for new transactions (except paychecks and recurring payments)",\
+          "below.")
+    ask = input("Done? Y/N  ")
+    if ask.lower() == "y" or ask.lower() == "yes" or ask.lower() == "yee":
+        done = True
+    else:
+        done = False
+    while not done:
+        printLine()
+        getTransaction()
+        
+        ask = input("Done? Y/N  ")
+        if ask.lower() == "y" or ask.lower() == "yes" or ask.lower() == "yee":
+            done = True
             
-            #if str, add single quotations
-            elif isinstance(val, str):
-                val = "'" + val + "'"
-                
-            #otherwise it's a number/float and needs no editing
-            data.append([var, val])
+    print("Finished with new transactions.\n--------------------\nLast we'll check that the totals are the same.")
+            
+    #check balances
+    #need transactions in list form
+    transactionList = filepathToTransactionList()
+    checkBalances(transactionList)
         
-        #use pandas to overwrite file
-        dataframe = pandas.DataFrame(data)
-        dataframe.to_csv(filepath, index=False, header=False)
+    print("All done!")
+
+
+def forecastInputs(months, filename=None, rulesFile=None):
+    """
+    gathers what forecast needs from the files, as arrays with a column per budget 
+    (in presets order): each past month's income, each past month's other money in and out
+    of each budget, and what the recurring transactions will add to each budget in each of 
+    the coming months
+
+    Parameters
+    ----------
+    months : int
+        number of months being forecast, starting with the current month
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    rulesFile : str, optional
+        filepath to the recurring csv
+        the default is recurring_file from presets dict
+
+    Returns
+    -------
+    tuple of (income, flows, recurring): income has a value per past month, flows is 
+    (past months x budgets), recurring is (months x budgets)
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    budgets = presets['budgets']
+    thisMonth = today[:7]
+
+    #income per finished month, 0 for months with no income
+    income = loadRollup(presets['income_record_file'], True)["amount"].groupby(level="month").sum()
+    income = income[income.index < thisMonth]
+    if len(income):
+        income = income.reindex(pandas.period_range(income.index[0], income.index[-1], freq="M").astype(str), 
+                                fill_value=0)
+
+    #paychecks are forecast from income and recurring transactions from their rules, 
+    # so everything else is the history of day to day spending
+    rules = loadRecurring(rulesFile)
+    file = openFile(filename, None)
+    names = file["name"].astype(str)
+    other = ~(names.str.endswith(" paycheck") | names.isin({rule[0] for rule in rules}))
+    file = file[other & (file["date"].astype(str).str[:7] < thisMonth)]
+    flows = file.groupby([file["date"].astype(str).str[:7], file["budget"]], observed=True)["amount"].sum()
+    flows = flows.unstack("budget", fill_value=0).reindex(columns=budgets, fill_value=0)
+    if len(flows):
+        flows = flows.reindex(pandas.period_range(flows.index[0], flows.index[-1], freq="M").astype(str), 
+                              fill_value=0)
+
+    #recurring transactions that will come due in each coming month
+    recurring = numpy.zeros((months, len(budgets)))
+    start = date.fromisoformat(today)
+    for rule in rules:
+        if rule[2] not in presetLookup.budgetIndex:
+            continue
+        rule = rule[:6] + [max(rule[6], today)]#only what hasn't been posted yet
+        for day in occurrenceDates(rule, addMonths(start.replace(day=1), months) - timedelta(1)):
+            month = (int(day[:4]) - start.year)*12 + int(day[5:7]) - start.month
+            recurring[month, presetLookup.budgetIndex[rule[2]]] += rule[3]
+
+    return income.to_numpy(dtype=float), flows.to_numpy(dtype=float), recurring
+
+def capsArray(budget_caps):
+    """
+    gives budget caps (as in presets, a list in budgets order or 'null') as a numpy array,
+    with inf for budgets that aren't capped
+    """
+    if isinstance(budget_caps, str):
+        return numpy.full(len(presets['budgets']), numpy.inf)
+    return numpy.array([numpy.inf if cap == 'null' else cap for cap in budget_caps], dtype=float)
 
-def writeTransfer(start, end):
+def overflowIndex(caps):
     """
-    actually writes the transaction as two separate writeTransaction lines
+    gives the index of the overflow budget for splitPaychecks, from caps made by capsArray
+    (one row, or one per row). money only goes to it when every budget is capped, so if
+    nothing is capped it isn't looked up (there might not be one set) and 0 is given
+    """
+    if numpy.isinf(caps).all():
+        return 0
+    if presets['overflow_budget'] not in presetLookup.budgetIndex:
+        raise ValueError("Budget caps need an overflow budget, and the overflow_budget preset isn't one of the budgets.")
+    return presetLookup.budgetIndex[presets['overflow_budget']]
+
+def splitPaychecks(pay, balance, split, caps, overflow):
+    """
+    splits many paychecks into budgets at once, the way paycheck does: each is split by 
+    paycheck_split, whatever would put a budget over its cap is redistributed to the 
+    budgets that aren't capped yet, and anything left when they all are goes to the overflow 
+    budget. amounts aren't rounded to cents
 
     Parameters
     ----------
-    start : list
-        the data of the first transaction, where it's being withdrawn, in the form 
-        [date, name, account_from, budget_from, amount (neg)]
-    end : list
-        the data of the second transaction, where it's being deposited, in the form 
-        [date, name, account_to, budget_to, amount]
+    pay : numpy array
+        the paycheck amounts, one per row
+    balance : numpy array
+        (rows x budgets) budget balances before the paychecks
+    split : numpy array
+        paycheck split, either one for every row (budgets) or one per row (rows x budgets)
+    caps : numpy array
+        budget caps (see capsArray), either one for every row or one per row like split
+    overflow : int
+        index of the overflow budget
 
     Returns
     -------
-    None.
-
+    (rows x budgets) numpy array of the amount added to each budget
     """
-    #write 2 transactions, one for withdrawal, one for deposit
-    writeTransaction(start)
-    writeTransaction(end)
+    added = numpy.zeros(balance.shape)#float even if the balances are all whole numbers
+    for _ in range(balance.shape[1]):
+        room = numpy.maximum(caps - balance - added, 0)
+        weights = numpy.where(room > 0, split, 0)
+        total = weights.sum(axis=1, keepdims=True)
+        share = numpy.divide(pay[:, None]*weights, total, out=numpy.zeros_like(weights), where=total > 0)
+        given = numpy.minimum(share, room)
+        added += given
+        pay = pay - given.sum(axis=1)
+        if not (pay > .005).any():
+            break
+    added[:, overflow] += pay
+    return added
+
+def forecast(months=12, paths=1000, seed=None, filename=None):
+    """
+    projects every budget's balance at the end of each of the coming months with a Monte
+    Carlo simulation. each path picks a random past month's income (split and capped like
+    paycheck does) and a random past month's spending for every month it goes forward, 
+    plus the recurring transactions due that month. all paths are simulated at once as 
+    numpy arrays
 
+    Parameters
+    ----------
+    months : int, optional
+        number of months to forecast, starting with the current month. default is 12
+    paths : int, optional
+        number of simulated paths. default is 1000
+    seed : int, optional
+        random seed, for repeatable forecasts
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
-def transfer(filename=presets['transactions_file']):
+    Returns
+    -------
+    pandas dataframe with a row per month and (budget, statistic) columns: the 10th, 50th
+    and 90th percentile balance, and the chance the budget is below 0
     """
-    asks for transfer information and adds it to the record as 2 separate transactions,
-    without changing total amount
+    if filename is None:
+        filename = presets['transactions_file']
+    budgets = presets['budgets']
+    income, flows, recurring = forecastInputs(months, filename)
+    rng = numpy.random.default_rng(seed)
+
+    balances = roundedBalances(filename)['budgets']
+    balance = numpy.tile(numpy.array([balances.get(budget, 0) for budget in budgets], dtype=float), (paths, 1))
+    split = numpy.array(presets['paycheck_split'], dtype=float)
+    caps = capsArray(presets['budget_caps'])
+    overflow = overflowIndex(caps)
+
+    results = numpy.empty((months, paths, len(budgets)))
+    for month in range(months):
+        pay = income[rng.integers(len(income), size=paths)] if len(income) else numpy.zeros(paths)
+
+        balance = balance + splitPaychecks(pay, balance, split, caps, overflow) + recurring[month]
+        if len(flows):
+            balance += flows[rng.integers(len(flows), size=paths)]
+        results[month] = balance
+
+    low, median, high = numpy.percentile(results, [10, 50, 90], axis=1)
+    negative = (results < 0).mean(axis=1)
+    start = date.fromisoformat(today).replace(day=1)
+    index = pandas.Index([str(addMonths(start, month))[:7] for month in range(months)], name="month")
+    stats = {"p10": low, "p50": median, "p90": high, "P(<0)": negative}
+    table = pandas.concat({(budget, stat): pandas.Series(values[:, i], index=index) 
+                           for i, budget in enumerate(budgets) for stat, values in stats.items()}, axis=1)
+    return table.round(2)
+
+def replaySplits(candidates, start=None, filename=None, paycheckFile=None):
+    """
+    replays every paycheck in the income record since start through other paycheck splits
+    and budget caps, to see what the budget balances would have been. the ledger's paycheck
+    rows are swapped for the replayed ones in memory, the rest of the ledger is kept as is,
+    and nothing is written. all the candidates are replayed at once as numpy arrays
 
     Parameters
     ----------
-    filename : TYPE, optional
-        the name of the file being written to
-        the default is filepath from presets dict
+    candidates : list
+        the splits to try, each a tuple of (paycheck split, budget caps) in the form they
+        take in presets: a list in budgets order, and a list or 'null'
+    start : str, optional
+        date to start replaying from, format YYYY-MM-DD. default is two years ago
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    paycheckFile : str, optional
+        filepath to the income record
+        the default is income_record_file from presets dict
 
     Returns
     -------
-    None.
-
+    pandas dataframe indexed by (candidate number, month) with each budget's balance at 
+    the end of the month as columns
     """
-    #gather info
-    print("Please enter the following information about the transfer. Type 'exit' at any time to cancel.")
-    date = input("Date (MM-DD): ")
-    date = checkInput(date,"date")
-    if date is None:
-        return
-        
-    name = input("Name: ")
-    name = checkInput(name,"name")
-    if name is None:
-        return
-        
-    account_from = input("Account being withdrawn from: ")
-    account_from = checkInput(account_from,"account")
-    if account_from is None:
-        return
-    
-    account_to = input("Account being deposited to: ")
-    account_to = checkInput(account_to,"account")
-    if account_to is None:
-        return
-    
-    budget_from = input("Budget being withdrawn from: ")
-    budget_from = checkInput(budget_from,"budget")
-    if budget_from is None:
-        return
+    if filename is None:
+        filename = presets['transactions_file']
+    if paycheckFile is None:
+        paycheckFile = presets['income_record_file']
+    if start is None:
+        start = str(date.fromisoformat(today) - timedelta(730))
+    budgets = presets['budgets']
+    splits = numpy.array([split for split, caps in candidates], dtype=float)
+    caps = numpy.array([capsArray(caps) for split, caps in candidates])
+    if splits.shape[1] != len(budgets):
+        raise ValueError(f"Each split needs a value for each of the {len(budgets)} budgets.")
+    overflow = overflowIndex(caps)
+
+    #everything but the paycheck rows, as a running total per budget at the end of each date
+    file = openFile(filename, None)
+    file = file[~file["name"].astype(str).str.endswith(" paycheck") | (file["date"].astype(str) < start)]
+    codes = file["budget"].cat.codes.to_numpy()
+    dates = file["date"].astype(str).to_numpy()
+    amounts = file["amount"].to_numpy(dtype=float)
+    known = codes < len(budgets)#'null' and old budgets come after the presets ones
+    dayList, day = numpy.unique(dates[known], return_inverse=True)
+    byDay = numpy.zeros((len(dayList), len(budgets)))
+    numpy.add.at(byDay, (day, codes[known]), amounts[known])
+    #a row of zeros first, for dates before the first row (or a ledger with no rows)
+    running = numpy.vstack([numpy.zeros((1, len(budgets))), numpy.cumsum(byDay, axis=0)])
+    def ledgerAsOf(days):
+        #running total at the end of each of days (YYYY-MM-DD)
+        return running[numpy.searchsorted(dayList, days, side="right")]
+
+    income = openFile(paycheckFile, None)
+    #the income record is appended to, so it isn't necessarily in date order
+    income = income[income["date"].astype(str) >= start].sort_values("date", kind="mergesort")
+    payDates = income["date"].astype(str).to_numpy()
+    payAmounts = income["amount"].to_numpy(dtype=float)
+
+    #paychecks in date order, each split against the ledger as of its date plus the replayed
+    # paychecks before it
+    replayed = numpy.zeros((len(payDates) + 1, len(candidates), len(budgets)))
+    ledgerAtPay = ledgerAsOf(payDates)
+    for i, amount in enumerate(payAmounts):
+        balance = ledgerAtPay[i] + replayed[i]
+        replayed[i + 1] = replayed[i] + splitPaychecks(numpy.full(len(candidates), amount), balance, 
+                                                        splits, caps, overflow)
+
+    #balances at the end of each month
+    months = pandas.period_range(start[:7], today[:7], freq="M")
+    monthEnds = numpy.array([str(month.end_time.date()) for month in months])
+    paid = numpy.searchsorted(payDates, monthEnds, side="right")
+    trajectory = ledgerAsOf(monthEnds)[None, :, :] + replayed[paid].transpose(1, 0, 2)
+
+    index = pandas.MultiIndex.from_product([range(len(candidates)), months.astype(str)], names=["candidate", "month"])
+    return pandas.DataFrame(trajectory.reshape(-1, len(budgets)), index=index, columns=budgets).round(2)
+
+
+def rowToList(item):
+    """
+    converts a transaction object into a plain list that can be sent as json
 
-    budget_to = input("Budget being deposited to: ")
-    budget_to = checkInput(budget_to,"budget")
-    if budget_to is None:
-        return
-    
-    amount = input("Amount (non-negative): ")
-    amount = checkInput(amount,"amount")
-    if amount is None:
-        return
+    Parameters
+    ----------
+    item : transaction
+        the transaction to convert
 
-    #check for overcapping budgets
-    if isinstance(presets["budget_caps"], list):
-        if budget_to != 'null':
-            if overcapCheck(budget_to,amount):
-                #then the transfer will overcap its destination budget
-                split_deposits = overcapProcedure(budget_to,amount)
-                if split_deposits is None:
-                    return
-                for deposit in split_deposits:
-                    writeTransaction([date,name,account_to]+deposit)
-                #also add withdrawal part
-                writeTransaction([date,name,account_from,budget_from,-1*amount])
-                return
+    Returns
+    -------
+    list in the form [date, name, account, budget, amount]
+    """
+    row = []
+    for value in (item.date, item.name, item.account, item.budget, item.amount):
+        #numpy scalars from pandas aren't json serializable, convert to python types
+        if hasattr(value, 'item'):
+            value = value.item()
+        row.append(value)
+    return row
+
+def applyFilters(filters, transactionList):
+    """
+    applies a list of history filters to a list of transactions, in order. shared by the 
+    REPL's history command and the daemon's history query
 
-            elif overcapAmt(budget_to,amount) == 0:
-                print(f"The {budget_to} budget is now overcapped at {findBudgetCap(budget_to)}.")
+    Parameters
+    ----------
+    filters : list
+        list of filters, each a list starting with the filter type:
+        ['budget', budget], ['account', account], ['date', start, end], ['name', query]
+        (case insensitive), ['names', list of exact names] (e.g. from searchNames),
+        or ['source', source] for income
+    transactionList : list
+        list of transaction (or income) objects to filter
 
-    writeTransfer([date,name,account_from,budget_from,-1*amount], \
-                  [date,name,account_to,budget_to,amount])
-    
-def cappedBudgets(budget_caps):
+    Returns
+    -------
+    a list of transaction objects that satisfy every filter
     """
-    given budget caps as a dict, returns a list of budgets that are capped
+    for filt in filters:
+        if filt[0] == "budget":
+            transactionList = totalBudget(filt[1], transactionList)
+        elif filt[0] == "account":
+            transactionList = totalAccount(filt[1], transactionList)
+        elif filt[0] == "date":
+            transactionList = totalDate(filt[1], filt[2], transactionList)
+        elif filt[0] == "name":
+            transactionList = totalName(filt[1], transactionList)
+        elif filt[0] == "names":
+            names = set(filt[1])
+            transactionList = total(lambda transaction: transaction.getName() in names, transactionList)
+        elif filt[0] == "source":
+            transactionList = totalSource(filt[1], transactionList)
+        else:
+            raise ValueError(f"{filt[0]} is not a valid filter type")
+    return transactionList
+
+class ledgerState:
+    """
+    the daemon's in-memory copy of the transaction history. the file is only reparsed
+    if something other than the daemon changes it
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.RLock()
+        self.latency = dict()#{command: [count, total ms, max ms]}
+        self.reload()
+    def reload(self):
+        self.rows = convertToClass(openFile(self.filename, None))
+        self.stamp = fileStamp(self.filename)
+    def refresh(self):
+        #cheap stat check, so hand edits and other programs are still picked up
+        if fileStamp(self.filename) != self.stamp:
+            self.reload()
+    def recordLatency(self, command, ms):
+        with self.lock:
+            stats = self.latency.setdefault(command, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += ms
+            stats[2] = max(stats[2], ms)
+
+def handleDaemonRequest(state, message):
+    """
+    answers one request sent to the daemon
 
     Parameters
     ----------
-    budget_caps : dict
-        the budgets and their caps in the form {budget: cap}
-    
+    state : ledgerState
+        the daemon's in-memory ledger
+    message : dict
+        the decoded request, with the name of the query under 'command'
+
     Returns
     -------
-    list of capped budgets
+    dict, the reply to be sent back to the client
     """
-    transactions = filepathToTransactionList()
+    command = message.get('command')
+    with state.lock:
+        #follow the presets if they've switched to another transactions file
+        if refreshPresets() or state.filename != presets['transactions_file']:
+            state.filename = presets['transactions_file']
+            state.reload()
+        state.refresh()
+
+        if command == 'ping':
+            return {}
+
+        elif command == 'rows':
+            return {'rows': [rowToList(item) for item in state.rows]}
+
+        elif command == 'balances':
+            return roundedBalances(state.filename)
+
+        elif command == 'history':
+            return {'rows': [rowToList(item) for item in applyFilters(message.get('filters', []), state.rows)]}
+
+        elif command == 'asof':
+            index = loadBalanceIndex(state.filename)
+            return {'balance': index.balanceAsOf(message['name'], message['date'], message.get('kind', 'budget'))}
+
+        elif command == 'dupcheck':
+            index = loadFingerprints(state.filename)
+            return {'exact': index.duplicates(message['row']), 
+                    'near': index.nearDuplicates(message['row'], message['days'])}
+
+        elif command == 'search':
+            return {'matches': loadNameIndex(state.filename).search(message['query'], message.get('limit', 10))}
+
+        elif command == 'capcheck':
+            cap = message.get('cap')
+            if cap is None:
+                cap = findBudgetCap(message['budget'])
+            if cap == 'null':
+                return {'overcap': None}
+            current = budgetBalance(message['budget'], state.filename)
+            return {'overcap': (current + message['amount']) - cap}
+
+        elif command == 'write':
+            rows = message['rows']
+            writeTransactions(rows, state.filename)
+            #keep the in-memory copy in the same date order as the file
+            for row in rows:
+                insort(state.rows, transaction(row), key=transaction.getDate)
+            state.stamp = fileStamp(state.filename)
+            return {'written': len(rows)}
+
+        elif command == 'stats':
+            return {'latency': {c: {'count': n, 'mean_ms': t/n, 'max_ms': m} 
+                                for c, (n, t, m) in state.latency.items()},
+                    'compactions': compactionStats}
 
-    capped = list()
-    for budget in budget_caps:
-        cap = budget_caps[budget]
-        
-        if isinstance(cap, str):
-            #if 'null', never capped
-            pass
-        elif add(totalBudget(budget, transactions)) >= cap:
-            #then capped
-            capped.append(budget)
-    
-    return capped
+        else:
+            raise ValueError(f"{command} is not a valid daemon command")
 
-def paycheck(amount, filename=presets['transactions_file'], paycheckFile=presets['income_record_file']):
+class daemonHandler(socketserver.StreamRequestHandler):
     """
-    adds paycheck balance, split up into different budgets, to csv transaction file
+    handles one client connection: newline separated json requests, one json reply each
+    """
+    def handle(self):
+        for raw in self.rfile:
+            start = time.perf_counter()
+            command = None
+            try:
+                message = json.loads(raw)
+                command = message.get('command')
+                if command == 'shutdown':
+                    #shutdown() blocks until serve_forever stops, so it can't run on this thread
+                    threading.Thread(target=self.server.shutdown).start()
+                    reply = {}
+                else:
+                    reply = handleDaemonRequest(self.server.state, message)
+                reply['ok'] = True
+            except Exception as error:
+                reply = {'ok': False, 'error': f"{type(error).__name__}: {error}"}
+            elapsed = (time.perf_counter() - start)*1000
+            self.server.state.recordLatency(command, elapsed)
+            reply['elapsed_ms'] = elapsed
+            self.wfile.write((json.dumps(reply) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+class daemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+def serveDaemon(socketPath=None):
+    """
+    runs the ledger daemon: keeps the transaction history and presets in memory and 
+    answers queries and writes over a unix domain socket until it is shut down
 
     Parameters
     ----------
-    amount : float
-        the amount of the paycheck
-    filename : string, optional
-        filepath to the file the transactions will be added to
-        the default is filepath from presets dict
-    paycheckFile : string, optional
-        filepath to the file the paycheck records are in
-        the default is paycheckFilename from presets dict
+    socketPath : str, optional
+        filepath of the socket. default is the global daemonSocketPath
 
     Returns
     -------
     None.
+    """
+    if socketPath is None:
+        socketPath = daemonSocketPath
+    #remove a socket left behind by a daemon that didn't shut down cleanly
+    if os.path.exists(socketPath):
+        os.remove(socketPath)
+
+    recoverLog()
+    server = daemonServer(socketPath, daemonHandler)
+    server.state = ledgerState(presets['transactions_file'])
+    print(f"Ledger daemon listening on {socketPath} with {len(server.state.rows)} transactions loaded.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socketPath):
+            os.remove(socketPath)
+        print("Ledger daemon stopped.")
+
+class daemonConnection:
+    """
+    a client connection to the ledger daemon, keeps track of round trip latency per request
+    """
+    def __init__(self, socketPath):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socketPath)
+        self.file = self.sock.makefile('rwb')
+        self.latencies = []#[(command, round trip ms)]
+    def request(self, command, **args):
+        args['command'] = command
+        start = time.perf_counter()
+        self.file.write((json.dumps(args) + '\n').encode('utf-8'))
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The ledger daemon closed the connection.")
+        reply = json.loads(line)
+        self.latencies.append((command, (time.perf_counter() - start)*1000))
+        if not reply['ok']:
+            raise RuntimeError(reply['error'])
+        return reply
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+def connectDaemon(socketPath=None):
+    """
+    connects to a running ledger daemon
 
+    Parameters
+    ----------
+    socketPath : str, optional
+        filepath of the socket. default is the global daemonSocketPath
+
+    Returns
+    -------
+    daemonConnection, or None if no daemon is running
     """
-    #turn global dict variables into more convenient local ones
-    budgets = presets['budgets'][:]
-    round_budget = presets['round_budget']
-    overflow_budget = presets['overflow_budget']
+    if socketPath is None:
+        socketPath = daemonSocketPath
+    try:
+        return daemonConnection(socketPath)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
 
-    #make paycheck_split dict {budget_name: split}
-    paycheck_split = dict()
-    for i, budget in enumerate(budgets):
-        paycheck_split[budget] = presets['paycheck_split'][i]
+def percentile(values, fraction):
+    """
+    gives the value at the given fraction (0 to 1) of a sorted list
+    """
+    return values[min(len(values) - 1, int(fraction*len(values)))]
 
-    #make budget caps dict {budget_name: budget_cap}, if turned on
-    if isinstance(presets['budget_caps'], str):
-        budget_caps = 'null'
-    else:
-        budget_caps = dict()
-        for i, budget in enumerate(budgets):
-            budget_caps[budget] = presets['budget_caps'][i]
-    
-    print("Type 'exit' to cancel paycheck input.")
-    
-    #ask for input
-    paydate = input("Date of paycheck (MM-DD): ")
-    paydate = checkInput(paydate,"date")
-    if paydate is None:
-        return
-    paycheck_account = input("Account the paycheck is in: ")
-    paycheck_account = checkInput(paycheck_account, "account")
-    if paycheck_account is None:
-        return
-    #ask for employer if necessary
-    employers = presets['employer']
-    if len(employers) == 1:
-        employer = employers[0]
-    else:
-        employer = input("Name of employer: ").strip()
-        while employer not in employers and employer.lower() != 'exit':
-            print(f"{employer} is not a valid employer. Employers include ", end = '')
-            print(*employers, sep = ', ', end = '')
-            employer = input(". Input is case-sensitive. ").strip()
-        if employer.lower() == 'exit':
-            print("Cancelling paycheck entry...")
+def benchDaemon(clients=16, requests=200, socketPath=None):
+    """
+    load tests a running daemon with many concurrent clients sending a mix of read 
+    queries, and prints the per-request latency for each type of query
+
+    Parameters
+    ----------
+    clients : int, optional
+        number of concurrent client connections. default is 16
+    requests : int, optional
+        number of requests each client sends. default is 200
+    socketPath : str, optional
+        filepath of the socket. default is the global daemonSocketPath
+
+    Returns
+    -------
+    dict of {command: sorted list of round trip latencies in ms}
+    """
+    budget = presets['budgets'][0]
+    cutoff = str(date.today() - timedelta(30))
+    mix = [('balances', {}),
+           ('history', {'filters': [['date', cutoff, today]]}),
+           ('capcheck', {'budget': budget, 'amount': 10.0}),
+           ('ping', {})]
+
+    results = []
+    errors = []
+    def worker():
+        connection = connectDaemon(socketPath)
+        if connection is None:
+            errors.append("could not connect")
             return
-    
-    #first check for capped budgets
-    if isinstance(budget_caps, dict):
-        #send to a function that returns a list of budgets that are capped
-        capped_budgets = cappedBudgets(budget_caps)
+        try:
+            for i in range(requests):
+                command, args = mix[i % len(mix)]
+                connection.request(command, **args)
+        except Exception as error:
+            errors.append(str(error))
+        finally:
+            connection.close()
+            results.extend(connection.latencies)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = dict()
+    for command, ms in results:
+        latencies.setdefault(command, []).append(ms)
+
+    print(f"{len(results)} requests from {clients} clients in {elapsed:.2f}s "\
+          f"({len(results)/elapsed:.0f} requests/s)")
+    print("command\t\tp50 ms\tp95 ms\tmax ms")
+    for command, values in latencies.items():
+        values.sort()
+        print(f"{command:<12}\t{percentile(values, .5):.2f}\t{percentile(values, .95):.2f}\t{values[-1]:.2f}")
+    for error in errors:
+        print("Client error:", error)
+
+    return latencies
+
+profileTasks = ('balances', 'report', 'recurring')
+
+def runProfileTask(profile, task, by="budget"):
+    """
+    runs one task on one profile: a folder with its own presets.csv and csv files. 
+    meant to run in a worker process, so each profile gets its own presets and caches
 
-        for budget in budgets[:]:
-            if budget in capped_budgets:
-                #remove from budgets and paycheck_split
-                print(f"The {budget} budget is currently capped at {budget_caps[budget]}.")
-                budgets.remove(budget)
-                del paycheck_split[budget]
+    Parameters
+    ----------
+    profile : str
+        path to the profile's folder
+    task : str
+        one of profileTasks. "balances" gives the budget/account totals and the capped budgets,
+        "report" gives the monthly report (see monthlyReport), "recurring" posts the 
+        recurring transactions that have come due (see runRecurring)
+    by : str, optional
+        what the monthly report is by, for the "report" task. default is "budget"
 
-    #this will be the end amounts you add to each budget {budget_name: amount from paycheck}
-    total = {overflow_budget: 0, round_budget: 0}#these two must always be in the dict
-    for budget in budgets:
-        #only add budgets that have a value in paycheck_split
-        if paycheck_split[budget] != 0:
-            total[budget] = 0
+    Returns
+    -------
+    dict with the profile, whether it worked ('ok'), the result or error, and the seconds taken
+    """
+    global presets
+    start = time.perf_counter()
+    try:
+        #the relative filepaths in presets (and the write-ahead log) are the profile's own
+        os.chdir(profile)
+        presets = loadPresets(presetsFilepath)
+        compilePresets()
+        recoverLog()
+
+        if task == 'balances':
+            result = roundedBalances()
+            result['capped'] = [] if presetLookup.budgetCaps == 'null' else cappedBudgets(presetLookup.budgetCaps)
+        elif task == 'report':
+            result = monthlyReport(by)
+        elif task == 'recurring':
+            result = len(runRecurring())
+            waitForCompaction()
+        else:
+            raise ValueError(f"{task} is not a profile task. Use one of {', '.join(profileTasks)}.")
+        ok = True
+    except Exception as error:
+        #one broken profile shouldn't stop the others
+        result = f"{type(error).__name__}: {error}"
+        ok = False
+    return {'profile': profile, 'ok': ok, 'result': result, 'seconds': time.perf_counter() - start}
+
+def runProfiles(profiles, task, workers=None, by="budget"):
+    """
+    runs a task on many profiles at once with a pool of worker processes, and prints 
+    each profile's result and a timing summary
 
-    #set redistribute amount to the initial amount of the paycheck
-    redistribute_amount = amount
-    overflow = False
+    Parameters
+    ----------
+    profiles : list
+        paths to the profile folders
+    task : str
+        one of profileTasks, see runProfileTask
+    workers : int, optional
+        number of worker processes. default is one per cpu
+    by : str, optional
+        what the monthly report is by, for the "report" task. default is "budget"
 
-    #have to loop to redistribute remaining money into non-capped budgets
-    while redistribute_amount > 0:
+    Returns
+    -------
+    list of the dicts from runProfileTask, in the same order as profiles
+    """
+    profiles = [os.path.abspath(profile) for profile in profiles]
+    start = time.perf_counter()
+    #workers are reused across profiles, runProfileTask reloads the presets (which drops
+    # the caches) so nothing from one profile's files leaks into another's
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(runProfileTask, profiles, [task]*len(profiles), [by]*len(profiles)))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        print(f"\n{result['profile']} ({result['seconds']:.2f}s)")
+        if not result['ok']:
+            print("Failed:", result['result'])
+        elif task == 'balances':
+            for kind in ('budgets', 'accounts'):
+                print(kind.capitalize() + ":", ", ".join(f"{name} {total}" for name, total in result['result'][kind].items()))
+            if result['result']['capped']:
+                print("Capped:", ", ".join(result['result']['capped']))
+        elif task == 'recurring':
+            print(f"Added {result['result']} recurring transactions.")
+        else:
+            print(result['result'])
 
-        #after removing budgets and their splits, paycheck_split might not sum to 1
-        #total paycheck_split list, scale up so it sums to 1, then divide paycheck
-        total_split = sum(paycheck_split.values())
-        if abs(total_split - 1) > .001:#account for float
+    busy = sum(result['seconds'] for result in results)
+    failed = sum(not result['ok'] for result in results)
+    print(f"\n{task} on {len(results)} profiles ({failed} failed) in {elapsed:.2f}s, "\
+          f"{busy:.2f}s of work ({busy/elapsed if elapsed else 0:.1f}x parallel)")
+    return results
 
-            #first, if 0, all capped and go into overflow budget
-            if total_split == 0:
-                print(f"All your budgets are capped. The remaining balance will be added to {overflow_budget}, your overflow budget.")
-                overflow = True
-            
-            #multiply each value by 1/sum(paycheck_split)
-            else:
-                for budget in paycheck_split:
-                    paycheck_split[budget] *= 1/total_split
+commandPrompt = "Please enter a command. Type 'help' for options: "#what replays split a session into commands by
 
-        #split amount
-        if overflow:
-            total[overflow_budget] += round(redistribute_amount,2)
-        else:
-            for budget in budgets:
-                total[budget] += round(redistribute_amount*paycheck_split[budget],2)
-        redistribute_amount = 0#everything has been distributed
+def recordSession(sessionFile):
+    """
+    runs the financial manager as usual, saving every prompt and the answer typed to it,
+    so the session can be replayed later with replaySession
 
-        #check for overcapped budgets - skip if already overflowed
-        if budget_caps != 'null' and not overflow:
-            for budget in total:
-                #skip if this budget does not have a cap
-                if budget_caps[budget] != 'null':
+    Parameters
+    ----------
+    sessionFile : str
+        filepath to save the session to, a json lines file of {"prompt": ..., "answer": ...}
+    """
+    typed = builtins.input
+    with open(sessionFile, 'w') as out:
+        def record(prompt=""):
+            answer = typed(prompt)
+            #written as it's typed, so a crash still leaves the session up to that point
+            out.write(json.dumps({'prompt': prompt, 'answer': answer}) + "\n")
+            out.flush()
+            return answer
+
+        builtins.input = record
+        try:
+            __main__()
+        except (EOFError, KeyboardInterrupt):
+            print("\nThe session ended early. Everything entered so far is saved.")
+        finally:
+            builtins.input = typed
+    print(f"The session has been saved to {sessionFile}.")
+
+def readSession(sessionFile):
+    """
+    reads a session saved by recordSession. lines can also be written by hand, and can
+    leave out the prompt (then any prompt is fine for that answer)
 
-                    #find overall total in that budget
-                    new_total = add(totalBudget(budget, filepathToTransactionList())) + total[budget]
-                    if new_total > budget_caps[budget]:
-                        #overcapped
-                        overcap_amount = new_total - budget_caps[budget] #find out difference
-                        #find about paycheck overcapped it by
-                        # (don't want to automatically un-cap manually capped budgets)
-                        
+    Returns
+    -------
+    list of (prompt or None, answer)
+    """
+    steps = []
+    with open(sessionFile) as session:
+        for line in session:
+            if line.strip() != "":
+                step = json.loads(line)
+                steps.append((step.get('prompt'), str(step['answer'])))
+    return steps
+
+class scriptedInput:
+    """
+    stands in for input() during a replay: gives back the session's answers in order and
+    times each command from one command prompt to the next. nothing waits on a person, so
+    that time is all the command's own work
+    """
+    def __init__(self, steps):
+        self.steps = steps
+        self.position = 0
+        self.command = "startup"
+        self.start = time.perf_counter()
+        self.latencies = []#(command, ms)
+        self.drift = []#(step, prompt in the session, prompt asked)
+
+    def __call__(self, prompt=""):
+        if prompt == commandPrompt:
+            self.lap()
+        if self.position >= len(self.steps):
+            raise EOFError("the session ran out of answers")
+        expected, answer = self.steps[self.position]
+        if expected is not None and expected != prompt:
+            #the replay asked something the recording didn't, so the answers may no longer line up
+            self.drift.append((self.position, expected, prompt))
+        self.position += 1
+        if prompt == commandPrompt:
+            self.command = answer.strip().lower()
+        return answer
+
+    def lap(self):
+        now = time.perf_counter()
+        self.latencies.append((self.command, (now - self.start)*1000))
+        self.start = now
+
+def runSession(steps, profile="."):
+    """
+    replays a session once, headless, against a throwaway copy of a profile's files
+
+    Parameters
+    ----------
+    steps : list
+        the session, from readSession
+    profile : str, optional
+        path to the folder with the presets.csv and csv files to copy. default is the
+        current folder
 
-                        #remove the extra from what's being added from paycheck
-                        # (only if non-negative - )
-                        total[budget] = max(total[budget] - overcap_amount, 0)
-                        redistribute_amount += overcap_amount #add the extra to be redistributed
+    Returns
+    -------
+    dict with the (command, ms) latencies, the prompts that drifted from the recording, 
+    the balances at the end, and the error that stopped it (None if it got to quit)
+    """
+    global presets
+    home = os.getcwd()
+    profile = os.path.abspath(profile)
+    copy = tempfile.mkdtemp(prefix="financial_manager_replay_")
+    shutil.copytree(profile, copy, dirs_exist_ok=True, ignore=shutil.ignore_patterns(daemonSocketPath))
+    script = scriptedInput(steps)
+    typed = builtins.input
+    error = None
+    try:
+        #the relative filepaths in presets (and the log files) are now the copy's, and
+        # the caches are dropped so every run starts the same way
+        os.chdir(copy)
+        presets = loadPresets(presetsFilepath)
+        compilePresets()
+        builtins.input = script
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                __main__()
+            except Exception as failure:
+                #the session's last command broke, which is a finding, not a reason to stop
+                error = f"{script.command}: {type(failure).__name__}: {failure}"
+            script.lap()
+            waitForCompaction()
+            totals = roundedBalances()
+    finally:
+        builtins.input = typed
+        os.chdir(home)
+        shutil.rmtree(copy, ignore_errors=True)
+        if os.path.exists(presetsFilepath):#not when replaying from outside a profile
+            presets = loadPresets(presetsFilepath)
+            compilePresets()
+    return {'latencies': script.latencies, 'drift': script.drift, 'balances': totals, 'error': error}
+
+def replaySession(sessionFile, runs=1, profile=".", baseline=None):
+    """
+    replays a recorded session headlessly and prints the latency of each command. can
+    compare against an earlier replay to find commands that got slower
 
-                        #also remove that budget from the budgets list and paycheck split dict,
-                        # so that it won't get more distributed into it the next loop
-                        print(f"The {budget} budget is currently capped at {budget_caps[budget]}.")
-                        budgets.remove(budget)
-                        del paycheck_split[budget]
+    Parameters
+    ----------
+    sessionFile : str
+        filepath to a session saved by recordSession
+    runs : int, optional
+        number of times to replay it, each on a fresh copy of the files. default is 1
+    profile : str, optional
+        path to the folder with the files to replay against. default is the current folder
+    baseline : str, optional
+        filepath to a json file of an earlier replay's median latencies and balances. if it
+        doesn't exist yet this replay's are saved to it, otherwise they're compared with it
 
-    #check total sums to given amount
-    if int(round(sum(total.values()), 2)*100) != int(amount*100):
-        dif = round(amount - round(sum(total.values()), 2), 2)
-        #add to round_budget in total if there, add if not there
-        total[round_budget] = total.get(round_budget, 0) + dif
+    Returns
+    -------
+    dict of {command: sorted list of latencies in ms}
+    """
+    steps = readSession(sessionFile)
+    latencies = dict()
+    failed = False
+    for run in range(runs):
+        result = runSession(steps, profile)
+        for command, ms in result['latencies']:
+            latencies.setdefault(command, []).append(ms)
+        if run == 0:
+            for step, expected, prompt in result['drift']:
+                print(f"Step {step} asked {prompt!r} instead of {expected!r}.")
+        if result['error'] is not None:
+            print(f"Run {run + 1} stopped at", result['error'])
+            failed = True
+
+    print(f"{len(steps)} answers, {runs} runs")
+    print("command\t\truns\tp50 ms\tp95 ms\tmax ms")
+    medians = dict()
+    for command, values in latencies.items():
+        values.sort()
+        medians[command] = percentile(values, .5)
+        print(f"{command:<12}\t{len(values)}\t{medians[command]:.2f}\t{percentile(values, .95):.2f}\t{values[-1]:.2f}")
+
+    if baseline is not None and failed:
+        #a run that stopped partway has different latencies and balances from a full one
+        print(f"Not using the baseline in {baseline}, since a run didn't finish.")
+    elif baseline is not None:
+        if not os.path.exists(baseline):
+            with open(baseline, 'w') as out:
+                json.dump({'p50': medians, 'balances': result['balances']}, out, indent=1)
+            print(f"Saved as the baseline in {baseline}.")
+        else:
+            with open(baseline) as saved:
+                saved = json.load(saved)
+            for command, ms in medians.items():
+                before = saved['p50'].get(command)
+                #a millisecond of slack so tiny commands don't flag on noise
+                if before is not None and ms > before*1.25 + 1:
+                    print(f"{command} is slower than the baseline: {ms:.2f}ms, was {before:.2f}ms.")
+            if saved['balances'] != json.loads(json.dumps(result['balances'])):
+                print("The balances at the end are different from the baseline's.")
+    return latencies
+
+
+def filterFrame(frame, filters):
+    """
+    applies a list of history filters (see applyFilters) to a dataframe, as whole column
+    comparisons instead of one transaction object at a time
 
-        #idk why this is here but I'm afraid to remove it
-        #seems to be at risk of hitting an infinite loop
-        #I think this is making it sum to the correct amount
-        count = 0
-        while round(sum(total.values()), 2) != amount:
-            count += 1
-            total[round_budget] += .01
-        
-        if round(sum(total.values()), 2) != amount:
-            statement = ""
-            for el in total:
-                statement += "\n" + str(el) + " = " + str(total[el])
-                
-            print("Does not add up, ask for help","\ntotal =", sum(total.values()),statement)
-            adds = False
-        
+    Parameters
+    ----------
+    frame : pandas dataframe
+        rows of the transactions or income csv, with date as a column
+    filters : list
+        list of filters, the same as applyFilters takes
+
+    Returns
+    -------
+    the rows of frame that satisfy every filter
+    """
+    keep = pandas.Series(True, index=frame.index)
+    for filt in filters:
+        if filt[0] in {"budget", "account", "source"}:
+            keep &= frame[filt[0]] == filt[1]
+        elif filt[0] == "date":
+            days = dateOrdinals(frame["date"])
+            keep &= (days >= dayOrdinal(filt[1])) & (days <= dayOrdinal(filt[2]))
+        elif filt[0] == "name":
+            keep &= frame["name"].astype(str).str.contains(filt[1], case=False, regex=False)
+        elif filt[0] == "names":
+            keep &= frame["name"].isin(filt[1])
         else:
-            print("Off by "+"{:.2f}".format(round(dif + count/100, 2))+", corrected from %s budget." % round_budget)
-            adds = True
+            raise ValueError(f"{filt[0]} is not a valid filter type")
+    return frame[keep]
+
+def ledgerChunks(filename, income=False, chunksize=100000):
+    """
+    reads a transactions (or income) csv a chunk at a time in date order, including rows 
+    still in its journal, so a file of any size can be processed in bounded memory
+
+    Parameters
+    ----------
+    filename : str
+        filepath to the csv
+    income : bool, optional
+        True if the file is the income record rather than transactions
+    chunksize : int, optional
+        rows per chunk. default is 100000
 
+    Returns
+    -------
+    generator of pandas dataframes, with 'null' kept as text rather than read as nan
+    """
+    if income:
+        dtypes = {"date": str, "amount": float, "source": str}
     else:
-        print("Adds up")
-        adds = True
-    
-    if adds:
-        #add to paycheck csv
-        payfile = openFile(paycheckFile)
-        payfile = pandas_append(payfile, [amount, employer], 
-                                paydate, "date")
-        payfile.to_csv(paycheckFile)
-        
-        #add to transactions csv
-        file = openFile(filename)
-        for budget in total:
-            if total[budget] != 0:
-                file = pandas_append(file, [f"{employer} paycheck",paycheck_account,budget,total[budget]], 
-                                     paydate, "date")
-                file.to_csv(filename)
+        dtypes = {"date": str, "name": str, "account": str, "budget": str, "amount": float}
+    options = {"dtype": dtypes, "keep_default_na": False, "na_values": {"amount": [""]}}
+
+    with ledgerLock:
+        #the journal is small, so it's read whole and merged into the base chunks by date
+        journals = [pandas.read_csv(segment, header=None, names=list(dtypes), **options)
+                    for segment in ledgerSegments(filename) if os.path.getsize(segment) > 0]
+        journal = pandas.concat(journals, ignore_index=True).sort_values("date", kind="mergesort") if journals else None
+        base = pandas.read_csv(filename, chunksize=chunksize, **options)
+
+    for chunk in base:
+        if journal is not None and len(journal):
+            last = chunk["date"].iloc[-1]
+            due = journal[journal["date"] <= last]
+            if len(due):
+                journal = journal[journal["date"] > last]
+                chunk = pandas.concat([chunk, due], ignore_index=True).sort_values("date", kind="mergesort")
+        yield chunk
+    if journal is not None and len(journal):
+        yield journal
+
+exportFormats = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+
+def exportFiltered(outFilepath, filters, income=False, filename=None):
+    """
+    writes every row that satisfies the filters to a CSV, JSON Lines or Parquet file (by 
+    the file extension). the rows are streamed a chunk at a time straight from the csv,
+    without making transaction objects, so memory use doesn't grow with the ledger
 
+    Parameters
+    ----------
+    outFilepath : str
+        filepath to write to, ending in .csv, .jsonl (or .json) or .parquet
+    filters : list
+        list of filters, the same as applyFilters takes
+    income : bool, optional
+        True to export from the income record rather than transactions
+    filename : str, optional
+        filepath to the csv to export from. the default is the transactions file
+        (or income record file) from presets
 
-def getTransaction():
+    Returns
+    -------
+    int, the number of rows written
     """
-    ask user for transaction information (no intro print statement) and writes it to the file
+    if filename is None:
+        filename = presets['income_record_file'] if income else presets['transactions_file']
+    fmt = exportFormats.get(os.path.splitext(outFilepath)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Can't tell the export format of {outFilepath}. Use a .csv, .jsonl or .parquet file.")
+
+    if fmt == "parquet":
+        #optional dependency, only needed for this format
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Exporting to parquet needs the pyarrow package (pip install pyarrow).")
+
+    written = 0
+    if fmt == "parquet":
+        writer = None
+        try:
+            for chunk in ledgerChunks(filename, income):
+                table = pyarrow.Table.from_pandas(filterFrame(chunk, filters), preserve_index=False)
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(outFilepath, table.schema)
+                writer.write_table(table)
+                written += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+    headerWritten = False
+    with open(outFilepath, 'w', newline='', encoding='utf-8') as out:
+        for chunk in ledgerChunks(filename, income):
+            chunk = filterFrame(chunk, filters)
+            if fmt == "csv":
+                #the first chunk gives the header even if none of its rows matched
+                chunk.to_csv(out, header=not headerWritten, index=False)
+                headerWritten = True
+            elif len(chunk):
+                out.write(chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+            written += len(chunk)
+    return written
+
+def askExport(filters, income=False):
+    """
+    asks whether the list that was just shown should be exported, and exports it
+
+    Parameters
+    ----------
+    filters : list
+        the filters that made the list, the same as applyFilters takes
+    income : bool, optional
+        True if the list is from the income record
 
     Returns
     -------
-    None
+    None.
     """
-    print("Enter 'exit' at any time to cancel this transaction.")
-    
-    date = input("Date of transaction (MM-DD): ")
-    date = checkInput(date,"date")
-    if date is None:
-        return
-        
-    name = input("Name: ")
-    name = checkInput(name,"name")
-    if name is None:
-        return
-            
-    amount = input("Amount: ")
-    amount = checkInput(amount,"amount")
-    if amount is None:
-        return
-    
-    account = input("Account: ")
-    account = checkInput(account,"account")
-    if account is None:
+    outFilepath = input("To export this list, enter a filename ending in .csv, .jsonl or .parquet "\
+                        "(or press enter to skip): ").strip()
+    if outFilepath == '' or outFilepath.lower() in {'n', 'no', 'exit'}:
         return
-        
-    budget = input("Budget: ")
-    budget = checkInput(budget,"budget")
-    if budget is None:
+    try:
+        written = exportFiltered(outFilepath, filters, income)
+    except (ValueError, ImportError) as error:
+        print(error)
         return
-    
-    #check if this transaction will cap the destination budget
-    if amount > 0:
-        if isinstance(presets['budget_caps'], list):
-            if overcapCheck(budget,amount):
-                transactions = overcapProcedure(budget, amount)
-                #returns None if the user cancelled input, or
-                # list of [budget, amount] transactions to handle overcapping
-                if transactions is None:
-                    return
-                
-                for transaction in transactions:
-                    #write each returned transaction to the file
-                    writeTransaction([date, name, account] + transaction)
-                return
-                    
-            elif overcapAmt(budget, amount) == 0:
-                print(f"The {budget} budget is now capped at {findBudgetCap(budget)}.")
+    print(f"{written} rows were exported to {outFilepath}.")
+
+#library API: the same operations as the REPL commands, taking and giving whole batches
+# instead of asking with input(), for scripts that import this file
 
-    writeTransaction([date, name, account, budget, amount])
+def validRow(row, i=0):
+    """
+    checks a transaction row the way checkInput checks typed entries, without asking again
 
+    Parameters
+    ----------
+    row : list
+        [date, name, account, budget, amount], the date in any form checkInput takes
+    i : int, optional
+        the row's position in its batch, for the error message
 
-def weekly(filename=presets['transactions_file']):
+    Returns
+    -------
+    the row with the date as YYYY-MM-DD, account and budget lowercased, and amount a float.
+    raises ValueError if anything in it isn't valid
     """
-    goes through the weekly routine (now called 'checkup')
+    if len(row) != 5:
+        raise ValueError(f"Row {i} has {len(row)} values instead of date, name, account, budget and amount.")
+    day = parseDate(str(row[0]))
+    if day is None:
+        raise ValueError(f"Row {i}: {row[0]} is not a valid date. Use (YYYY-)MM-DD.")
+    name = str(row[1])
+    problem = nameProblem(name)
+    if problem is not None:
+        raise ValueError(f"Row {i}: {problem}")
+    account = str(row[2]).lower()
+    if account not in presetLookup.accountSet and account != "null":
+        raise ValueError(f"Row {i}: {account} is not a valid account.")
+    budget = str(row[3]).lower()
+    if budget not in presetLookup.budgetSet and budget != "null":
+        raise ValueError(f"Row {i}: {budget} is not a valid budget.")
+    try:
+        amount = float(row[4])
+    except (TypeError, ValueError):
+        raise ValueError(f"Row {i}: {row[4]} is not a number.") from None
+    if amount != amount:
+        raise ValueError(f"Row {i}: the amount is missing.")
+    return [day, name, account, budget, amount]
+
+def add_transactions(rows, overcap="overflow", filename=None):
+    """
+    checks and adds many transactions in one write (one operation for undo). deposits 
+    that would put a budget over its cap are handled like the REPL's transaction command, 
+    with the choice made up front
 
     Parameters
     ----------
-    filename : string, optional
-        filename of the csv file with records in it
-        the default is filepath from presets dict
+    rows : list or pandas dataframe
+        the transactions, each [date, name, account, budget, amount], or a dataframe with
+        those columns
+    overcap : str, optional
+        what to do with a deposit that goes over its budget's cap: "overflow" adds up to the 
+        cap and the rest to the overflow budget, "remove" adds up to the cap and drops the 
+        rest, "override" adds it all anyway, "error" raises ValueError. default is "overflow"
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
 
     Returns
     -------
-    None.
+    the rows that were written, a nested list
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    if overcap not in {"overflow", "remove", "override", "error"}:
+        raise ValueError(f"{overcap} is not a valid overcap option. Use overflow, remove, override or error.")
+    if isinstance(rows, pandas.DataFrame):
+        rows = rows[["date", "name", "account", "budget", "amount"]].itertuples(index=False)
+    rows = [validRow(row, i) for i, row in enumerate(rows)]
+
+    written = []
+    capped = presetLookup.budgetCaps != 'null' and overcap != "override"
+    if capped:
+        #totals are kept up to date through the batch, so earlier rows count toward the cap
+        if daemonClient is not None and filename == presets['transactions_file']:
+            balances = dict(daemonClient.request('balances')['budgets'])
+        else:
+            balances = dict(loadBalances(filename)['budgets'])
+    for i, row in enumerate(rows):
+        budget, amount = row[3], row[4]
+        cap = findBudgetCap(budget) if capped and amount > 0 else 'null'
+        splits = [[budget, amount]]
+        if cap != 'null' and balances.get(budget, 0) + amount > cap:
+            if overcap == "error":
+                raise ValueError(f"Row {i} would put the {budget} budget over its cap of {cap}.")
+            under = round(min(amount, max(cap - balances.get(budget, 0), 0)), 2)
+            splits = [[budget, under]] if under > 0 else []
+            if overcap == "overflow":
+                splits.append([presets['overflow_budget'], round(amount - under, 2)])
+        for budget, amount in splits:
+            written.append(row[:3] + [budget, amount])
+            if capped:
+                balances[budget] = balances.get(budget, 0) + amount
+
+    if written:
+        logOperation("transaction", [("transactions", filename, written)])
+    return written
+
+def post_paycheck(amount, date, account, employer=None, filename=None, paycheckFile=None):
+    """
+    splits and adds a paycheck, the same as the REPL's paycheck command
+
+    Parameters
+    ----------
+    amount : float
+        the amount of the paycheck
+    date : str
+        the date of the paycheck, in any form checkInput takes
+    account : str
+        the account the paycheck is in
+    employer : str, optional
+        who it's from. can be left out if presets only has one employer
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+    paycheckFile : str, optional
+        filepath to the income record
+        the default is income_record_file from presets dict
 
+    Returns
+    -------
+    dict of {budget: amount added from the paycheck}
     """
-    #add paycheck
-    paycheckAsk = input("First we'll add the paycheck. Did you get a paycheck that you'd like to add? Y/N  ")
-    if paycheckAsk.lower() in {'yes','y','yee'}:
-        print("Please enter the following information about the paycheck.")
-        amount = input("Amount: ")
-        amount = checkInput(amount,"amount")
-        if amount is not None:
-            paycheck(amount)
-        
-    print("Okay, moving on.\n--------------------\nNow are the bills.")
-        
-    #RENT
-    restart = True
-    while restart:
-        restart = False
-        rent_pay = input("Has the monthly rent check been cashed? Y/N  ")
-        if rent_pay.lower() == "y" or rent_pay.lower() == "yes" or rent_pay.lower() == "yee":
-            print("Enter 'exit' at any time to restart.")
-            print("Check the checking account for low balance! And check against cc bill.")
-            date_cashed = input("What date was the check cashed on? (MM-DD): ")
-            date_cashed = checkInput(date_cashed,"date")
-            if date_cashed is None:
-                restart = True
-            else:
-                writeTransaction([date_cashed,"rent check","mit-ch","rent",-1*presets['monthly_rent']])
-        
-    #INTERNET
-    restart = True
-    while restart:
-        restart = False
-        int_pay = input("Has the internet bill been paid? Y/N  ")
-        if int_pay.lower() == "y" or int_pay.lower() == "yes" or int_pay.lower() == "yee":
-            print("Enter 'exit' at any time to restart.")
-            print("Make sure autopay went through!")
-            date = input("What date was it paid on? (MM-DD): ")
-            date = checkInput(date,"date")
-            if date is None:
-                restart = True
-            else:
-                writeTransaction([date,"internet bill","mit-ch","rent",-1*presets['monthly_internet']])
-        
-    print("Perfect (I hope...).\n--------------------")
+    if filename is None:
+        filename = presets['transactions_file']
+    if paycheckFile is None:
+        paycheckFile = presets['income_record_file']
+    paydate, _, account, _, amount = validRow([date, "paycheck", account, "null", amount])
+    if employer is None:
+        if len(presets['employer']) != 1:
+            raise ValueError(f"Say which employer the paycheck is from: {', '.join(presets['employer'])}.")
+        employer = presets['employer'][0]
+    if employer not in presetLookup.employerSet:
+        raise ValueError(f"{employer} is not a valid employer.")
+
+    total = splitPaycheck(amount, filename, say=lambda *message: None)
+    if total is None:
+        raise ValueError(f"The paycheck of {amount} couldn't be split so that it adds up.")
+    writePaycheck(total, paydate, amount, account, employer, filename, paycheckFile)
+    return {budget: value for budget, value in total.items() if value != 0}
+
+def balances(filename=None):
+    """
+    gives the current total of every budget and account, rounded to cents
 
-    #add new transactions
-    print("Please enter the information for new transactions (except paychecks and recurring payments)",\
-          "below.")
-    ask = input("Done? Y/N  ")
-    if ask.lower() == "y" or ask.lower() == "yes" or ask.lower() == "yee":
-        done = True
-    else:
-        done = False
-    while not done:
-        printLine()
-        getTransaction()
-        
-        ask = input("Done? Y/N  ")
-        if ask.lower() == "y" or ask.lower() == "yes" or ask.lower() == "yee":
-            done = True
-            
-    print("Finished with new transactions.\n--------------------\nLast we'll check that the totals are the same.")
-            
-    #check balances
-    #need transactions in list form
-    transactionList = filepathToTransactionList()
-    checkBalances(transactionList)
-        
-    print("All done!")
+    Parameters
+    ----------
+    filename : str, optional
+        filepath to the transactions csv
+        the default is the global filepath from presets
+
+    Returns
+    -------
+    dict in the form {'budgets': {budget: total}, 'accounts': {account: total}}
+    """
+    if filename is None:
+        filename = presets['transactions_file']
+    if daemonClient is not None and filename == presets['transactions_file']:
+        return daemonClient.request('balances')
+    return roundedBalances(filename)
+
+def query(filters=(), income=False, filename=None):
+    """
+    gives the transactions (or income) that satisfy a list of filters, as a dataframe
+
+    Parameters
+    ----------
+    filters : list, optional
+        list of filters, the same as applyFilters takes. default is none (every row)
+    income : bool, optional
+        True to query the income record instead of the transactions
+    filename : str, optional
+        filepath to the csv. the default is the transactions or income file from presets
+
+    Returns
+    -------
+    pandas dataframe of the matching rows in date order, with date as a column
+    """
+    if filename is None:
+        filename = presets['income_record_file' if income else 'transactions_file']
+    if daemonClient is not None and not income and filename == presets['transactions_file']:
+        rows = daemonClient.request('history', filters=list(filters))['rows']
+        return pandas.DataFrame(rows, columns=["date", "name", "account", "budget", "amount"])
+    frame = openFile(filename, None)
+    if income:
+        frame = frame.sort_values("date", kind="mergesort")#appended to, so not always in order
+    return filterFrame(frame, filters).reset_index(drop=True)
 
 
 def helper():
@@ -2250,8 +5841,13 @@ budget - checks the balance of any particular budget
 
 account - checks the balance of any particular account
 
+asof - checks what a budget or account held at the end of a past date
+
 history - shows a full transaction history (can also filter by certain parameters)
 
+search - finds the transaction names closest to what you type, even with typos, and shows
+    their transactions
+
 balance - checks to make sure the bank's balance matches personal records
 
 cash - checks to make sure counted cash total matches digital records
@@ -2262,27 +5858,83 @@ paycheck - add a paycheck
 
 income - view previous paychecks
 
+report - monthly totals of spending and deposits per budget or account, or income per source
+
+forecast - projects each budget's balance over the coming months, from your income, 
+    paycheck split, budget caps, recurring transactions and past spending
+
+replay - shows what your budget balances would have been with a different paycheck split
+    and budget caps, by splitting your past paychecks again (nothing is saved)
+
 transfer - transfer an amount of money from one account and budget to another
 
+undo - cancels out the last transaction, transfer, paycheck, init or recurring transactions 
+    added, by adding the opposite transactions
+
+redo - adds back the last thing that was undone
+
 sort - sorts the transaction history csv file by date (this should be done 
     automatically done after every step that needs it)
 
+recurring - shows and adds recurring transactions (like rent and bills), which
+    checkup adds automatically when they come due
+
+dedupe - finds transactions that were entered more than once
+
+audit - checks the transaction history for mistakes: bad dates, amounts, accounts or budgets,
+    transfers that don't add up, saved totals that don't match the file, and rows that
+    have been changed by hand
+
+verify - quickly checks that the rows added since the last check haven't been changed by
+    hand (audit checks every row)
+
+compact - merges newly added transactions into the transaction history csv file
+    (this is done automatically in the background once enough have been added)
+
 quit - end the program    
 
+To keep the ledger in memory between commands, start the daemon in another terminal
+with "python financial_manager.py daemon". The program will use it automatically while
+it's running, and "python financial_manager.py bench" will load test it.
+
+To run a task on many profiles (folders with their own presets.csv and files) at once, use
+"python financial_manager.py profiles <task> <folder> <folder> ...", where the task is 
+balances (totals and capped budgets), report (monthly report by budget) or recurring
+(adds the recurring transactions that have come due). This can be run from any folder.
+
+To benchmark a realistic session, run "python financial_manager.py record <file>" and use
+the program as usual, then "python financial_manager.py replay <file> [runs] [folder] [baseline]"
+replays it on a copy of the files and shows how long each command took (from any folder,
+if the profile's folder is given). With a baseline
+file, the first replay is saved to it and later ones say which commands got slower.
+
 Ask Dani if you have any questions or need help! :)
           
           """)
         
 def __main__():
+    global daemonClient
     print("Welcome to Dani's Financial Manager!")
+
+    #finish anything a crash left half written before reading the files
+    recoverLog()
+
+    #if a ledger daemon is running, use it instead of reparsing the files for every command
+    daemonClient = connectDaemon()
+    if daemonClient is not None:
+        print(f"Connected to the ledger daemon at {daemonSocketPath}.")
     
     q = False
     
     while not q:
         printLine()
 
-        entry = input("Please enter a command. Type 'help' for options: ")
+        entry = input(commandPrompt)
         entry = entry.lower()
+
+        #pick up presets changed by another session since the last command
+        if refreshPresets():
+            print("The presets file has changed, so the new presets have been loaded.")
         
         if entry == "help":
             helper()
@@ -2303,12 +5955,12 @@ def __main__():
                 #turn into a list if it isn't
                 if not isinstance(budget, list):
                     budget = [budget]
-                transactionList = filepathToTransactionList()
-                # print(f'{transactionList=}')
+                if daemonClient is not None:
+                    totals = daemonClient.request('balances')['budgets']
+                else:
+                    totals = roundedBalances()['budgets']
                 for budg in budget:
-                    budgetList = totalBudget(budg, transactionList)
-                    # print(f'{budg=}, {budgetList=}, {add(budgetList)=}')
-                    print(budg, "\t", add(budgetList))
+                    print(budg, "\t", totals.get(budg, 0))
             
         elif entry == "account":
             account = input("Please enter which account you would like to check (type 'all' to see all accounts): ")
@@ -2317,13 +5969,107 @@ def __main__():
                 #turn into a list if it isn't
                 if not isinstance(account, list):
                     account = [account]
-                transactionList = filepathToTransactionList()
+                if daemonClient is not None:
+                    totals = daemonClient.request('balances')['accounts']
+                else:
+                    totals = roundedBalances()['accounts']
                 for acc in account:
-                    accountList = totalAccount(acc, transactionList)
-                    print(acc, "\t", add(accountList))
+                    print(acc, "\t", totals.get(acc, 0))
             
+        elif entry == "asof":
+            kind = input("Would you like to check a budget or an account? ").strip().lower()
+            while kind not in {"budget", "account", "exit"}:
+                kind = input("Please enter either budget or account: ").strip().lower()
+            if kind != "exit":
+                names = input(f"Please enter which {kind} you would like to check (type 'all' to see all {kind}s): ")
+                names = checkInput(names, kind, True)
+                if names is not None:
+                    asof = input("What date would you like the balance as of? (MM-DD): ")
+                    asof = checkInput(asof, "date")
+                    if asof is not None:
+                        if not isinstance(names, list):
+                            names = [names]
+                        for name in names:
+                            print(name, "\t", balanceAsOf(name, asof, kind))
+
+        elif entry == "report":
+            by = input("Which report would you like: budget, account, or income? ").strip().lower()
+            while by not in {"budget", "account", "income", "exit"}:
+                by = input("Please enter budget, account, or income: ").strip().lower()
+            if by != "exit":
+                start = input("Please enter the first month of the report (YYYY-MM), or type 'all' for every month: ").strip()
+                if start.lower() in {"all", ""}:
+                    start = end = None
+                else:
+                    end = input("Please enter the last month of the report (YYYY-MM): ").strip()
+                with pandas.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+                    print(monthlyReport(by, start, end))
+
+        elif entry == "forecast":
+            months = input("How many months would you like to forecast? (default is 12) ").strip()
+            months = int(months) if months.isdigit() and int(months) > 0 else 12
+            try:
+                projection = forecast(months)
+            except ValueError as error:
+                #budget caps without an overflow budget, which the presets command can fix
+                print(error, "Please set one with the presets command.")
+            else:
+                with pandas.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+                    print(projection)
+                print("p10/p50/p90 are the balances 10%, 50% and 90% of the simulated paths end the month below,\n"\
+                      "P(<0) is the chance the budget is negative.")
+
+        elif entry == "replay":
+            budgets = presets['budgets']
+            #candidate 0 is the current presets, to compare the others against
+            candidates = [(presets['paycheck_split'], presets['budget_caps'])]
+            print(f"Enter each split to try as {len(budgets)} numbers in the order {', '.join(budgets)}, separated by spaces.")
+            while True:
+                split = input(f"Split {len(candidates)} (or press enter when done): ").strip()
+                if split == "" or split.lower() == "exit":
+                    break
+                try:
+                    split = [float(value) for value in split.split()]
+                except ValueError:
+                    print("The split must be numbers.")
+                    continue
+                if len(split) != len(budgets) or abs(sum(split) - 1) > .001:
+                    print(f"The split must have {len(budgets)} numbers that add up to 1.")
+                    continue
+                caps = input("Budget caps in the same order ('null' for no cap), or press enter to keep the current caps: ").strip()
+                if caps == "":
+                    caps = presets['budget_caps']
+                elif caps.lower() == "null":
+                    caps = 'null'
+                else:
+                    try:
+                        caps = ['null' if cap.lower() == 'null' else float(cap) for cap in caps.split()]
+                    except ValueError:
+                        caps = []
+                    if len(caps) != len(budgets):
+                        print(f"The caps must be {len(budgets)} numbers or 'null', this split will use the current caps.")
+                        caps = presets['budget_caps']
+                    elif presets['overflow_budget'] not in presetLookup.budgetIndex:
+                        print("Caps need an overflow budget, and none is set in presets, so this split will have no caps.")
+                        caps = 'null'
+                candidates.append((split, caps))
+
+            if len(candidates) > 1:
+                start = input("Date to start replaying from (YYYY-MM-DD), or press enter for two years ago: ").strip()
+                if start != "":
+                    start = checkInput(start, "date")
+                if start is not None:
+                    try:
+                        replayed = replaySplits(candidates, start or None)
+                    except ValueError as error:
+                        print(error, "Please set one with the presets command.")
+                    else:
+                        with pandas.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+                            print(replayed)
+                        print("Candidate 0 is your current split and caps.")
+
         elif entry == "history":
-            filterList = filepathToTransactionList()
+            filters = []
             
             print("History will automatically only display the last 30 days unless another date is specified.")
             filterType = input("How would you like to filter the list?  ")
@@ -2337,13 +6083,13 @@ def __main__():
                     budget = input("Please enter which budget you would like to filter by: ")
                     budget = checkInput(budget,"budget")
                         
-                    filterList = totalBudget(budget, filterList)
+                    filters.append(["budget", budget])
                     
                 elif filterType == "account":
                     account = input("Please enter which account you would like to filter by: ")
                     account = checkInput(account,"account")
                     
-                    filterList = totalAccount(account, filterList)
+                    filters.append(["account", account])
                     
                 elif filterType == "date":
                     date_filter = True
@@ -2354,11 +6100,11 @@ def __main__():
                         end_date = input("Please enter the end date of the range (MM-DD): ")
                         end_date = checkInput(end_date,"date")
                         
-                        filterList = totalDate(start_date, end_date, filterList)
+                        filters.append(["date", start_date, end_date])
                 
                 elif filterType == "name":
                     query = input("Please enter what text you would like to search for: ").lower()
-                    filterList = totalName(query, filterList)
+                    filters.append(["name", query])
                     
                 filterType = input("How would you like to further filter the list?  ")
                 filterType = filterType.lower()
@@ -2366,8 +6112,42 @@ def __main__():
             
             if not date_filter:
                 #only display the previous 30 days
-                filterList = totalDate(str(date.today() - timedelta(30)), today, filterList)
+                filters.append(["date", str(date.today() - timedelta(30)), today])
+
+            if daemonClient is not None:
+                rows = daemonClient.request('history', filters=filters)['rows']
+                filterList = [transaction(row) for row in rows]
+            elif not date_filter:
+                #just the last 30 days, so only the end of the file needs reading
+                filterList = applyFilters(filters, readRecent(filters[-1][1]))
+            else:
+                filterList = applyFilters(filters, filepathToTransactionList())
             printList(filterList)
+            askExport(filters)
+
+        elif entry == "search":
+            query = input("What name would you like to search for? (spelling and capitals don't need to be exact) ").strip()
+            matches = searchNames(query)
+            if not matches:
+                print("No names are close to that.")
+            else:
+                print(f"{'#':<4}{'Name':<32}{'Match':<8}Transactions")
+                for i, (name, score, count) in enumerate(matches):
+                    print(f"{i + 1:<4}{name:<32}{score:<8.0%}{count}")
+                pick = input("Enter the numbers of the names to show (separated by spaces), 'all', or press enter to skip: ").strip().lower()
+                if pick:
+                    if pick == "all":
+                        names = [name for name, _, _ in matches]
+                    else:
+                        names = [matches[int(i) - 1][0] for i in pick.split() if i.isdigit() and 0 < int(i) <= len(matches)]
+                    filters = [["names", names]]
+                    if daemonClient is not None:
+                        rows = daemonClient.request('history', filters=filters)['rows']
+                        filterList = [transaction(row) for row in rows]
+                    else:
+                        filterList = applyFilters(filters, filepathToTransactionList())
+                    printList(filterList)
+                    askExport(filters)
 
         elif entry == "balance":
             transactionList = filepathToTransactionList()
@@ -2398,10 +6178,9 @@ def __main__():
             amount = checkInput(amount,"amount")
             if amount is not None:
                 paycheck(amount)
-                sort()
         
         elif entry == "income":
-            incomeList = filepathToTransactionList(presets['income_record_file'], True)
+            filters = []
             
             filterType = input("How would you like to filter the list?  ")
             filterType = filterType.lower()
@@ -2416,18 +6195,27 @@ def __main__():
                     end_date = input("Please enter the end date of the range (MM-DD): ")
                     end_date = checkInput(end_date,"date")
                     
-                    incomeList = totalDate(start_date, end_date, incomeList)
+                    filters.append(["date", start_date, end_date])
                 
                 elif filterType == "source":
                     source = input("What source are you filtering by? ").lower()
                     
-                    incomeList = totalSource(source, incomeList)
+                    filters.append(["source", source])
                     
                 filterType = input("How would you like to further filter the list?  ")
                 filterType = filterType.lower()
                 filterType = checkInput(filterType,"income_filter")
                     
+            #with a date filter, only read those dates from the income record
+            dateFilters = [filt for filt in filters if filt[0] == "date"]
+            if dateFilters:
+                rows = readDateRange(presets['income_record_file'], dateFilters[0][1], dateFilters[0][2])
+                incomeList = [incomeClass([row[0], float(row[1]), row[2]]) for row in rows]
+            else:
+                incomeList = filepathToTransactionList(presets['income_record_file'], True)
+            incomeList = applyFilters(filters, incomeList)
             printList(incomeList)
+            askExport(filters, True)
             
             ans = input("Would you like to sum these paychecks? Y/N  ")
             ans = ans.lower()
@@ -2437,17 +6225,123 @@ def __main__():
                 
         elif entry == "transfer":
             transfer()
-            sort()
             
+        elif entry == "recurring":
+            migrateRecurring()
+            rules = loadRecurring()
+            if rules:
+                print("Your recurring transactions are:")
+                for rule in rules:
+                    print(f"\t{rule[0]}\t{rule[3]} from {rule[1]}/{rule[2]}, {rule[4]} from {rule[5]}"\
+                          + (f", added through {rule[6]}" if rule[6] else ""))
+            else:
+                print("You don't have any recurring transactions.")
+            ask = input("Would you like to add one? Y/N ").strip().lower()
+            if ask in {'y','yes','yee'}:
+                addRecurring()
+
+        elif entry == "audit":
+            start = time.perf_counter()
+            problems = auditLedger()
+            for problem in problems:
+                printLine()
+                print(problem)
+            if not os.path.exists(presets['transactions_file'] + '.chain'):
+                print("The transaction history isn't sealed with a hash chain yet, one is made on the next write.")
+            print(f"Audit found {len(problems) or 'no'} problem{'s'*(len(problems) != 1)} "\
+                  f"in {time.perf_counter() - start:.2f}s.")
+
+        elif entry == "verify":
+            problems = verifyChain()
+            for problem in problems:
+                print(problem)
+            if not problems:
+                print("No rows have been changed since they were written.")
+            elif readChain(presets['transactions_file']):
+                reseal = input("If you made these changes on purpose, the file can be accepted as it is now. Accept it? Y/N ").strip().lower()
+                if reseal in {'y', 'yes'}:
+                    sealChain()
+                    print("The transaction history has been accepted.")
+
+        elif entry == "dedupe":
+            days = input(f"How many days apart can near duplicates be? (press enter for {nearDuplicateDays}) ").strip()
+            days = int(days) if days.isdigit() else nearDuplicateDays
+            exact, near = findDuplicates(days)
+            if not exact and not near:
+                print("No duplicate transactions found.")
+            for group in exact:
+                printLine()
+                print(f"These {len(group)} transactions are exact duplicates:")
+                printList(group)
+            for group in near:
+                printLine()
+                print(f"These {len(group)} transactions match and are within {days} days of each other:")
+                printList(group)
+
+        elif entry == "compact":
+            waitForCompaction()
+            stats = compactJournal()
+            if stats is None:
+                print("There are no new transactions to compact.")
+            else:
+                print(f"Merged {stats['rows']} new transactions into the file in {stats['seconds']:.3f}s "\
+                      f"({stats['rows_per_s']:.0f} rows/s, writes paused for {stats['pause_ms']:.1f}ms).")
+
+        elif entry in {"undo", "redo"}:
+            history = loadHistory()
+            stack = history[2] if entry == "redo" else history[1]
+            if not stack:
+                print(f"There's nothing to {entry}.")
+            else:
+                record = stack[-1]
+                if entry == "redo":
+                    print(f"The last {record['name']} undone wrote:")
+                else:
+                    print(f"The last {record['name']} wrote:")
+                for kind, filename, rows in record['writes']:
+                    if kind == "transactions":
+                        printList([transaction(row) for row in rows])
+                    elif kind == "income":
+                        printList([incomeClass(row) for row in rows])
+                    elif kind == "rules":
+                        print("(and updated when the recurring transactions were last added)")
+                sure = input(f"Would you like to {entry} it? Y/N ").strip().lower()
+                if sure in {'y', 'yes', 'yee'}:
+                    undo(entry == "redo")
+                    if entry == "undo":
+                        print("Done. Rows that cancel it out were added, named 'undo' and the original name.")
+                    else:
+                        print("Done. It has been written again.")
+
         elif entry == "sort":
             sort()
             print("The file is now sorted by date!")
             
         elif entry == "quit":
             q = True
+            if daemonClient is not None:
+                daemonClient.close()
+                daemonClient = None
             print("Thank you for being financially responsible! Goodbye.")
 
         else:
             print("That is not a valid entry. Please type 'help' for a list of valid commands.")
-            
-__main__()
+
+if __name__ == '__main__':
+    #"python financial_manager.py daemon" runs the ledger daemon,
+    #"python financial_manager.py bench [clients] [requests]" load tests a running daemon
+    #"python financial_manager.py profiles <task> <folder> [folder ...]" runs a task on many profiles
+    #"python financial_manager.py record <session>" saves what's typed in a session, and
+    #"python financial_manager.py replay <session> [runs] [profile] [baseline]" replays it headless
+    if len(sys.argv) > 1 and sys.argv[1] == 'daemon':
+        serveDaemon()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        benchDaemon(*[int(arg) for arg in sys.argv[2:4]])
+    elif len(sys.argv) > 3 and sys.argv[1] == 'profiles':
+        runProfiles(sys.argv[3:], sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == 'record':
+        recordSession(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == 'replay':
+        replaySession(sys.argv[2], *[int(arg) for arg in sys.argv[3:4]], *sys.argv[4:6])
+    else:
+        __main__()